@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import User
+from .revocation import revocation_store
+
+# Fields kept in the user cache, in model field order. The password hash is
+# left out on purpose: it is deferred on cached users and loaded from the
+# database on access.
+CACHED_USER_FIELDS = ['id', 'email', 'name', 'is_admin', 'is_active', 'created_at', 'updated_at']
+
+# Claims LoginView adds to its tokens for stateless authentication.
+STATELESS_CLAIMS = ['name', 'is_admin']
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def tokens_for_user(user):
+    """Refresh token for user carrying the claims stateless authentication trusts."""
+    refresh = RefreshToken.for_user(user)
+    for claim in STATELESS_CLAIMS:
+        refresh[claim] = getattr(user, claim)
+    return refresh
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from a short-TTL cache instead
+    of loading the user row on every request.
+
+    Entries are keyed by user id and dropped when the user is saved or
+    deleted (see accounts.signals); AUTH_USER_CACHE_TIMEOUT bounds how long
+    changes made with queryset.update() can go unnoticed.
+
+    With JWT_STATELESS_USER_CLAIMS enabled, tokens minted by LoginView are
+    trusted as they are: the user is built from their signed claims without
+    touching the cache or the database. Such a token keeps its name and
+    admin flag until it expires, even if the user changes in between.
+
+    In both modes tokens revoked through accounts.revocation are rejected.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_store.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token has been revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        if settings.JWT_STATELESS_USER_CLAIMS and all(claim in validated_token for claim in STATELESS_CLAIMS):
+            # from_db expects values in model field order.
+            return User.from_db(
+                User.objects.db,
+                ['id', 'name', 'is_admin', 'is_active'],
+                [user_id, validated_token['name'], validated_token['is_admin'], True],
+            )
+
+        user = self.get_cached_user(user_id)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def get_cached_user(self, user_id):
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = (
+                User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values_list(*CACHED_USER_FIELDS)
+                .first()
+            )
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, values, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return User.from_db(User.objects.db, CACHED_USER_FIELDS, values)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from
+    PASSWORD_HASH_ITERATIONS (0 keeps Django's default). The count is stored
+    in each hash, so existing hashes keep verifying after it changes and are
+    re-hashed at the new count on the user's next login (see
+    accounts.hashing.aauthenticate).
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
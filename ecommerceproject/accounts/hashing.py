@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from .models import User
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool's queue is full; the request should be retried later."""
+
+    def __init__(self, retry_after=1):
+        self.retry_after = retry_after
+        super().__init__('Password hashing pool is saturated')
+
+
+class PasswordHashingPool:
+    """
+    Bounded pool for password hashing, kept off request and event-loop threads.
+
+    PBKDF2 runs in OpenSSL with the GIL released, so a thread pool hashes
+    in parallel across cores. At most max_workers hashes run at once and
+    max_queue more may wait; anything beyond that is refused immediately
+    with HashingPoolSaturated instead of queueing without bound, so a
+    login flood turns into fast 503s rather than a growing backlog.
+
+    Args:
+        max_workers: hashes computed in parallel
+        max_queue: hashes allowed to wait for a worker
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password-hashing'
+                    )
+        return self._executor
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue func on the pool.
+
+        Returns:
+            concurrent.futures.Future
+
+        Raises:
+            HashingPoolSaturated: if max_workers + max_queue hashes are pending
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolSaturated()
+        try:
+            future = self.executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, func, *args, **kwargs):
+        """Run func on the pool and wait for it from a synchronous caller."""
+        return self.submit(func, *args, **kwargs).result()
+
+    async def arun(self, func, *args, **kwargs):
+        """Run func on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'queue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def _done(self, future):
+        self._slots.release()
+        with self._lock:
+            self.completed += 1
+
+
+hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_queue=settings.PASSWORD_HASHING_QUEUE,
+)
+
+
+async def ahash_password(raw_password):
+    return await hashing_pool.arun(make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    """
+    Check a password on the pool.
+
+    Returns:
+        tuple: (is_correct, must_update). must_update is true when the hash
+        was made with another hasher or work factor than the current
+        preferred one; callers re-hash with ahash_password.
+    """
+    return await hashing_pool.arun(verify_password, raw_password, encoded)
+
+
+
+async def aauthenticate(email, password):
+    """
+    Async counterpart of authenticate() for email/password logins, with the
+    hashing done on the pool.
+
+    A correct password stored with an outdated hasher or work factor is
+    re-hashed with the current one and saved, so raising the cost in
+    PASSWORD_HASHERS / PASSWORD_HASH_ITERATIONS upgrades users as they log
+    in instead of invalidating their passwords.
+
+    Returns:
+        User or None
+
+    Raises:
+        HashingPoolSaturated: if the pool has no room for the check
+    """
+    user = await User.objects.filter(email=email).afirst()
+    # A missing user still costs one hash (verify_password fakes one for an
+    # unusable password), so response times do not reveal registered emails.
+    encoded = user.password if user else make_password(None)
+    is_correct, must_update = await averify_password(password, encoded)
+    if not is_correct or not user.is_active:
+        return None
+
+    if must_update:
+        user.password = await ahash_password(password)
+        await User.objects.filter(pk=user.pk).aupdate(password=user.password)
+    return user
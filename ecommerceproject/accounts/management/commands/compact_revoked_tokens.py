@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from accounts.revocation import revocation_store
+
+
+class Command(BaseCommand):
+    help = 'Delete revocation records of tokens that have expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Records deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and compact every N seconds (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            deleted = revocation_store.compact(batch_size=batch_size)
+            self.stdout.write(f'Deleted {deleted} expired token revocations')
+
+            if not interval:
+                break
+            time.sleep(interval)
@@ -34,3 +34,20 @@ class User(AbstractBaseUser):
     def __str__(self):
         return self.name
 
+
+
+class RevokedToken(models.Model):
+    """
+    A JWT revoked before its expiry, keyed by its jti claim. Rows are only
+    needed until the token would have expired anyway; compact_revoked_tokens
+    deletes them after that.
+    """
+
+    jti = models.CharField(max_length=255, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    token_type = models.CharField(max_length=20)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti} (expires {self.expires_at})"
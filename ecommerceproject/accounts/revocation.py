@@ -0,0 +1,237 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Incremental syncs re-read rows revoked this long before the previous sync,
+# covering clock skew between processes and transactions that commit late.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings, local to one process.
+
+    Membership tests never give false negatives; false positives stay
+    around error_rate until more than capacity keys have been added.
+    Uses the interpreter's string hash, which is cached on the string and
+    stable within a process, as the seed for double hashing.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        value = hash(key)
+        position, step = value % self.size, (value >> 32) | 1
+        for _ in range(self.hashes):
+            self._bits[position >> 3] |= 1 << (position & 7)
+            position = (position + step) % self.size
+        self.count += 1
+
+    def __contains__(self, key):
+        # Hot path: a key that was never added usually fails the first probe.
+        value = hash(key)
+        size, bits = self.size, self._bits
+        position = value % size
+        if not bits[position >> 3] & (1 << (position & 7)):
+            return False
+        step = (value >> 32) | 1
+        for _ in range(self.hashes - 1):
+            position = (position + step) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationStore:
+    """
+    Answers "has this token been revoked?" for the authentication hot path.
+
+    Revoked jtis live in the RevokedToken table until the token would have
+    expired. Each process keeps a Bloom filter of the live ones, so the
+    common case (a token that was never revoked) is answered in memory
+    without a query. A filter hit is confirmed against the database once
+    and the answer kept in a bounded LRU, which absorbs false positives.
+
+    The filter is loaded on first use and then picks up revocations made
+    by other processes every TOKEN_REVOCATION_SYNC_SECONDS, with one query
+    per interval rather than per request. Revocations made in this process
+    are visible immediately.
+
+    Args:
+        capacity: expected number of live revoked tokens
+        error_rate: target false-positive rate of the filter
+        cache_size: confirmed answers kept in the LRU
+        sync_interval: seconds between incremental syncs
+        clock: monotonic clock, injectable for tests
+    """
+
+    def __init__(self, capacity, error_rate, cache_size, sync_interval, clock=time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.cache_size = cache_size
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._filter = None
+        self._confirmed = OrderedDict()
+        self._synced_at = None
+        self._next_sync = 0
+        self.checks = 0
+        self.lookups = 0
+
+    def is_revoked(self, jti):
+        self.checks += 1
+        bloom = self._filter
+        if bloom is None or self.clock() >= self._next_sync:
+            bloom = self.sync()
+        if jti not in bloom:
+            return False
+
+        with self._lock:
+            if jti in self._confirmed:
+                self._confirmed.move_to_end(jti)
+                return self._confirmed[jti]
+
+        self.lookups += 1
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        self._remember(jti, revoked)
+        return revoked
+
+    def revoke(self, tokens, user_id=None):
+        """
+        Revoke tokens until they expire.
+
+        Args:
+            tokens: iterable of simplejwt Token instances
+            user_id: optional id of the user the tokens belong to
+        """
+        rows = [
+            RevokedToken(
+                jti=token[settings.SIMPLE_JWT['JTI_CLAIM']],
+                user_id=user_id,
+                token_type=token[settings.SIMPLE_JWT['TOKEN_TYPE_CLAIM']],
+                expires_at=datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+            )
+            for token in tokens
+        ]
+        RevokedToken.objects.bulk_create(rows, ignore_conflicts=True)
+        jtis = [row.jti for row in rows]
+        transaction.on_commit(lambda: self._add(jtis))
+
+    def sync(self):
+        """
+        Load the filter, or add tokens revoked elsewhere since the last sync.
+
+        Returns:
+            BloomFilter: the current filter
+        """
+        with self._lock:
+            if self._filter is not None and self.clock() < self._next_sync:
+                return self._filter
+            now = timezone.now()
+
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+                self._filter = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+                self._confirmed.clear()
+            else:
+                jtis = list(
+                    RevokedToken.objects.filter(revoked_at__gte=self._synced_at - SYNC_OVERLAP)
+                    .values_list('jti', flat=True)
+                )
+
+            self._add_locked(jtis)
+            self._synced_at = now
+            self._next_sync = self.clock() + self.sync_interval
+            return self._filter
+
+    def compact(self, batch_size=1000, now=None):
+        """
+        Delete revocations of tokens that have expired anyway, one batch per
+        transaction, and rebuild this process's filter without them.
+
+        Returns:
+            int: number of rows deleted
+        """
+        now = now or timezone.now()
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                jtis = list(
+                    RevokedToken.objects.filter(expires_at__lte=now)
+                    .values_list('jti', flat=True)[:batch_size]
+                )
+                if not jtis:
+                    break
+                RevokedToken.objects.filter(jti__in=jtis).delete()
+            deleted += len(jtis)
+            if len(jtis) < batch_size:
+                break
+
+        logger.info(f"Compacted {deleted} expired token revocations")
+        self.reset()
+        return deleted
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._confirmed.clear()
+            self._synced_at = None
+            self._next_sync = 0
+            self.checks = 0
+            self.lookups = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'checks': self.checks,
+                'lookups': self.lookups,
+                'filter_keys': self._filter.count if self._filter else 0,
+                'confirmed': len(self._confirmed),
+            }
+
+    def _add(self, jtis):
+        with self._lock:
+            if self._filter is not None:
+                self._add_locked(jtis)
+            for jti in jtis:
+                self._remember_locked(jti, True)
+
+    def _add_locked(self, jtis):
+        for jti in jtis:
+            self._filter.add(jti)
+            # A cached "not revoked" answer for this jti is stale now.
+            self._confirmed.pop(jti, None)
+
+    def _remember(self, jti, revoked):
+        with self._lock:
+            self._remember_locked(jti, revoked)
+
+    def _remember_locked(self, jti, revoked):
+        self._confirmed[jti] = revoked
+        self._confirmed.move_to_end(jti)
+        while len(self._confirmed) > self.cache_size:
+            self._confirmed.popitem(last=False)
+
+
+revocation_store = RevocationStore(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    cache_size=settings.TOKEN_REVOCATION_CACHE_SIZE,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+)
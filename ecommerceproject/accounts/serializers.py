@@ -1,16 +1,16 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
+from ecommerceproject.instrumentation import TimedSerializerMixin
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'name', 'is_admin', 'created_at')
         read_only_fields = ('id', 'created_at')
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirm = serializers.CharField(write_only=True, min_length=8)
@@ -31,8 +31,14 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
-        return user
+        # RegisterView hashes off-thread and passes the result in.
+        encoded_password = validated_data.pop('encoded_password', None)
+        if encoded_password is None:
+            return User.objects.create_user(**validated_data)
+
+        validated_data.pop('password')
+        email = User.objects.normalize_email(validated_data.pop('email'))
+        return User.objects.create(email=email, password=encoded_password, **validated_data)
 
 
 class LoginSerializer(serializers.Serializer):
@@ -40,16 +46,7 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        email = data.get('email')
-        password = data.get('password')
-
-        if not email or not password:
+        # Credentials are checked by LoginView, with the hashing off-thread.
+        if not data.get('email') or not data.get('password'):
             raise serializers.ValidationError('Email and password are required.')
-
-        user = authenticate(username=email, password=password)
-
-        if not user:
-            raise serializers.ValidationError('Invalid credentials.')
-
-        data['user'] = user
         return data
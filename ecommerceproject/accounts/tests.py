@@ -1,3 +1,248 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from .hashing import HashingPoolSaturated, PasswordHashingPool, hashing_pool
+from .models import RevokedToken, User
+from .revocation import BloomFilter, RevocationStore, revocation_store
 
-# Create your tests here.
+
+class CachedJWTAuthenticationTests(TestCase):
+    HEALTH_URL = '/api/payments/provider-health/'
+
+    def setUp(self):
+        caches['default'].clear()
+        revocation_store.reset()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def user_queries(self, client, expected_status=200):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.HEALTH_URL)
+        self.assertEqual(response.status_code, expected_status)
+        return [query for query in queries.captured_queries if 'accounts_user' in query['sql']]
+
+    def test_user_is_loaded_once_then_served_from_cache(self):
+        client = self.client_for(RefreshToken.for_user(self.admin).access_token)
+
+        self.assertEqual(len(self.user_queries(client)), 1)
+        self.assertEqual(self.user_queries(client), [])
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        client = self.client_for(RefreshToken.for_user(self.admin).access_token)
+        self.user_queries(client)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.is_admin = False
+            self.admin.save()
+        self.assertEqual(len(self.user_queries(client, expected_status=403)), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.is_active = False
+            self.admin.save()
+        self.assertEqual(len(self.user_queries(client, expected_status=401)), 1)
+
+    def test_cached_user_loads_deferred_password_on_access(self):
+        client = self.client_for(RefreshToken.for_user(self.admin).access_token)
+        self.user_queries(client)
+
+        response = client.get(self.HEALTH_URL)
+
+        user = response.wsgi_request.user
+        self.assertEqual((user.pk, user.email, user.is_admin), (self.admin.pk, 'admin@example.com', True))
+        self.assertTrue(user.check_password('password123'))
+
+    @override_settings(JWT_STATELESS_USER_CLAIMS=True)
+    def test_stateless_mode_trusts_login_claims(self):
+        login = APIClient().post(
+            '/api/accounts/login/', {'email': 'admin@example.com', 'password': 'password123'}, format='json'
+        )
+        client = self.client_for(login.data['access'])
+
+        self.assertEqual(self.user_queries(client), [])
+        User.objects.filter(pk=self.admin.pk).update(is_admin=False)
+        self.assertEqual(self.user_queries(client), [])
+
+        # Tokens without the claims still resolve through the cache.
+        plain = self.client_for(RefreshToken.for_user(self.admin).access_token)
+        self.assertEqual(len(self.user_queries(plain, expected_status=403)), 1)
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        revocation_store.reset()
+        self.user = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def logout(self, refresh):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/accounts/logout/', {'refresh': str(refresh)}, format='json')
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+
+        response = self.logout(self.refresh)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(RevokedToken.objects.values_list('token_type', 'user_id')),
+            {('access', self.user.pk), ('refresh', self.user.pk)},
+        )
+        self.assertTrue(revocation_store.is_revoked(self.refresh['jti']))
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_logout_rejects_another_users_refresh_token(self):
+        other = User.objects.create_user(email='other@example.com', password='password123', name='Other')
+
+        response = self.logout(RefreshToken.for_user(other))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_unrevoked_tokens_are_checked_without_queries(self):
+        revocation_store.sync()
+
+        with self.assertNumQueries(0):
+            for _ in range(100):
+                self.assertFalse(revocation_store.is_revoked(self.refresh['jti']))
+
+    def test_filter_false_positives_are_confirmed_once(self):
+        revocation_store.sync()
+
+        with mock.patch.object(BloomFilter, '__contains__', return_value=True):
+            with self.assertNumQueries(1):
+                self.assertFalse(revocation_store.is_revoked('not-revoked'))
+                self.assertFalse(revocation_store.is_revoked('not-revoked'))
+        self.assertEqual(revocation_store.stats()['lookups'], 1)
+
+    def test_revocations_from_other_processes_arrive_on_sync(self):
+        now = [0.0]
+        store = RevocationStore(capacity=100, error_rate=0.01, cache_size=10, sync_interval=5, clock=lambda: now[0])
+        self.assertFalse(store.is_revoked('elsewhere'))
+
+        RevokedToken.objects.create(
+            jti='elsewhere', token_type='access', expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertFalse(store.is_revoked('elsewhere'))
+        now[0] = 6
+        self.assertTrue(store.is_revoked('elsewhere'))
+
+    def test_compaction_deletes_expired_revocations(self):
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=f'old-{i}', token_type='access', expires_at=timezone.now() - timedelta(minutes=1))
+            for i in range(3)
+        ] + [RevokedToken(jti='live', token_type='refresh', expires_at=timezone.now() + timedelta(days=1))])
+        out = StringIO()
+
+        call_command('compact_revoked_tokens', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertIn('Deleted 3 expired token revocations', out.getvalue())
+        self.assertTrue(revocation_store.is_revoked('live'))
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PasswordHashingTests(TestCase):
+    LOGIN_URL = '/api/accounts/login/'
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+
+    def login(self, email='buyer@example.com', password='password123'):
+        return APIClient().post(self.LOGIN_URL, {'email': email, 'password': password}, format='json')
+
+    def test_pool_refuses_work_beyond_workers_and_queue(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+        futures = [pool.submit(release.wait) for _ in range(2)]
+
+        with self.assertRaises(HashingPoolSaturated):
+            pool.submit(release.wait)
+        release.set()
+        for future in futures:
+            future.result()
+
+        self.assertEqual(pool.run(len, 'abc'), 3)
+        self.assertEqual(pool.stats()['rejected'], 1)
+
+    def test_saturated_pool_returns_503(self):
+        with mock.patch.object(hashing_pool, 'submit', side_effect=HashingPoolSaturated()):
+            login = self.login()
+            register = APIClient().post('/api/accounts/register/', {
+                'email': 'new@example.com', 'name': 'New',
+                'password': 'password123', 'password_confirm': 'password123',
+            }, format='json')
+
+        for response in (login, register):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+
+    def test_register_stores_a_hash_made_on_the_pool(self):
+        completed = hashing_pool.stats()['completed']
+
+        response = APIClient().post('/api/accounts/register/', {
+            'email': 'new@EXAMPLE.com', 'name': 'New',
+            'password': 'password123', 'password_confirm': 'password123',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email='new@example.com')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('password123'))
+        self.assertEqual(hashing_pool.stats()['completed'], completed + 1)
+
+    def test_unknown_email_costs_a_hash_too(self):
+        completed = hashing_pool.stats()['completed']
+
+        self.assertEqual(self.login(email='nobody@example.com').status_code, 400)
+        self.assertEqual(self.login(password='wrong-password').status_code, 400)
+        self.assertEqual(hashing_pool.stats()['completed'], completed + 2)
+
+    def test_login_upgrades_hashes_to_the_current_work_factor(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 1)
+
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 0)
+
+    def test_login_upgrades_hashes_from_other_hashers(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('password123', hasher='pbkdf2_sha1'))
+
+        self.assertEqual(self.login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_inactive_users_cannot_log_in(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'non_field_errors': ['Invalid credentials.']})
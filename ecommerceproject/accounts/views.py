@@ -1,39 +1,80 @@
-from rest_framework import status, generics
+from asgiref.sync import sync_to_async
+from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from ecommerceproject.async_views import AsyncAPIView
+from ecommerceproject.throttling import AccountRateThrottle, IPRateThrottle
+from .authentication import tokens_for_user
+from .hashing import HashingPoolSaturated, aauthenticate, ahash_password
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
-from .models import User
+from .revocation import revocation_store
 
 
-class RegisterView(generics.CreateAPIView):
-    queryset = User.objects.all()
-    serializer_class = RegisterSerializer
+def hashing_unavailable(exc):
+    return Response(
+        {'error': 'Server is busy, please retry shortly'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(exc.retry_after)},
+    )
+
+
+class RegisterView(AsyncAPIView):
     permission_classes = [AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
 
+    async def post(self, request):
+        serializer = RegisterSerializer(data=request.data)
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            encoded_password = await ahash_password(serializer.validated_data['password'])
+        except HashingPoolSaturated as e:
+            return hashing_unavailable(e)
 
+        await sync_to_async(serializer.save)(encoded_password=encoded_password)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class LoginView(APIView):
+
+class LoginView(AsyncAPIView):
     permission_classes = [AllowAny]
+    # Checked before the password hasher runs.
+    throttle_classes = [IPRateThrottle, AccountRateThrottle]
+    throttle_scope = 'login'
 
-    def post(self, request):
+    async def post(self, request):
         serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
-            user_data = UserSerializer(user).data
-            
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = await aauthenticate(
+                serializer.validated_data['email'], serializer.validated_data['password']
+            )
+        except HashingPoolSaturated as e:
+            return hashing_unavailable(e)
+        if user is None:
             return Response(
-                {
-                    'message': 'Login successful',
-                    'user': user_data,
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                },
-                status=status.HTTP_200_OK
+                {'non_field_errors': ['Invalid credentials.']},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        refresh = tokens_for_user(user)
+        user_data = UserSerializer(user).data
+
+        return Response(
+            {
+                'message': 'Login successful',
+                'user': user_data,
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            },
+            status=status.HTTP_200_OK
+        )
 
 
 class LogoutView(APIView):
@@ -41,10 +82,17 @@ class LogoutView(APIView):
 
     def post(self, request):
         try:
+            tokens = [request.auth]
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                refresh = RefreshToken(refresh_token)
+                if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+                    return Response(
+                        {'error': 'Refresh token belongs to another user'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                tokens.append(refresh)
+            revocation_store.revoke(tokens, user_id=request.user.pk)
             return Response(
                 {'message': 'Logged out successfully'},
                 status=status.HTTP_200_OK
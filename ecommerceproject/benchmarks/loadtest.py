@@ -0,0 +1,184 @@
+"""
+In-process load driver.
+
+Replays a weighted mix of browse, order and webhook traffic against the
+real URLconf through Django's test client from several threads, and
+records per-endpoint latencies.
+"""
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection
+from accounts.models import User
+from orders.models import Order
+from payments.fake_stripe import sign_payload
+from payments.models import Payment
+from products.models import Product
+from .utils import api_client, summarize
+
+
+def payment_succeeded_event(transaction_id, amount=1000):
+    return {
+        'id': f'evt_{transaction_id}_{random.getrandbits(32):x}',
+        'type': 'payment_intent.succeeded',
+        'data': {
+            'object': {
+                'id': transaction_id,
+                'object': 'payment_intent',
+                'status': 'succeeded',
+                'amount': amount,
+                'currency': 'bdt',
+                'client_secret': f'{transaction_id}_secret',
+                'charges': {'data': []},
+            },
+        },
+    }
+
+
+class LoadTest:
+    DEFAULT_MIX = {
+        'browse_products': 40,
+        'product_detail': 20,
+        'browse_categories': 10,
+        'order_history': 10,
+        'order_detail': 5,
+        'create_order': 10,
+        'webhook': 5,
+    }
+
+    def __init__(self, mix=None, sample_size=1000, rng=None):
+        self.mix = mix or self.DEFAULT_MIX
+        self.rng = rng or random.Random()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+        self.load_fixtures(sample_size)
+
+    def load_fixtures(self, sample_size):
+        """Pick ids to drive the scenarios from whatever data is in the database."""
+        self.product_ids = list(
+            Product.objects.filter(status='active').order_by('?')
+            .values_list('id', flat=True)[:sample_size]
+        )
+        self.customer_ids = list(
+            User.objects.filter(is_admin=False, orders__isnull=False).distinct()
+            .values_list('id', flat=True)[:sample_size]
+        )
+        self.order_pairs = list(
+            Order.objects.filter(user_id__in=self.customer_ids)
+            .values_list('id', 'user_id')[:sample_size]
+        )
+        self.pending_payments = list(
+            Payment.objects.filter(status='pending', provider='stripe')
+            .values_list('transaction_id', flat=True)[:sample_size]
+        )
+        self.product_pages = max(
+            1, min(Product.objects.count() // settings.REST_FRAMEWORK['PAGE_SIZE'], 500)
+        )
+        if not self.product_ids or not self.customer_ids:
+            raise RuntimeError('No products or customers with orders found; run seed_bench first.')
+
+        users = User.objects.in_bulk(self.customer_ids)
+        self.customer_clients = {user_id: api_client(user) for user_id, user in users.items()}
+        self.anonymous_client = api_client()
+
+    def customer(self):
+        user_id = self.rng.choice(self.customer_ids)
+        return user_id, self.customer_clients[user_id]
+
+    # Scenarios return (endpoint label, response).
+
+    def browse_products(self):
+        page = self.rng.randint(1, self.product_pages)
+        return 'product-list', self.anonymous_client.get(f'/api/products/?page={page}')
+
+    def product_detail(self):
+        product_id = self.rng.choice(self.product_ids)
+        return 'product-detail', self.anonymous_client.get(f'/api/products/{product_id}/')
+
+    def browse_categories(self):
+        return 'category-list', self.anonymous_client.get('/api/products/categories/')
+
+    def order_history(self):
+        _, client = self.customer()
+        return 'order-list', client.get('/api/orders/')
+
+    def order_detail(self):
+        order_id, user_id = self.rng.choice(self.order_pairs)
+        return 'order-detail', self.customer_clients[user_id].get(f'/api/orders/{order_id}/')
+
+    def create_order(self):
+        _, client = self.customer()
+        items = [
+            {'product_id': product_id, 'quantity': self.rng.randint(1, 3)}
+            for product_id in self.rng.sample(self.product_ids, self.rng.randint(1, 5))
+        ]
+        return 'order-create', client.post(
+            '/api/orders/', json.dumps({'items': items}), content_type='application/json'
+        )
+
+    def webhook(self):
+        if not self.pending_payments:
+            return self.browse_products()
+        event = payment_succeeded_event(self.rng.choice(self.pending_payments))
+        payload = json.dumps(event)
+        return 'stripe-webhook', self.anonymous_client.post(
+            '/api/payments/webhook/stripe/',
+            payload,
+            content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=sign_payload(payload, settings.STRIPE_WEBHOOK_SECRET),
+        )
+
+    def pick_scenario(self):
+        names = list(self.mix)
+        return getattr(self, self.rng.choices(names, weights=[self.mix[name] for name in names])[0])
+
+    def worker(self, requests):
+        try:
+            for _ in range(requests):
+                scenario = self.pick_scenario()
+                started = time.perf_counter()
+                try:
+                    label, response = scenario()
+                except Exception as exc:
+                    with self.lock:
+                        self.errors[type(exc).__name__] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    self.samples[label].append(elapsed)
+                    self.statuses[label][response.status_code] += 1
+        finally:
+            connection.close()
+
+    def run(self, requests, concurrency):
+        per_thread = [requests // concurrency] * concurrency
+        for i in range(requests % concurrency):
+            per_thread[i] += 1
+
+        threads = [threading.Thread(target=self.worker, args=(count,)) for count in per_thread]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - started
+        return self.report()
+
+    def report(self):
+        endpoints = {
+            label: {**summarize(samples), 'statuses': dict(self.statuses[label])}
+            for label, samples in sorted(self.samples.items())
+        }
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            'requests': total,
+            'elapsed_s': self.elapsed,
+            'throughput_rps': total / self.elapsed if self.elapsed else 0.0,
+            'errors': dict(self.errors),
+            'endpoints': endpoints,
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import path
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from orders.models import Order
+from orders.views import (
+    AsyncOrderListCreateAPIView,
+    AsyncOrderRetrieveUpdateAPIView,
+    OrderListCreateAPIView,
+    OrderRetrieveUpdateAPIView,
+)
+from products.models import Product
+from products.views import (
+    AsyncCategoryListCreateDestroyAPIView,
+    AsyncProductListCreateAPIView,
+    CategoryListCreateDestroyAPIView,
+    ProductListCreateAPIView,
+)
+from benchmarks.utils import summarize
+
+# Both variants of every read route side by side; used as ROOT_URLCONF
+# while the benchmark runs.
+VIEWS = {
+    'product-list': ('products/', ProductListCreateAPIView, AsyncProductListCreateAPIView),
+    'product-detail': ('products/<int:pk>/', ProductListCreateAPIView, AsyncProductListCreateAPIView),
+    'category-list': ('categories/', CategoryListCreateDestroyAPIView, AsyncCategoryListCreateDestroyAPIView),
+    'order-list': ('orders/', OrderListCreateAPIView, AsyncOrderListCreateAPIView),
+    'order-detail': ('orders/<int:pk>/', OrderRetrieveUpdateAPIView, AsyncOrderRetrieveUpdateAPIView),
+}
+urlpatterns = [
+    path(f'{mode}/{route}', view.as_view())
+    for route, sync_view, async_view in VIEWS.values()
+    for mode, view in (('sync', sync_view), ('async', async_view))
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput of the sync and async read views under ASGI at high '
+        'concurrency, driving Django\'s ASGI handler in-process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--endpoints', help=f'Comma-separated subset of {", ".join(VIEWS)}')
+        parser.add_argument(
+            '--catalog-cache', action='store_true',
+            help='Leave the catalog cache on; by default every catalog read goes to the database',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        endpoints = options['endpoints'].split(',') if options['endpoints'] else list(VIEWS)
+        unknown = set(endpoints) - set(VIEWS)
+        if unknown:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}')
+
+        rng = random.Random(options['seed'])
+        self.load_fixtures()
+        overrides = {'ROOT_URLCONF': __name__, 'THROTTLE_RATES': {}}
+        if not options['catalog_cache']:
+            overrides['CACHES'] = {
+                **settings.CACHES,
+                'bench-no-cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            }
+            overrides['CATALOG_CACHE_ALIAS'] = 'bench-no-cache'
+
+        report = {}
+        with override_settings(**overrides):
+            handler = ASGIHandler()
+            for endpoint in endpoints:
+                report[endpoint] = {}
+                for mode in ('sync', 'async'):
+                    targets = [self.target(endpoint, mode, rng) for _ in range(options['requests'])]
+                    report[endpoint][mode] = asyncio.run(
+                        self.run(handler, targets, options['concurrency'])
+                    )
+        connection.close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f'{options["requests"]} requests per endpoint and mode, concurrency '
+            f'{options["concurrency"]}, on {connection.vendor}'
+        )
+        self.stdout.write(
+            f'{"endpoint":<16} {"mode":<6} {"req/s":>9} {"p50 ms":>9} {"p99 ms":>9}  statuses'
+        )
+        for endpoint, modes in report.items():
+            for mode, stats in modes.items():
+                self.stdout.write(
+                    f'{endpoint:<16} {mode:<6} {stats["throughput_rps"]:>9.1f} '
+                    f'{stats["p50"]:>9.2f} {stats["p99"]:>9.2f}  {stats["statuses"]}'
+                )
+            speedup = modes['async']['throughput_rps'] / (modes['sync']['throughput_rps'] or 1)
+            self.stdout.write(f'{"":<16} async/sync throughput: {speedup:.2f}x')
+
+    def load_fixtures(self):
+        self.product_ids = list(Product.objects.filter(status='active').values_list('id', flat=True)[:1000])
+        self.order_pairs = list(
+            Order.objects.filter(user__is_admin=False).values_list('id', 'user_id')[:1000]
+        )
+        if not self.product_ids or not self.order_pairs:
+            raise CommandError('No products or orders found; run seed_bench first.')
+        self.product_pages = max(1, min(len(self.product_ids) // settings.REST_FRAMEWORK['PAGE_SIZE'], 50))
+        users = User.objects.in_bulk({user_id for _, user_id in self.order_pairs})
+        self.tokens = {
+            user_id: str(RefreshToken.for_user(user).access_token) for user_id, user in users.items()
+        }
+
+    def target(self, endpoint, mode, rng):
+        """(path, bearer token or None) for one request."""
+        if endpoint == 'product-list':
+            return f'/{mode}/products/?page={rng.randint(1, self.product_pages)}', None
+        if endpoint == 'product-detail':
+            return f'/{mode}/products/{rng.choice(self.product_ids)}/', None
+        if endpoint == 'category-list':
+            return f'/{mode}/categories/', None
+        order_id, user_id = rng.choice(self.order_pairs)
+        if endpoint == 'order-list':
+            return f'/{mode}/orders/', self.tokens[user_id]
+        return f'/{mode}/orders/{order_id}/', self.tokens[user_id]
+
+    async def run(self, handler, targets, concurrency):
+        queue = list(reversed(targets))
+        samples, statuses = [], {}
+
+        async def worker():
+            while queue:
+                url, token = queue.pop()
+                started = time.perf_counter()
+                status = await self.request(handler, url, token)
+                samples.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return {
+            **summarize(samples),
+            'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+            'statuses': statuses,
+        }
+
+    async def request(self, handler, url, token):
+        """One GET through the ASGI handler, as an ASGI server would send it."""
+        parts = urlsplit(url)
+        host = next((host for host in settings.ALLOWED_HOSTS if host and host != '*'), 'localhost')
+        headers = [(b'host', host.lstrip('.').encode())]
+        if token:
+            headers.append((b'authorization', f'Bearer {token}'.encode()))
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': parts.path,
+            'raw_path': parts.path.encode(),
+            'query_string': parts.query.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        body_sent = asyncio.Event()
+        response = {}
+
+        async def receive():
+            if not body_sent.is_set():
+                body_sent.set()
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Nothing more to read; the handler stops waiting once it responds.
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+
+        await handler(scope, receive, send)
+        return response.get('status')
@@ -0,0 +1,95 @@
+import json
+from io import BytesIO
+from itertools import cycle, islice
+from unittest import mock
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from ecommerceproject import fastjson
+from orders.models import Order
+from orders.serializers import OrderListSerializer
+from products.models import Product
+from products.serializers import ProductListSerializer
+from benchmarks.utils import summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the stock JSON renderer and parser with the orjson-based ones '
+        'on large product and order list responses.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per response')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per measurement')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        if fastjson.orjson is None:
+            raise CommandError('orjson is not installed.')
+
+        pages = {
+            'products': self.page(
+                Product.objects.order_by('id'), ProductListSerializer, options['rows']
+            ),
+            'orders': self.page(
+                Order.objects.select_related('user').annotate(item_count=Count('items')).order_by('-id'),
+                OrderListSerializer, options['rows'],
+            ),
+        }
+        stock_renderer, fast_renderer = JSONRenderer(), fastjson.FastJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), fastjson.FastJSONParser()
+
+        def render_fallback(data):
+            with mock.patch.object(fastjson, 'orjson', None):
+                return fast_renderer.render(data)
+
+        report = {}
+        for name, data in pages.items():
+            body = stock_renderer.render(data)
+            variants = {
+                'render stock': lambda: stock_renderer.render(data),
+                'render fast': lambda: fast_renderer.render(data),
+                'render fallback': lambda: render_fallback(data),
+                'parse stock': lambda: stock_parser.parse(BytesIO(body)),
+                'parse fast': lambda: fast_parser.parse(BytesIO(body)),
+            }
+            report[name] = {
+                'bytes': len(body),
+                'identical': fast_renderer.render(data) == body == render_fallback(data),
+                'timings': {},
+            }
+            for variant, func in variants.items():
+                func()  # warm up
+                report[name]['timings'][variant] = summarize(timed(func, options['repeat']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{options["rows"]} rows per response, {options["repeat"]} runs each')
+        self.stdout.write(f'{"response":<10} {"variant":<16} {"p50 ms":>9} {"p95 ms":>9} {"speedup":>8}')
+        for name, result in report.items():
+            timings = result['timings']
+            for variant, stats in timings.items():
+                baseline = timings[variant.split()[0] + ' stock']['p50']
+                self.stdout.write(
+                    f'{name:<10} {variant:<16} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} '
+                    f'{baseline / (stats["p50"] or 1):>7.1f}x'
+                )
+            self.stdout.write(
+                f'{"":<10} {result["bytes"]} bytes, identical output: {result["identical"]}'
+            )
+
+    def page(self, queryset, serializer_class, rows):
+        """A paginated response body of rows serialized rows, repeating rows if there are fewer."""
+        instances = list(queryset[:rows])
+        if not instances:
+            raise CommandError('No products or orders found; run seed_bench first.')
+        instances = list(islice(cycle(instances), rows))
+        return {
+            'next': None,
+            'previous': None,
+            'results': serializer_class(instances, many=True).data,
+        }
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ecommerceproject.pagination import KeysetPagination
+from orders.models import Order
+from benchmarks.utils import api_client, explicit_timestamps, get_bench_user, summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare OFFSET page-number pagination with keyset pagination on '
+        '/api/orders/ for shallow and deep pages.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', default='1,100,1000,10000',
+            help='Comma separated page numbers to measure (default: 1,100,1000,10000)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Requests per measurement')
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Create orders for the bench user until the deepest page exists',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        pages = [int(page) for page in options['pages'].split(',')]
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        user = get_bench_user()
+
+        needed = max(pages) * page_size
+        existing = Order.objects.count()
+        if existing < needed:
+            if not options['seed']:
+                self.stderr.write(
+                    f'Only {existing} orders exist but page {max(pages)} needs {needed}. '
+                    f'Run with --seed or use seed_bench first.'
+                )
+                return
+            self.seed_orders(user, needed - existing, options['batch_size'])
+
+        client = api_client(user)
+        paginator = KeysetPagination()
+        ordered = Order.objects.order_by(*paginator.ordering)
+
+        self.stdout.write(f'{"page":>8} {"mode":>8} {"p50 ms":>10} {"p95 ms":>10} {"max ms":>10}')
+        for page in pages:
+            offset_url = f'/api/orders/?page={page}'
+            if page == 1:
+                keyset_url = '/api/orders/?cursor='
+            else:
+                boundary = ordered[(page - 1) * page_size - 1]
+                keyset_url = f'/api/orders/?cursor={paginator.encode_cursor(boundary, reverse=False)}'
+
+            for mode, url in (('offset', offset_url), ('keyset', keyset_url)):
+                client.get(url)  # warm up
+                samples = timed(lambda: client.get(url), options['repeat'])
+                stats = summarize(samples)
+                self.stdout.write(
+                    f'{page:>8} {mode:>8} {stats["p50"]:>10.2f} {stats["p95"]:>10.2f} '
+                    f'{max(samples) * 1000:>10.2f}'
+                )
+
+    def seed_orders(self, user, count, batch_size):
+        self.stdout.write(f'Seeding {count} orders...')
+        # One order per second going back in time, so created_at is distinct.
+        start = timezone.now() - timedelta(seconds=count)
+        with explicit_timestamps(Order):
+            for offset in range(0, count, batch_size):
+                Order.objects.bulk_create(
+                    Order(
+                        user=user,
+                        total_amount=Decimal('10.00'),
+                        created_at=start + timedelta(seconds=offset + i),
+                    )
+                    for i in range(min(batch_size, count - offset))
+                )
@@ -0,0 +1,123 @@
+import json
+import time
+from collections import Counter
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from orders.models import Order
+from payments.fake_stripe import FakeStripeServer
+from payments.inbox import process_pending_events
+from payments.models import Payment
+from payments.stripe_service import get_stripe_gateway
+from benchmarks.utils import api_client, get_bench_user, summarize
+
+WEBHOOK_SECRET = 'whsec_bench'
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the payment path end to end against the bundled fake Stripe: '
+        'create intent, signed webhook delivery and inbox processing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=500)
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Fake Stripe latency per request')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Fake Stripe 500 probability')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        user = get_bench_user('bench-payments@example.com', is_admin=False)
+        client = api_client(user)
+        webhook_client = api_client()
+        webhook_statuses = Counter()
+        webhook_samples = []
+
+        def deliver(payload, signature):
+            started = time.perf_counter()
+            response = webhook_client.post(
+                '/api/payments/webhook/stripe/', payload,
+                content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+            )
+            webhook_samples.append(time.perf_counter() - started)
+            webhook_statuses[response.status_code] += 1
+
+        server = FakeStripeServer(
+            webhook_secret=WEBHOOK_SECRET,
+            webhook_sink=deliver,
+            latency=options['latency_ms'] / 1000,
+            failure_rate=options['failure_rate'],
+            seed=options['seed'],
+        ).start()
+        try:
+            with override_settings(
+                STRIPE_API_BASE=server.url,
+                STRIPE_SECRET_KEY='sk_test_bench',
+                STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+            ):
+                report = self.run(client, server.fake, options['payments'])
+        finally:
+            server.stop()
+
+        report['webhook'] = {**summarize(webhook_samples), 'statuses': dict(webhook_statuses)}
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{"step":<16} {"count":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}  statuses')
+        for step in ('create_intent', 'webhook'):
+            stats = report[step]
+            self.stdout.write(
+                f'{step:<16} {stats["count"]:>7} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} '
+                f'{stats["p99"]:>9.2f}  {stats["statuses"]}'
+            )
+        self.stdout.write(
+            f'Inbox drained in {report["drain_s"]:.2f}s; '
+            f'{report["paid_orders"]}/{options["payments"]} orders paid'
+        )
+        self.stdout.write(f'Gateway: {report["gateway"]}')
+
+    def run(self, client, fake, total):
+        orders = self.create_orders(total)
+
+        samples = []
+        statuses = Counter()
+        intent_ids = []
+        for order in orders:
+            started = time.perf_counter()
+            response = client.post(
+                '/api/payments/', json.dumps({'order_id': order.id, 'provider': 'stripe'}),
+                content_type='application/json',
+            )
+            samples.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            if response.status_code == 201:
+                intent_ids.append(response.json()['payment_intent_id'])
+
+        for intent_id in intent_ids:
+            fake.confirm_intent(intent_id, {})
+
+        started = time.perf_counter()
+        while process_pending_events():
+            pass
+        drain = time.perf_counter() - started
+
+        return {
+            'create_intent': {**summarize(samples), 'statuses': dict(statuses)},
+            'drain_s': drain,
+            'paid_orders': Payment.objects.filter(
+                order__in=orders, status='success', order__status='paid'
+            ).count(),
+            'gateway': get_stripe_gateway().stats(),
+        }
+
+    def create_orders(self, total):
+        user = get_bench_user('bench-payments@example.com', is_admin=False)
+        orders = Order.objects.bulk_create(
+            Order(user=user, total_amount=Decimal('25.00')) for _ in range(total)
+        )
+        if orders and orders[0].pk is None:
+            # MySQL does not return primary keys from bulk_create.
+            orders = list(Order.objects.filter(user=user, payment__isnull=True).order_by('-id')[:total])
+        return orders
@@ -0,0 +1,68 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from ecommerceproject.fastjson import FastJSONRenderer
+from orders.models import Order
+from orders.serializers import OrderListProjection, OrderListSerializer
+from payments.models import Payment
+from payments.serializers import PaymentProjection, PaymentSerializer
+from products.models import Product
+from products.serializers import ProductListProjection, ProductListSerializer
+from benchmarks.utils import summarize, timed
+
+# (queryset as the list view builds it, model serializer, projection)
+ENDPOINTS = {
+    'products': (lambda: Product.objects.all(), ProductListSerializer, ProductListProjection),
+    'orders': (
+        lambda: Order.objects.select_related('user').annotate(item_count=Count('items')),
+        OrderListSerializer, OrderListProjection,
+    ),
+    'payments': (lambda: Payment.objects.all(), PaymentSerializer, PaymentProjection),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare model serializers with their values() projections on list pages: '
+        'query, serialization and rendering of one page.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=30, help='Timed runs per measurement')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        rows, renderer = options['rows'], FastJSONRenderer()
+        report = {}
+        for name, (queryset, serializer_class, projection_class) in ENDPOINTS.items():
+            if not queryset().exists():
+                raise CommandError(f'No {name} found; run seed_bench first.')
+
+            def with_serializer():
+                page = list(queryset().order_by('-created_at', '-id')[:rows])
+                return renderer.render(serializer_class(page, many=True).data)
+
+            def with_projection():
+                page = list(projection_class.project(queryset()).order_by('-created_at', '-id')[:rows])
+                return renderer.render(projection_class(page, many=True).data)
+
+            report[name] = {'identical': with_serializer() == with_projection(), 'timings': {}}
+            for variant, func in (('serializer', with_serializer), ('projection', with_projection)):
+                func()  # warm up
+                report[name]['timings'][variant] = summarize(timed(func, options['repeat']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{rows} rows per page, {options["repeat"]} runs each')
+        self.stdout.write(f'{"endpoint":<10} {"variant":<11} {"p50 ms":>9} {"p95 ms":>9} {"speedup":>8}')
+        for name, result in report.items():
+            timings = result['timings']
+            for variant, stats in timings.items():
+                speedup = timings['serializer']['p50'] / (stats['p50'] or 1)
+                self.stdout.write(
+                    f'{name:<10} {variant:<11} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} {speedup:>7.1f}x'
+                )
+            self.stdout.write(f'{"":<10} identical output: {result["identical"]}')
@@ -0,0 +1,63 @@
+import json
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from ecommerceproject.throttling import IPRateThrottle, counter
+from benchmarks.utils import summarize
+
+
+class ThrottledView(APIView):
+    throttle_scope = 'bench'
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark the sliding-window throttle check against the configured '
+        'throttle cache, for allowed and rejected requests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=20_000)
+        parser.add_argument('--clients', type=int, default=1000, help='Distinct client addresses')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = ThrottledView()
+        requests = [
+            view.initialize_request(factory.get('/', REMOTE_ADDR=f'10.{i // 65536}.{i // 256 % 256}.{i % 256}'))
+            for i in range(options['clients'])
+        ]
+        run = time.time_ns()
+
+        report = {}
+        # A limit no client reaches measures the allowed path; a limit of
+        # zero measures the rejected path, which also computes the wait.
+        for label, rate in (('allowed', f'{options["checks"]}/h'), ('rejected', '0/h')):
+            throttle = IPRateThrottle()
+            view.throttle_scope = f'bench-{run}-{label}'
+            samples = []
+            with override_settings(THROTTLE_RATES={**settings.THROTTLE_RATES, f'{view.throttle_scope}.ip': rate}):
+                for i in range(options['checks']):
+                    request = requests[i % len(requests)]
+                    started = time.perf_counter()
+                    throttle.allow_request(request, view)
+                    samples.append(time.perf_counter() - started)
+            report[label] = summarize(samples)
+
+        report['cache'] = counter.cache.__class__.__name__
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'Throttle cache: {report["cache"]}')
+        self.stdout.write(f'{"path":<10} {"checks":>8} {"mean us":>9} {"p50 us":>9} {"p99 us":>9}')
+        for label in ('allowed', 'rejected'):
+            stats = report[label]
+            self.stdout.write(
+                f'{label:<10} {stats["count"]:>8} {stats["mean"] * 1000:>9.1f} '
+                f'{stats["p50"] * 1000:>9.1f} {stats["p99"] * 1000:>9.1f}'
+            )
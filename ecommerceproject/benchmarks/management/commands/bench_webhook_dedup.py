@@ -0,0 +1,99 @@
+import json
+import time
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from orders.models import Order, OrderItem
+from orders.reservations import hold_stock_for_order
+from payments.fake_stripe import sign_payload
+from payments.inbox import process_pending_events, recent_events
+from payments.models import Payment, WebhookEvent
+from products.models import Product
+from benchmarks.loadtest import payment_succeeded_event
+from benchmarks.utils import api_client, get_bench_user, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay the same payment_intent.succeeded event many times against the '
+        'Stripe webhook and report latency, queries and resulting stock.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=10_000)
+        parser.add_argument(
+            '--no-front-cache', action='store_true',
+            help='Clear the in-memory LRU before every delivery so only the unique constraint deduplicates',
+        )
+
+    def handle(self, *args, **options):
+        secret = settings.STRIPE_WEBHOOK_SECRET or 'whsec_bench'
+        with override_settings(STRIPE_WEBHOOK_SECRET=secret):
+            self.run(options['events'], options['no_front_cache'], secret)
+
+    def run(self, total, no_front_cache, secret):
+        payment, product = self.create_fixture()
+        client = api_client()
+        payload = json.dumps(payment_succeeded_event(payment.transaction_id))
+        headers = {'HTTP_STRIPE_SIGNATURE': sign_payload(payload, secret)}
+        recent_events.clear()
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        samples = []
+        statuses = {}
+        with connection.execute_wrapper(count_query):
+            for _ in range(total):
+                if no_front_cache:
+                    recent_events.clear()
+                started = time.perf_counter()
+                response = client.post(
+                    '/api/payments/webhook/stripe/', payload,
+                    content_type='application/json', **headers,
+                )
+                samples.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        stored = WebhookEvent.objects.filter(event_id=json.loads(payload)['id']).count()
+        while process_pending_events():
+            pass
+        product.refresh_from_db()
+
+        stats = summarize(samples)
+        self.stdout.write(
+            f'{total} deliveries: p50 {stats["p50"]:.3f} ms, p95 {stats["p95"]:.3f} ms, '
+            f'p99 {stats["p99"]:.3f} ms, statuses {statuses}'
+        )
+        self.stdout.write(
+            f'Queries during replay: {queries} ({queries / total:.4f} per delivery), '
+            f'front cache hits: {recent_events.hits}'
+        )
+        self.stdout.write(
+            f'Inbox rows stored: {stored}; stock {product.stock} (expected 99), '
+            f'reserved {product.reserved_stock}'
+        )
+
+    def create_fixture(self):
+        user = get_bench_user('bench-webhook@example.com', is_admin=False)
+        stamp = f'{time.time_ns():x}'
+        product = Product.objects.create(
+            name='Webhook bench product', sku=f'BENCH-WEBHOOK-{stamp}',
+            description='Benchmark product', price=Decimal('10.00'), stock=100,
+        )
+        order = Order.objects.create(user=user, total_amount=Decimal('10.00'))
+        items = OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1,
+                      price=product.price, subtotal=product.price)
+        ])
+        hold_stock_for_order(order, items)
+        payment = Payment.objects.create(
+            order=order, provider='stripe', transaction_id=f'pi_bench_webhook_{stamp}'
+        )
+        return payment, product
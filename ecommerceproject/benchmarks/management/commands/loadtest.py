@@ -0,0 +1,62 @@
+import json
+import random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from benchmarks.loadtest import LoadTest
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a realistic mix of browse, order and webhook traffic against the '
+        'URLconf and report p50/p95/p99 latency per endpoint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--mix',
+            help='Scenario weights, e.g. browse_products=60,create_order=30,webhook=10',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        mix = None
+        if options['mix']:
+            try:
+                mix = {
+                    name: int(weight)
+                    for name, weight in (part.split('=') for part in options['mix'].split(','))
+                }
+            except ValueError:
+                raise CommandError('--mix must look like name=weight,name=weight')
+            unknown = set(mix) - set(LoadTest.DEFAULT_MIX)
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        concurrency = options['concurrency']
+        if connection.vendor == 'sqlite' and concurrency > 1:
+            self.stderr.write('SQLite serializes writers; expect lock waits under concurrency.')
+
+        load_test = LoadTest(mix=mix, rng=random.Random(options['seed']))
+        report = load_test.run(options['requests'], concurrency)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f'{report["requests"]} requests in {report["elapsed_s"]:.2f}s '
+            f'({report["throughput_rps"]:.1f} req/s) on {connection.vendor}'
+        )
+        if report['errors']:
+            self.stdout.write(self.style.WARNING(f'Errors: {report["errors"]}'))
+        self.stdout.write(
+            f'{"endpoint":<18} {"count":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}  statuses'
+        )
+        for label, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'{label:<18} {stats["count"]:>7} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} '
+                f'{stats["p99"]:>9.2f}  {stats["statuses"]}'
+            )
@@ -0,0 +1,189 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from accounts.models import User
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from payments.payloads import save_payloads
+from products.models import Category, Product, ProductCategory
+from benchmarks.utils import explicit_timestamps
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-generate a large benchmark dataset: users, products, category links, '
+        'orders, order items and payments.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--products', type=int, default=50_000)
+        parser.add_argument('--categories', type=int, default=100)
+        parser.add_argument('--categories-per-product', type=int, default=3)
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--max-items-per-order', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.run = timezone.now().strftime('%Y%m%d%H%M%S')
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days']).total_seconds()
+
+        started = time.perf_counter()
+        with explicit_timestamps(User, Product, Order, Payment):
+            user_ids = self.seed_users(options['users'])
+            category_ids = self.seed_categories(options['categories'])
+            prices = self.seed_products(options['products'])
+            self.seed_category_links(list(prices), category_ids, options['categories_per_product'])
+            self.seed_orders(user_ids, prices, options['orders'], options['max_items_per_order'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded run {self.run} in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def timestamp(self):
+        return self.now - timedelta(seconds=self.rng.random() * self.span)
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def report(self, label, done, total, started):
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(f'  {label}: {done}/{total} ({rate:,.0f} rows/s)')
+
+    def new_ids(self, model, after_id):
+        """Primary keys inserted after after_id, in insertion order (MySQL returns none from bulk_create)."""
+        return list(
+            model.objects.filter(pk__gt=after_id).order_by('pk').values_list('pk', flat=True)
+        )
+
+    def max_id(self, model):
+        return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def seed_users(self, total):
+        # Hash once; PBKDF2 per row would dominate the run time.
+        password = make_password('bench-password')
+        after_id = self.max_id(User)
+        started = time.perf_counter()
+        for start, size in self.batches(total):
+            User.objects.bulk_create(
+                User(
+                    email=f'bench-{self.run}-{start + i}@example.com',
+                    name=f'Bench User {start + i}',
+                    password=password,
+                    created_at=self.timestamp(),
+                )
+                for i in range(size)
+            )
+            self.report('users', start + size, total, started)
+        return self.new_ids(User, after_id)
+
+    def seed_categories(self, total):
+        after_id = self.max_id(Category)
+        Category.objects.bulk_create(
+            Category(name=f'Bench {self.run} Category {i}') for i in range(total)
+        )
+        return self.new_ids(Category, after_id)
+
+    def seed_products(self, total):
+        after_id = self.max_id(Product)
+        started = time.perf_counter()
+        for start, size in self.batches(total):
+            Product.objects.bulk_create(
+                Product(
+                    name=f'Bench Product {start + i}',
+                    sku=f'BENCH-{self.run}-{start + i}',
+                    description='Benchmark product',
+                    price=Decimal(self.rng.randint(100, 100_000)) / 100,
+                    stock=1_000_000,
+                    created_at=self.timestamp(),
+                )
+                for i in range(size)
+            )
+            self.report('products', start + size, total, started)
+        return dict(
+            Product.objects.filter(pk__gt=after_id).values_list('pk', 'price')
+        )
+
+    def seed_category_links(self, product_ids, category_ids, per_product):
+        if not category_ids:
+            return
+        per_product = min(per_product, len(category_ids))
+        started = time.perf_counter()
+        for start, size in self.batches(len(product_ids)):
+            ProductCategory.objects.bulk_create(
+                ProductCategory(product_id=product_id, category_id=category_id)
+                for product_id in product_ids[start:start + size]
+                for category_id in self.rng.sample(category_ids, per_product)
+            )
+            self.report('category links', start + size, len(product_ids), started)
+
+    def seed_orders(self, user_ids, prices, total, max_items):
+        product_ids = list(prices)
+        statuses = ['paid'] * 7 + ['pending'] * 2 + ['cancelled']
+        started = time.perf_counter()
+
+        for start, size in self.batches(total):
+            plans = []
+            for _ in range(size):
+                lines = [
+                    (product_id, self.rng.randint(1, 3))
+                    for product_id in self.rng.sample(product_ids, self.rng.randint(1, max_items))
+                ]
+                total_amount = sum(prices[product_id] * quantity for product_id, quantity in lines)
+                plans.append((lines, total_amount, self.rng.choice(statuses), self.timestamp()))
+
+            with transaction.atomic():
+                after_id = self.max_id(Order)
+                Order.objects.bulk_create(
+                    Order(
+                        user_id=self.rng.choice(user_ids),
+                        total_amount=total_amount,
+                        status=status,
+                        created_at=created_at,
+                    )
+                    for _, total_amount, status, created_at in plans
+                )
+                order_ids = self.new_ids(Order, after_id)
+
+                OrderItem.objects.bulk_create(
+                    (
+                        OrderItem(
+                            order_id=order_id,
+                            product_id=product_id,
+                            quantity=quantity,
+                            price=prices[product_id],
+                            subtotal=prices[product_id] * quantity,
+                        )
+                        for order_id, (lines, _, _, _) in zip(order_ids, plans)
+                        for product_id, quantity in lines
+                    ),
+                    batch_size=self.batch_size,
+                )
+                after_id = self.max_id(Payment)
+                Payment.objects.bulk_create(
+                    Payment(
+                        order_id=order_id,
+                        provider='stripe',
+                        transaction_id=f'pi_bench_{self.run}_{order_id}',
+                        status={'paid': 'success', 'pending': 'pending'}.get(status, 'failed'),
+                        created_at=created_at,
+                    )
+                    for order_id, (_, _, status, created_at) in zip(order_ids, plans)
+                )
+                save_payloads(
+                    (payment_id, {'amount': str(total_amount), 'currency': 'bdt'})
+                    for payment_id, (_, total_amount, _, _) in zip(self.new_ids(Payment, after_id), plans)
+                )
+
+            self.report('orders', start + size, total, started)
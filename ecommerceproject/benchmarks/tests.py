@@ -0,0 +1,36 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from orders.models import Order, OrderItem
+from payments.models import Payment
+from products.models import Product, ProductCategory
+from .loadtest import LoadTest
+
+
+class BenchmarkToolingTests(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('In-memory SQLite does not support concurrent connections.')
+
+    def test_seed_then_replay_traffic(self):
+        call_command(
+            'seed_bench', users=5, products=20, categories=4, orders=30,
+            batch_size=7, stdout=StringIO(),
+        )
+
+        self.assertEqual(Product.objects.count(), 20)
+        self.assertEqual(ProductCategory.objects.count(), 60)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertEqual(Payment.objects.count(), 30)
+        self.assertTrue(OrderItem.objects.exists())
+        for order in Order.objects.prefetch_related('items'):
+            self.assertEqual(order.total_amount, sum(item.subtotal for item in order.items.all()))
+
+        report = LoadTest().run(requests=40, concurrency=2)
+
+        self.assertEqual(report['requests'], 40)
+        self.assertEqual(report['errors'], {})
+        for stats in report['endpoints'].values():
+            self.assertLessEqual(stats['p50'], stats['p99'])
+            self.assertTrue(all(status < 500 for status in stats['statuses']))
@@ -0,0 +1,75 @@
+import math
+import statistics
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+
+
+def get_bench_user(email='bench-admin@example.com', is_admin=True):
+    """Return (creating if needed) the user the benchmarks authenticate as."""
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(
+            email=email, password='bench-password', name='Bench User', is_admin=is_admin
+        )
+    return user
+
+
+def api_client(user=None):
+    """
+    Django test client that talks to the real URLconf, authenticated with a
+    freshly minted JWT when a user is given.
+    """
+    host = next((host for host in settings.ALLOWED_HOSTS if host and host != '*'), 'localhost')
+    headers = {'HTTP_HOST': host.lstrip('.')}
+    if user is not None:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+    return Client(**headers)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    return {
+        'count': len(samples),
+        'mean': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50': percentile(samples, 50) * 1000,
+        'p95': percentile(samples, 95) * 1000,
+        'p99': percentile(samples, 99) * 1000,
+    }
+
+
+def timed(func, repeat):
+    """Call func repeat times and return the individual durations in seconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create keep caller-supplied created_at values instead of
+    stamping every row with the same auto_now_add time.
+    """
+    fields = [model._meta.get_field('created_at') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
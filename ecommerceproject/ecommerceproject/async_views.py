@@ -0,0 +1,102 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers may be ``async def``.
+
+    Django serves the view natively on the event loop under ASGI (and
+    through async_to_sync under WSGI and the test client). Authentication,
+    permissions and throttles still run as DRF's usual synchronous
+    ``initial()``, moved to a worker thread, so every existing policy class
+    keeps working unchanged. Async handlers must not touch the ORM
+    synchronously: use the ``a``-prefixed queryset methods or sync_to_async.
+    Plain ``def`` handlers, e.g. the write methods inherited from a sync
+    view, are run on a worker thread as before.
+    """
+
+    # Handlers may mix def and async def; dispatch() is always async.
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListModelMixin:
+    """ListModelMixin.list() on the async ORM, for GenericAPIView subclasses."""
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset.aiterator()], many=True)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        # Paginators without an async path are run on a worker thread.
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+
+class AsyncRetrieveModelMixin:
+    """RetrieveModelMixin.retrieve() on the async ORM, for GenericAPIView subclasses."""
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+def select_view(name, sync_view, async_view, **initkwargs):
+    """
+    View function for the route called name: async_view when name is listed
+    in settings.ASYNC_VIEWS, sync_view otherwise. Resolved when the URLconf
+    is imported.
+    """
+    view = async_view if name in settings.ASYNC_VIEWS else sync_view
+    return view.as_view(**initkwargs)
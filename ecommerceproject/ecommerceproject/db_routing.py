@@ -0,0 +1,233 @@
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DatabaseError, InterfaceError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+# Database the current request's reads go to; None means the router
+# leaves the choice to Django (the primary).
+_read_alias = ContextVar('replica_read_alias', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request by
+    ReplicaReadMixin, and everything else to the primary.
+
+    Outside those views, and whenever no healthy replica is available,
+    reads stay on the primary, so the router is inert until
+    DATABASE_REPLICAS lists at least one alias.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows.
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaSet:
+    """
+    Picks a healthy replica for a read, round robin, local to one process.
+
+    Each replica is probed with SELECT 1 at most once per
+    REPLICA_HEALTH_CHECK_SECONDS. A replica that fails a probe, or a query
+    made by a view, is skipped for REPLICA_RETRY_SECONDS and then probed
+    again; with none healthy, reads fall back to the primary.
+
+    Args:
+        clock: monotonic clock, injectable for tests
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._state = {}
+
+    def pick(self):
+        """
+        Returns:
+            str or None: alias of a healthy replica, or None for the primary
+        """
+        aliases = settings.DATABASE_REPLICAS
+        if not aliases:
+            return None
+        start = next(self._counter)
+        for offset in range(len(aliases)):
+            alias = aliases[(start + offset) % len(aliases)]
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+    def is_healthy(self, alias):
+        now = self.clock()
+        with self._lock:
+            healthy, next_check = self._state.get(alias, (True, 0))
+            if now < next_check:
+                return healthy
+            # Claim the check so concurrent requests do not all probe.
+            self._state[alias] = (healthy, now + settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+        healthy = self.probe(alias)
+        self._set(alias, healthy)
+        return healthy
+
+    def probe(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except DatabaseError as e:
+            logger.warning(f"Replica {alias} failed its health check: {e}")
+            return False
+
+    def mark_down(self, alias):
+        logger.warning(f"Replica {alias} marked unhealthy for {settings.REPLICA_RETRY_SECONDS}s")
+        self._set(alias, False)
+
+    def reset(self):
+        with self._lock:
+            self._state.clear()
+
+    def stats(self):
+        with self._lock:
+            return {alias: healthy for alias, (healthy, _) in self._state.items()}
+
+    def _set(self, alias, healthy):
+        interval = settings.REPLICA_HEALTH_CHECK_SECONDS if healthy else settings.REPLICA_RETRY_SECONDS
+        with self._lock:
+            self._state[alias] = (healthy, self.clock() + interval)
+
+
+replicas = ReplicaSet()
+
+
+def sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Keep user_id's reads on the primary until their writes have replicated."""
+    caches[settings.REPLICA_CACHE_ALIAS].set(
+        sticky_key(user_id), 1, timeout=settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def is_pinned(user_id):
+    return caches[settings.REPLICA_CACHE_ALIAS].get(sticky_key(user_id)) is not None
+
+
+def read_from_primary():
+    """
+    Send the rest of the current request's reads to the primary, for data
+    kept beyond the request that must not lag behind the last write.
+    """
+    _read_alias.set(None)
+
+
+class ReplicaReadMixin:
+    """
+    Serve a view's reads from a replica.
+
+    After authentication, GET and HEAD requests pick a healthy replica and
+    every queryset evaluated by the handler reads from it through
+    ReplicaRouter. Users pinned by ReplicaStickinessMiddleware after a
+    write read from the primary instead, so they see their own changes.
+    Views narrow this with reads_from_replica(), or call
+    read_from_primary() partway through a request.
+    """
+
+    def reads_from_replica(self, request):
+        return request.method in ('GET', 'HEAD')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.DATABASE_REPLICAS or not self.reads_from_replica(request):
+            return
+        user = request.user
+        if user and user.is_authenticated and is_pinned(user.pk):
+            return
+        _read_alias.set(replicas.pick())
+
+    def handle_exception(self, exc):
+        alias = _read_alias.get()
+        _read_alias.set(None)
+        if alias and isinstance(exc, (OperationalError, InterfaceError)):
+            replicas.mark_down(alias)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        _read_alias.set(None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin users to the primary for REPLICA_STICKY_SECONDS after a successful
+    write, giving read-your-writes on the replica-backed views. Uses the
+    user DRF authenticated, which it copies onto the Django request.
+
+    Pins live in REPLICA_CACHE_ALIAS, which every worker must share; a
+    warning is logged at startup when replicas are configured over a
+    process-local cache.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        if settings.DATABASE_REPLICAS and isinstance(
+            caches[settings.REPLICA_CACHE_ALIAS], (LocMemCache, DummyCache)
+        ):
+            logger.warning(
+                f"REPLICA_CACHE_ALIAS '{settings.REPLICA_CACHE_ALIAS}' is not shared between "
+                f"processes; users served by another worker will not read their own writes"
+            )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user_id = self.written_by(request, response)
+        if user_id is not None:
+            pin_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user_id = self.written_by(request, response)
+        if user_id is not None:
+            await caches[settings.REPLICA_CACHE_ALIAS].aset(
+                sticky_key(user_id), 1, timeout=settings.REPLICA_STICKY_SECONDS
+            )
+        return response
+
+    def written_by(self, request, response):
+        if not settings.DATABASE_REPLICAS or request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
@@ -0,0 +1,119 @@
+"""
+JSON renderer and parser for the REST API on top of orjson.
+
+orjson encodes and decodes in C, several times faster than the standard
+library, and formats datetimes itself. When it is not installed both
+classes fall back to DRF's implementation with the same output.
+"""
+import datetime
+import decimal
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Same JavaScript-safety escaping as JSONRenderer.
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def encode_decimal(value):
+    """Decimals as DecimalField renders them with COERCE_DECIMAL_TO_STRING."""
+    if api_settings.COERCE_DECIMAL_TO_STRING:
+        return str(value)
+    return float(value)
+
+
+def encode_datetime(value):
+    """Datetimes as DateTimeField renders them with the default ISO 8601 format."""
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class APIJSONEncoder(encoders.JSONEncoder):
+    """
+    DRF's JSONEncoder, except that Decimal and datetime values that reach
+    the renderer unformatted (e.g. from SerializerMethodField or values()
+    rows) come out exactly as DecimalField and DateTimeField would format
+    them, instead of as floats and millisecond timestamps.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return encode_decimal(obj)
+        if isinstance(obj, datetime.datetime):
+            return encode_datetime(obj)
+        return super().default(obj)
+
+
+_fallback_encoder = APIJSONEncoder()
+
+
+def _orjson_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return encode_decimal(obj)
+    return _fallback_encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    Drop-in JSONRenderer using orjson for compact UTF-8 output, the API's
+    normal response format. Indented output (the browsable API, or
+    ``Accept: application/json; indent=4``), ASCII-only or non-compact
+    output, and installs without orjson go through the standard renderer
+    with APIJSONEncoder, which produces the same values.
+
+    orjson writes NaN and infinite floats as null rather than raising as
+    STRICT_JSON does; the API serializes no floats.
+    """
+
+    encoder_class = APIJSONEncoder
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_orjson_default, option=self.options)
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    Drop-in JSONParser using orjson. Like the strict standard parser it
+    rejects NaN and Infinity. Falls back to JSONParser without orjson.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
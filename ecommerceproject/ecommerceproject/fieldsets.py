@@ -0,0 +1,190 @@
+"""
+Sparse fieldsets for read endpoints: ``?fields=`` and ``?expand=``.
+
+``?fields=id,name,price`` limits a GET response to those top-level fields
+(nested serializers are returned whole) and the queryset behind it to what
+they read: select_related and prefetch_related lookups that no kept field
+needs are dropped and unused columns are deferred. Unknown names are a 400.
+
+``?expand=`` opts into fields that are left out unless asked for, listed
+per serializer in ``Meta.expandable_fields``; ``expand=raw`` adds raw
+provider payloads. Both parameters are comma-separated.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _names(request, param):
+    value = request.query_params.get(param) if request is not None else None
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request):
+    """
+    Returns:
+        set or None: field names from ?fields= on a GET or HEAD request,
+        None when all fields are wanted
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    return _names(request, FIELDS_PARAM)
+
+
+def requested_expansions(request):
+    """Expansion names from ?expand=."""
+    return _names(request, EXPAND_PARAM) or set()
+
+
+def is_top_level(serializer):
+    """Whether serializer is the response's own serializer rather than a nested one."""
+    parent = serializer.parent
+    if isinstance(parent, serializers.ListSerializer):
+        parent = parent.parent
+    return parent is None
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying the request's ?fields= and ?expand=.
+
+    ``Meta.expandable_fields`` maps expansion names to the fields they add,
+    e.g. ``{'raw': 'raw_response'}``. Fields a kept field reads other than
+    through its source, such as a SerializerMethodField or a model
+    property, declare the model fields and relations they use in
+    ``Meta.field_sources`` so prune_queryset() keeps them loaded.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        expansions = requested_expansions(request)
+        for expansion, field_name in getattr(self.Meta, 'expandable_fields', {}).items():
+            if expansion not in expansions:
+                fields.pop(field_name, None)
+
+        wanted = requested_fields(request)
+        if wanted is not None and is_top_level(self):
+            fields = {name: field for name, field in fields.items() if name in wanted}
+        return fields
+
+    @property
+    def field_names(self):
+        return list(self.fields)
+
+
+def _select_related_paths(tree, prefix=''):
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        yield path
+        yield from _select_related_paths(children, f'{path}__')
+
+
+def _lookup_root(lookup):
+    path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+    return path.split('__')[0]
+
+
+def prune_queryset(queryset, serializer, extra_columns=()):
+    """
+    Cut queryset down to what serializer's fields read.
+
+    select_related and prefetch_related lookups are kept only when they
+    start at a relation some field uses, and the model's own columns are
+    limited with only() to the fields' columns, the primary key and
+    extra_columns. A field whose reads cannot be determined (``source='*'``
+    or an undeclared property) leaves the columns alone.
+
+    Args:
+        queryset: queryset the view would otherwise serialize
+        serializer: serializer with the request's fields already trimmed
+        extra_columns: further columns callers read, e.g. pagination keys
+    """
+    meta = queryset.model._meta
+    field_sources = getattr(serializer.Meta, 'field_sources', {})
+    sources, complete = set(), True
+    for name, field in serializer.fields.items():
+        if name in field_sources:
+            sources.update(field_sources[name])
+        elif field.source == '*':
+            return queryset
+        else:
+            sources.add(field.source_attrs[0])
+
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        select_related = {name: children for name, children in select_related.items() if name in sources}
+        queryset = queryset.select_related(None)
+        if select_related:
+            queryset = queryset.select_related(*_select_related_paths(select_related))
+
+    # Django has no public accessor for a queryset's prefetch lookups.
+    lookups = queryset._prefetch_related_lookups
+    if lookups:
+        queryset = queryset.prefetch_related(None).prefetch_related(
+            *(lookup for lookup in lookups if _lookup_root(lookup) in sources)
+        )
+
+    columns = {meta.pk.name, *extra_columns}
+    for source in sources:
+        try:
+            model_field = meta.get_field(source)
+        except FieldDoesNotExist:
+            # Annotations cost no column; anything else may read any of them.
+            complete = complete and source in queryset.query.annotations
+            continue
+        # Relations followed by select_related must not be deferred.
+        if (model_field.concrete and not model_field.many_to_many) or source in (select_related or ()):
+            columns.add(source)
+    return queryset.only(*columns) if complete else queryset
+
+
+class SparseQuerysetMixin:
+    """
+    View mixin validating ?fields= against the serializer and pruning the
+    queryset to the kept fields with prune_queryset(). Querysets that a
+    ProjectionSerializer narrows to values() are left to it, since it
+    selects only the kept fields' columns.
+    """
+
+    def get_sparse_fields(self):
+        """
+        Returns:
+            set or None: the serializer fields kept for this request, None
+            when ?fields= is absent
+
+        Raises:
+            ValidationError: if ?fields= names a field the endpoint does not have
+        """
+        if not hasattr(self, '_sparse_fields'):
+            wanted = requested_fields(self.request)
+            field_names = getattr(self.get_serializer(), 'field_names', None)
+            if wanted is None or field_names is None:
+                self._sparse_fields = None
+            else:
+                unknown = wanted.difference(field_names)
+                if unknown:
+                    raise serializers.ValidationError(
+                        {FIELDS_PARAM: [f'Unknown field(s): {", ".join(sorted(unknown))}.']}
+                    )
+                self._sparse_fields = set(field_names)
+        return self._sparse_fields
+
+    def wants_field(self, name):
+        fields = self.get_sparse_fields()
+        return fields is None or name in fields
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None or not isinstance(queryset, QuerySet):
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, serializers.Serializer):
+            return queryset
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        return prune_queryset(queryset, serializer, [key.lstrip('-') for key in ordering])
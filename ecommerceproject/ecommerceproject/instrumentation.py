@@ -0,0 +1,186 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Per-request counters filled in by the database hook and TimedSerializerMixin."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.total_time = 0.0
+        self._serializer_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.query_count += 1
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'queries': self.query_count,
+            'db_ms': round(self.db_time * 1000, 3),
+            'serializer_ms': round(self.serializer_time * 1000, 3),
+            'total_ms': round(self.total_time * 1000, 3),
+        }
+
+
+def current_metrics():
+    return _current_metrics.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recording(connection, **kwargs):
+    """
+    Attach the query hook to a connection for good. It reports to whichever
+    request's metrics are current in the calling context, so queries that
+    async views run on sync_to_async worker threads, whose connections the
+    request's own thread never sees, are still counted. Safe to call more
+    than once.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(install_query_recording, dispatch_uid='request_metrics')
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin adding to_representation() time to the current
+    request's serializer time.
+
+    Only the outermost call is timed, so nested serializers are not counted
+    twice. For many=True, DRF's ListSerializer calls the child's
+    to_representation() once per row and each call is timed; list
+    serializers of our own can time the whole page instead. Outside a
+    request nothing is recorded.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current_metrics.get()
+        if metrics is None or metrics._serializer_depth:
+            return super().to_representation(instance)
+
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics._serializer_depth -= 1
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+def query_budget(name, method):
+    """Declared query budget for an endpoint and HTTP method, or None."""
+    return settings.ENDPOINT_QUERY_BUDGETS.get(name, {}).get(method)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, serializer time and total time for every
+    request, keyed by resolved URL name.
+
+    Metrics are added as ``X-*`` and ``Server-Timing`` response headers when
+    ``REQUEST_METRICS_HEADERS`` is enabled, and always written as one JSON
+    log line. Requests that exceed their entry in ``ENDPOINT_QUERY_BUDGETS``
+    are logged as warnings.
+
+    Works in both sync and async stacks, so under ASGI it does not force
+    async views back onto a single sync thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # Connections opened before this module was imported never sent
+        # connection_created.
+        for connection in connections.all():
+            install_query_recording(connection)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.finish()
+
+        name = endpoint_name(request)
+        values = metrics.as_dict()
+
+        if settings.REQUEST_METRICS_HEADERS:
+            response['X-DB-Query-Count'] = str(values['queries'])
+            response['X-DB-Time-Ms'] = str(values['db_ms'])
+            response['X-Serializer-Time-Ms'] = str(values['serializer_ms'])
+            response['X-Total-Time-Ms'] = str(values['total_ms'])
+            response['Server-Timing'] = (
+                f'db;dur={values["db_ms"]}, '
+                f'serializer;dur={values["serializer_ms"]}, '
+                f'total;dur={values["total_ms"]}'
+            )
+
+        record = {
+            'endpoint': name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **values,
+        }
+        budget = query_budget(name, request.method)
+        if budget is not None and metrics.query_count > budget:
+            record['query_budget'] = budget
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+        return response
@@ -0,0 +1,205 @@
+import base64
+import json
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def approximate_count(queryset):
+    """
+    Return a cheap row count for a queryset.
+
+    Unfiltered querysets on MySQL are answered from the table statistics
+    in information_schema instead of a full COUNT(*). Anything else falls
+    back to an exact count.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+
+    if not queryset.query.where and connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None:
+            return row[0]
+
+    return queryset.count()
+
+
+class ApproximateCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list)
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with two opt-in modes for large tables.
+
+    - ``?cursor=`` switches to keyset pagination on ``(created_at, id)``
+      descending. Pages are fetched with a range condition on the last seen
+      key instead of ``OFFSET``, and no ``COUNT(*)`` is issued, so deep
+      pages cost the same as the first one. Pass an empty cursor to start.
+    - ``?count=approx`` replaces the exact ``COUNT(*)`` with
+      :func:`approximate_count` in either mode.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.approximate = request.query_params.get(self.count_query_param) == 'approx'
+        self.keyset = self.cursor_query_param in request.query_params
+        # Both modes page over the same total order, so ties on created_at
+        # never make rows repeat or go missing between pages.
+        queryset = queryset.order_by(*self.ordering)
+
+        if self.keyset:
+            return self.paginate_keyset(queryset, request)
+
+        if self.approximate:
+            self.django_paginator_class = ApproximateCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_keyset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.count = approximate_count(queryset) if self.approximate else None
+        queryset, cursor, reverse = self.keyset_queryset(queryset, request)
+        return self.keyset_page(list(queryset[:page_size + 1]), page_size, cursor, reverse)
+
+    def keyset_queryset(self, queryset, request):
+        """Narrow queryset to the rows after the request's cursor."""
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        reverse = bool(cursor and cursor['reverse'])
+
+        if cursor:
+            created_at, pk = cursor['created_at'], cursor['id']
+            # (created_at, id) < (c, i), written so the leading created_at
+            # bound can drive an index range scan.
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gte=created_at),
+                    Q(created_at__gt=created_at) | Q(id__gt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at),
+                    Q(created_at__lt=created_at) | Q(id__lt=pk),
+                )
+
+        if reverse:
+            queryset = queryset.reverse()
+        return queryset, cursor, reverse
+
+    def keyset_page(self, rows, page_size, cursor, reverse):
+        """Turn up to page_size + 1 fetched rows into the page."""
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next, self.has_previous = bool(rows), has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return rows
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views: same pages and links, with the
+        count and the page fetched through the async ORM.
+        """
+        self.request = request
+        self.approximate = request.query_params.get(self.count_query_param) == 'approx'
+        self.keyset = self.cursor_query_param in request.query_params
+        queryset = queryset.order_by(*self.ordering)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if self.approximate:
+            count = await sync_to_async(approximate_count)(queryset)
+        elif not self.keyset:
+            count = await queryset.acount()
+
+        if self.keyset:
+            self.count = count if self.approximate else None
+            queryset, cursor, reverse = self.keyset_queryset(queryset, request)
+            rows = [obj async for obj in queryset[:page_size + 1].aiterator()]
+            return self.keyset_page(rows, page_size, cursor, reverse)
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list.aiterator()]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'keyset', False):
+            return super().get_paginated_response(data)
+
+        payload = {
+            'next': self.get_keyset_link(self.page[-1], reverse=False) if self.has_next and self.page else None,
+            'previous': self.get_keyset_link(self.page[0], reverse=True) if self.has_previous and self.page else None,
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_keyset_link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(obj, reverse)
+        )
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # values() rows from a ProjectionSerializer view.
+            created_at, pk = obj['created_at'], obj['id']
+        else:
+            created_at, pk = obj.created_at, obj.pk
+        payload = json.dumps(
+            [created_at.isoformat(), pk, int(reverse)],
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(padded))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(encoded)
+            return {'created_at': created_at, 'id': int(pk), 'reverse': bool(reverse)}
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,237 @@
+"""
+Read-only serializers that work on values() rows instead of model instances.
+
+A ProjectionSerializer mirrors an existing read serializer, named in
+``Meta.serializer``. The first time it is used, it compiles that
+serializer's fields into a list of values() columns and one flat
+row-to-dict function. Paired with ProjectionMixin on the view, a list page
+is fetched as plain dicts and formatted without building model instances
+or walking DRF's per-field machinery. Values are formatted exactly as the
+mirrored DRF fields would, so the rendered JSON is identical to the
+original serializer's.
+"""
+import decimal
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+from .fastjson import encode_datetime
+from .fieldsets import is_top_level, requested_fields
+from .instrumentation import TimedSerializerMixin
+
+# Field classes whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+def _column(field):
+    if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+        raise ImproperlyConfigured(
+            f'{field.parent.__class__.__name__}.{field.field_name} is not a column and '
+            f'cannot be projected'
+        )
+    return '__'.join(field.source_attrs)
+
+
+def _decimal_converter(field):
+    """
+    DecimalField.to_representation with the rounding context built once per
+    page instead of once per value.
+    """
+    if field.decimal_places is None or field.normalize_output or field.localize:
+        return lambda: field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+
+    def bind():
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+
+        def convert(value):
+            if not isinstance(value, decimal.Decimal):
+                return field.to_representation(value)
+            quantized = value.quantize(exponent, rounding=field.rounding, context=context)
+            return f'{quantized:f}' if coerce_to_string else quantized
+
+        return convert
+
+    return bind
+
+
+def _datetime_converter(field):
+    """
+    DateTimeField.to_representation with the output timezone looked up once
+    per page instead of once per value.
+    """
+    def bind():
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is None or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, str) or value.utcoffset() is None:
+                return field.to_representation(value)
+            return encode_datetime(value.astimezone(field_timezone))
+
+        return convert
+
+    return bind
+
+
+def _converter(field):
+    """
+    Returns:
+        callable or None: None when the column value is rendered as is,
+        otherwise a function called once per serialization that returns
+        the function formatting each non-null value as field would
+    """
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        # values() already yields the related pk.
+        return (lambda: field.pk_field.to_representation) if field.pk_field is not None else None
+    if isinstance(field, (relations.RelatedField, relations.ManyRelatedField, serializers.BaseSerializer)):
+        raise ImproperlyConfigured(
+            f'{field.parent.__class__.__name__}.{field.field_name} is a nested or '
+            f'to-many field and cannot be projected'
+        )
+    if type(field) is serializers.DecimalField:
+        return _decimal_converter(field)
+    if type(field) is serializers.DateTimeField:
+        return _datetime_converter(field)
+    return lambda: field.to_representation
+
+
+class CompiledProjection:
+    """
+    Columns and row formatting compiled from a serializer's fields.
+
+    Args:
+        serializer: bound instance of the serializer to mirror
+    """
+
+    def __init__(self, serializer):
+        self.fields = tuple(
+            (name, _column(field), _converter(field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        )
+        self.names = tuple(name for name, _, _ in self.fields)
+
+    def columns(self, names=None):
+        """values() columns read by the fields in names, or by all fields."""
+        return tuple(dict.fromkeys(
+            column for name, column, _ in self.fields if names is None or name in names
+        ))
+
+    def row_function(self, names=None):
+        """Function turning one values() row into the output dict of the fields in names, or all fields."""
+        fields = tuple(
+            (name, column, bind() if bind is not None else None)
+            for name, column, bind in self.fields
+            if names is None or name in names
+        )
+
+        def to_dict(row):
+            data = {}
+            for name, column, convert in fields:
+                value = row[column]
+                data[name] = value if convert is None or value is None else convert(value)
+            return data
+
+        return to_dict
+
+
+class ProjectionListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    def to_representation(self, data):
+        to_dict = self.child.compiled().row_function(self.child.field_names)
+        return [to_dict(row) for row in data]
+
+
+class ProjectionSerializer(TimedSerializerMixin, serializers.BaseSerializer):
+    """
+    Read-only serializer over values() rows, mirroring ``Meta.serializer``.
+
+    Only fields backed by a column, a forward relation path (``source=
+    'user.name'``) or a queryset annotation can be projected; method
+    fields, nested serializers and to-many relations raise
+    ImproperlyConfigured when the projection is compiled. The mirrored
+    serializer is instantiated without a request, so fields it only adds
+    for some requests are left out.
+
+        class ProductListProjection(ProjectionSerializer):
+            class Meta:
+                serializer = ProductListSerializer
+    """
+
+    @classmethod
+    def compiled(cls):
+        compiled = cls.__dict__.get('_compiled')
+        if compiled is None:
+            compiled = CompiledProjection(cls.Meta.serializer(context={}))
+            cls._compiled = compiled
+        return compiled
+
+    @classmethod
+    def project(cls, queryset, extra_columns=(), field_names=None):
+        """
+        Narrow queryset to the columns this projection reads.
+
+        Args:
+            queryset: model queryset the view would otherwise serialize
+            extra_columns: further columns callers need from each row,
+                e.g. pagination keys; they are not rendered
+            field_names: fields to read columns for, default all
+        """
+        columns = cls.compiled().columns(field_names)
+        return queryset.values(*columns, *(c for c in extra_columns if c not in columns))
+
+    @property
+    def field_names(self):
+        """Fields rendered for this request, as limited by ?fields=."""
+        names = self.compiled().names
+        wanted = requested_fields(self.context.get('request'))
+        if wanted is not None and is_top_level(self):
+            names = tuple(name for name in names if name in wanted)
+        return names
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        return ProjectionListSerializer(*args, child=cls(), **kwargs)
+
+    def to_representation(self, instance):
+        return self.compiled().row_function(self.field_names)(instance)
+
+    @property
+    def data(self):
+        return ReturnDict(super().data, serializer=self)
+
+
+class ProjectionMixin:
+    """
+    Feed values() rows to a view's ProjectionSerializer.
+
+    Whenever get_serializer_class() returns a ProjectionSerializer, the
+    filtered queryset is narrowed with its project() to the columns of the
+    fields rendered for the request, so list pages (and get_object()) load
+    dicts instead of model instances. The paginator's ordering columns are
+    fetched too, for keyset cursors.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        if isinstance(queryset, QuerySet) and isinstance(serializer, ProjectionSerializer):
+            ordering = getattr(self.paginator, 'ordering', None) or ()
+            queryset = serializer.project(
+                queryset, [key.lstrip('-') for key in ordering], serializer.field_names
+            )
+        return queryset
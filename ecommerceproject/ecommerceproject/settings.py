@@ -47,9 +47,12 @@ INSTALLED_APPS = [
     'orders',
     'payments',
     'products',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'ecommerceproject.instrumentation.RequestMetricsMiddleware',
+    'ecommerceproject.db_routing.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,17 +85,67 @@ WSGI_APPLICATION = 'ecommerceproject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+# DB_ENGINE=django.db.backends.sqlite3 runs against a local SQLite file,
+# e.g. for benchmarks on a machine without MySQL.
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.mysql')
+
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': os.getenv('DB_NAME', 'ecommerce'),
+            'USER': os.getenv('DB_USER', 'root'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '3306'),
+        }
+    }
+
+# Read replicas for the catalog and list endpoints (ecommerceproject/db_routing.py).
+# DB_REPLICAS lists replica hosts, or file paths with SQLite, where keeping the
+# copies in sync is up to you. They become aliases replica_1, replica_2, ...
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME' if DB_ENGINE == 'django.db.backends.sqlite3' else 'HOST': location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['ecommerceproject.db_routing.ReplicaRouter']
+# Seconds a user's reads stay on the primary after a write
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+# Holds those primary pins. With DB_REPLICAS set it must be a shared backend
+# (Redis, Memcached, database); with the process-local default, a user's next
+# read on another worker goes to a replica and can miss their own write.
+REPLICA_CACHE_ALIAS = os.getenv('REPLICA_CACHE_ALIAS', 'default')
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv('REPLICA_HEALTH_CHECK_SECONDS', '10'))
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', '30'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': os.getenv('DB_NAME', 'ecommerce'),
-        'USER': os.getenv('DB_USER', 'root'),
-        'PASSWORD': os.getenv('DB_PASSWORD', ''),
-        'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', '3306'),
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Catalog read-through cache (products and categories)
+CATALOG_CACHE_ALIAS = os.getenv('CATALOG_CACHE_ALIAS', 'default')
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -112,6 +165,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. The first hasher is used for new hashes; hashes made by the
+# others, or with another PASSWORD_HASH_ITERATIONS, are upgraded on login.
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# 0 keeps Django's default PBKDF2 work factor
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', '0'))
+# Bounded pool for login/register hashing (accounts/hashing.py); requests that
+# find WORKERS busy and QUEUE waiting are refused with 503
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', str(os.cpu_count() or 2)))
+PASSWORD_HASHING_QUEUE = int(os.getenv('PASSWORD_HASHING_QUEUE', '32'))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -132,7 +201,17 @@ AUTH_USER_MODEL = 'accounts.User'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
+    ],
+    # orjson-backed JSON (ecommerceproject/fastjson.py), standard library without it
+    'DEFAULT_RENDERER_CLASSES': [
+        'ecommerceproject.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'ecommerceproject.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -141,6 +220,22 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Routes served by the async read views (ecommerceproject/async_views.py) under
+# ASGI, by URL name, e.g. 'product-list-create,order-list-create'. Writes on
+# those routes keep running the sync code on a worker thread.
+ASYNC_VIEWS = {name for name in os.getenv('ASYNC_VIEWS', '').split(',') if name}
+
+# Abuse throttling (ecommerceproject/throttling.py). Keys are '<scope>.<kind>'
+# with kind ip, user, account or endpoint; rates are 'N/period', e.g. '5/15m'.
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'default')
+THROTTLE_RATES = {
+    'login.ip': os.getenv('THROTTLE_LOGIN_IP', '30/m'),
+    'login.account': os.getenv('THROTTLE_LOGIN_ACCOUNT', '10/m'),
+    'register.ip': os.getenv('THROTTLE_REGISTER_IP', '10/m'),
+    'order-create.user': os.getenv('THROTTLE_ORDER_CREATE_USER', '60/m'),
+    'order-create.endpoint': os.getenv('THROTTLE_ORDER_CREATE_ENDPOINT', '6000/m'),
+}
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -159,6 +254,18 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Authenticated user cache (accounts.authentication.CachedJWTAuthentication)
+AUTH_USER_CACHE_ALIAS = os.getenv('AUTH_USER_CACHE_ALIAS', 'default')
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '60'))
+# Trust the name/is_admin claims minted at login instead of loading the user
+JWT_STATELESS_USER_CLAIMS = os.getenv('JWT_STATELESS_USER_CLAIMS', 'False') == 'True'
+
+# Token revocation (accounts.revocation); manage.py compact_revoked_tokens prunes expired rows
+TOKEN_REVOCATION_CAPACITY = int(os.getenv('TOKEN_REVOCATION_CAPACITY', '100000'))
+TOKEN_REVOCATION_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_ERROR_RATE', '0.001'))
+TOKEN_REVOCATION_CACHE_SIZE = int(os.getenv('TOKEN_REVOCATION_CACHE_SIZE', '10000'))
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
@@ -170,6 +277,78 @@ STATIC_URL = 'static/'
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY', '')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
+STRIPE_API_BASE = os.getenv('STRIPE_API_BASE', 'https://api.stripe.com')
+
+# Outbound Stripe calls: pooled connections, hard timeouts, bounded retries
+# and a per-process circuit breaker (see payments/resilience.py)
+STRIPE_POOL_SIZE = int(os.getenv('STRIPE_POOL_SIZE', '10'))
+STRIPE_CONNECT_TIMEOUT = float(os.getenv('STRIPE_CONNECT_TIMEOUT', '2'))
+STRIPE_READ_TIMEOUT = float(os.getenv('STRIPE_READ_TIMEOUT', '10'))
+STRIPE_MAX_RETRIES = int(os.getenv('STRIPE_MAX_RETRIES', '2'))
+STRIPE_RETRY_BASE_SECONDS = float(os.getenv('STRIPE_RETRY_BASE_SECONDS', '0.2'))
+STRIPE_RETRY_MAX_SECONDS = float(os.getenv('STRIPE_RETRY_MAX_SECONDS', '2'))
+STRIPE_BREAKER_FAILURE_RATE = float(os.getenv('STRIPE_BREAKER_FAILURE_RATE', '0.5'))
+STRIPE_BREAKER_WINDOW = int(os.getenv('STRIPE_BREAKER_WINDOW', '20'))
+STRIPE_BREAKER_MIN_CALLS = int(os.getenv('STRIPE_BREAKER_MIN_CALLS', '10'))
+STRIPE_BREAKER_RESET_SECONDS = float(os.getenv('STRIPE_BREAKER_RESET_SECONDS', '30'))
+
+# bKash Tokenized Checkout
+BKASH_BASE_URL = os.getenv('BKASH_BASE_URL', 'https://tokenized.sandbox.bka.sh/v1.2.0-beta')
+BKASH_APP_KEY = os.getenv('BKASH_APP_KEY', '')
+BKASH_APP_SECRET = os.getenv('BKASH_APP_SECRET', '')
+BKASH_USERNAME = os.getenv('BKASH_USERNAME', '')
+BKASH_PASSWORD = os.getenv('BKASH_PASSWORD', '')
+BKASH_CALLBACK_URL = os.getenv('BKASH_CALLBACK_URL', 'http://localhost:8000/api/payments/callback/bkash/')
+BKASH_WEBHOOK_SECRET = os.getenv('BKASH_WEBHOOK_SECRET', '')
+BKASH_POOL_SIZE = int(os.getenv('BKASH_POOL_SIZE', '10'))
+BKASH_CONNECT_TIMEOUT = float(os.getenv('BKASH_CONNECT_TIMEOUT', '2'))
+BKASH_READ_TIMEOUT = float(os.getenv('BKASH_READ_TIMEOUT', '15'))
+
+# Payment provider adapters, imported on first use (see payments/providers)
+PAYMENT_PROVIDERS = {
+    'stripe': 'payments.providers.stripe.StripeProvider',
+    'bkash': 'payments.providers.bkash.BkashProvider',
+}
+
+# Webhook inbox worker (manage.py process_webhooks)
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '8'))
+WEBHOOK_RETRY_BASE_SECONDS = int(os.getenv('WEBHOOK_RETRY_BASE_SECONDS', '5'))
+WEBHOOK_RETRY_MAX_SECONDS = int(os.getenv('WEBHOOK_RETRY_MAX_SECONDS', '3600'))
+WEBHOOK_DEDUP_CACHE_SIZE = int(os.getenv('WEBHOOK_DEDUP_CACHE_SIZE', '10000'))
+
+# Raw provider payloads (payments.PaymentPayload)
+PAYMENT_PAYLOAD_COMPRESSION = os.getenv('PAYMENT_PAYLOAD_COMPRESSION', 'True') == 'True'
+PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES = int(os.getenv('PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES', '512'))
+# Payloads of settled payments older than this are purged by manage.py purge_payment_payloads
+PAYMENT_PAYLOAD_RETENTION_DAYS = int(os.getenv('PAYMENT_PAYLOAD_RETENTION_DAYS', '180'))
+
+# Inventory Configuration
+# How long stock stays held for an unpaid order before the sweeper releases it
+STOCK_RESERVATION_TTL = timedelta(minutes=int(os.getenv('STOCK_RESERVATION_TTL_MINUTES', '15')))
+
+# Request Metrics
+# Query count / DB time / serializer time / total time per request
+REQUEST_METRICS_HEADERS = os.getenv('REQUEST_METRICS_HEADERS', 'True') == 'True'
+
+# Maximum SQL queries per request, keyed by resolved URL name and HTTP method.
+# Enforced by the test suite and logged as a warning when exceeded at runtime.
+ENDPOINT_QUERY_BUDGETS = {
+    'register': {'POST': 2},
+    'login': {'POST': 2},
+    'logout': {'POST': 2},
+    'product-list-create': {'GET': 2, 'POST': 12},
+    'product-detail-update-delete': {'GET': 2, 'PUT': 6, 'PATCH': 6, 'DELETE': 9},
+    'category-list-create': {'GET': 2, 'POST': 2},
+    'category-detail-delete': {'DELETE': 6},
+    'catalog-cache-stats': {'GET': 1},
+    'order-list-create': {'GET': 3, 'POST': 11},
+    'order-detail': {'GET': 3, 'PUT': 4, 'PATCH': 4},
+    'payments:payment-list': {'GET': 3},
+    'payments:payment-detail': {'GET': 2},
+    'payments:provider-health': {'GET': 1},
+    'payments:stripe_webhook': {'POST': 1},
+    'payments:provider-webhook': {'POST': 1},
+}
 
 # Logging Configuration
 LOGGING = {
@@ -0,0 +1,46 @@
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.revocation import revocation_store
+from .instrumentation import endpoint_name, query_budget
+
+
+class QueryBudgetTestMixin:
+    """
+    Test helpers that run a request through the full middleware stack and
+    check it against ``settings.ENDPOINT_QUERY_BUDGETS``.
+
+    Budgets describe production behaviour, so use this from a
+    ``TransactionTestCase``: ``TestCase`` wraps every atomic block in extra
+    savepoint queries that production never issues.
+    """
+
+    def jwt_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}'
+            )
+        return client
+
+    @override_settings(REQUEST_METRICS_HEADERS=True)
+    def assertWithinQueryBudget(self, client, method, path, expected_status=200, **kwargs):
+        # Run any due revocation sync now so the periodic query is not
+        # charged to whichever request happens to trigger it.
+        revocation_store.sync()
+        response = getattr(client, method.lower())(path, **kwargs)
+        self.assertEqual(
+            response.status_code, expected_status,
+            getattr(response, 'data', response.content),
+        )
+
+        name = endpoint_name(response.wsgi_request)
+        budget = query_budget(name, method.upper())
+        self.assertIsNotNone(budget, f'No query budget declared for {method.upper()} {name}')
+
+        used = int(response['X-DB-Query-Count'])
+        self.assertLessEqual(
+            used, budget,
+            f'{method.upper()} {name} used {used} queries, budget is {budget}',
+        )
+        return response
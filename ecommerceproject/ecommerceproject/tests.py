@@ -0,0 +1,766 @@
+import importlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from benchmarks.loadtest import payment_succeeded_event
+from orders.models import Order, OrderItem
+from orders.serializers import OrderListProjection, OrderListSerializer, OrderSerializer
+from orders.views import AsyncOrderListCreateAPIView
+from payments.fake_stripe import sign_payload
+from payments.models import Payment
+from payments.serializers import PaymentProjection, PaymentSerializer
+from payments.payloads import save_payloads
+from products.cache import catalog_cache, product_detail_key
+from products.models import Category, Product
+from products.serializers import ProductListProjection, ProductListSerializer, ProductSerializer
+from products.views import AsyncProductListCreateAPIView
+from . import fastjson
+from .db_routing import ReplicaSet, ReplicaStickinessMiddleware, replicas, sticky_key
+from .pagination import KeysetPagination
+from .projections import ProjectionSerializer
+from .testing import QueryBudgetTestMixin
+from .throttling import SlidingWindowCounter, parse_rate
+
+
+class EndpointQueryBudgetTests(QueryBudgetTestMixin, TransactionTestCase):
+    """Every API endpoint stays within its declared query budget."""
+
+    ITEMS_PER_ORDER = 10
+
+    def setUp(self):
+        catalog_cache.cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        self.customer = User.objects.create_user(
+            email='customer@example.com', password='password123', name='Customer'
+        )
+        self.categories = [Category.objects.create(name=f'Category {i}') for i in range(3)]
+        self.products = []
+        for i in range(25):
+            product = Product.objects.create(
+                name=f'Product {i}', sku=f'SKU-{i}', description='',
+                price=Decimal('3.00'), stock=1000,
+            )
+            product.categories.set(self.categories)
+            self.products.append(product)
+
+        self.orders = []
+        for i in range(25):
+            order = Order.objects.create(user=self.customer, total_amount=Decimal('30.00'))
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=product, quantity=1,
+                          price=product.price, subtotal=product.price)
+                for product in self.products[:self.ITEMS_PER_ORDER]
+            )
+            payment = Payment.objects.create(order=order, provider='stripe', transaction_id=f'pi_{i}')
+            save_payloads([(payment.pk, {'status': 'requires_payment_method'})])
+            self.orders.append(order)
+
+        self.anonymous = self.jwt_client()
+        self.admin_client = self.jwt_client(self.admin)
+        self.customer_client = self.jwt_client(self.customer)
+
+    def test_account_endpoints(self):
+        self.assertWithinQueryBudget(
+            self.anonymous, 'POST', '/api/accounts/register/', expected_status=201,
+            data={'email': 'new@example.com', 'name': 'New', 'password': 'password123',
+                  'password_confirm': 'password123'},
+            format='json',
+        )
+        login = self.assertWithinQueryBudget(
+            self.anonymous, 'POST', '/api/accounts/login/',
+            data={'email': 'customer@example.com', 'password': 'password123'},
+            format='json',
+        )
+        self.assertWithinQueryBudget(
+            self.customer_client, 'POST', '/api/accounts/logout/',
+            data={'refresh': login.data['refresh']}, format='json',
+        )
+
+    def test_catalog_endpoints(self):
+        product = self.products[0]
+        self.assertWithinQueryBudget(self.anonymous, 'GET', '/api/products/')
+        self.assertWithinQueryBudget(self.anonymous, 'GET', '/api/products/?cursor=')
+        self.assertWithinQueryBudget(self.anonymous, 'GET', f'/api/products/{product.id}/')
+        self.assertWithinQueryBudget(self.anonymous, 'GET', '/api/products/categories/')
+        self.assertWithinQueryBudget(
+            self.admin_client, 'POST', '/api/products/', expected_status=201,
+            data={'name': 'New', 'sku': 'NEW', 'description': 'New product', 'price': '1.00',
+                  'stock': 5, 'categories': [category.id for category in self.categories]},
+            format='json',
+        )
+        self.assertWithinQueryBudget(
+            self.admin_client, 'PATCH', f'/api/products/{product.id}/',
+            data={'price': '4.00'}, format='json',
+        )
+        self.assertWithinQueryBudget(
+            self.admin_client, 'DELETE', f'/api/products/{self.products[-1].id}/',
+            expected_status=204,
+        )
+        self.assertWithinQueryBudget(
+            self.admin_client, 'POST', '/api/products/categories/', expected_status=201,
+            data={'name': 'New category'}, format='json',
+        )
+        self.assertWithinQueryBudget(
+            self.admin_client, 'DELETE', f'/api/products/categories/{self.categories[-1].id}/',
+            expected_status=204,
+        )
+        self.assertWithinQueryBudget(self.admin_client, 'GET', '/api/products/cache-stats/')
+
+    def test_order_endpoints(self):
+        order = self.orders[0]
+        self.assertWithinQueryBudget(self.customer_client, 'GET', '/api/orders/')
+        self.assertWithinQueryBudget(self.admin_client, 'GET', '/api/orders/?cursor=')
+        self.assertWithinQueryBudget(self.customer_client, 'GET', f'/api/orders/{order.id}/')
+        self.assertWithinQueryBudget(
+            self.customer_client, 'POST', '/api/orders/', expected_status=201,
+            data={'items': [{'product_id': product.id, 'quantity': 1}
+                            for product in self.products[:self.ITEMS_PER_ORDER]]},
+            format='json',
+        )
+        self.assertWithinQueryBudget(
+            self.admin_client, 'PATCH', f'/api/orders/{order.id}/',
+            data={'status': 'cancelled'}, format='json',
+        )
+
+    def test_payment_endpoints(self):
+        payment = self.orders[0].payment
+        self.assertWithinQueryBudget(self.admin_client, 'GET', '/api/payments/')
+        self.assertWithinQueryBudget(self.admin_client, 'GET', '/api/payments/?cursor=')
+        self.assertWithinQueryBudget(self.admin_client, 'GET', f'/api/payments/{payment.id}/')
+        self.assertWithinQueryBudget(self.admin_client, 'GET', '/api/payments/provider-health/')
+
+    @override_settings(STRIPE_WEBHOOK_SECRET='whsec_test')
+    def test_webhook_endpoint(self):
+        payload = json.dumps(payment_succeeded_event(self.orders[0].payment.transaction_id))
+        self.assertWithinQueryBudget(
+            self.jwt_client(), 'POST', '/api/payments/webhook/stripe/',
+            data=payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=sign_payload(payload, 'whsec_test'),
+        )
+
+
+ASYNC_READ_ROUTES = {
+    'category-list-create', 'product-list-create', 'product-detail-update-delete',
+    'order-list-create', 'order-detail',
+}
+
+
+@contextmanager
+def async_read_views():
+    """Route ASYNC_READ_ROUTES to the async views; URLconfs pick views at import."""
+    def reload_urlconfs():
+        for module in ('products.urls', 'orders.urls', 'ecommerceproject.urls'):
+            importlib.reload(importlib.import_module(module))
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=ASYNC_READ_ROUTES):
+            reload_urlconfs()
+            yield
+    finally:
+        reload_urlconfs()
+
+
+class AsyncEndpointQueryBudgetTests(EndpointQueryBudgetTests):
+    """The same budgets hold with the async read views routed in."""
+
+    def setUp(self):
+        super().setUp()
+        context = async_read_views()
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def test_read_routes_are_async(self):
+        self.assertIs(resolve('/api/products/').func.view_class, AsyncProductListCreateAPIView)
+        self.assertIs(resolve('/api/orders/').func.view_class, AsyncOrderListCreateAPIView)
+
+
+@override_settings(REQUEST_METRICS_HEADERS=True)
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        self.customer = User.objects.create_user(email='customer@example.com', password='password123', name='Customer')
+        other = User.objects.create_user(email='other@example.com', password='password123', name='Other')
+        category = Category.objects.create(name='Category')
+        self.products = []
+        for i in range(25):
+            product = Product.objects.create(
+                name=f'Product {i}', sku=f'SKU-{i}', description='', price=Decimal('3.00'), stock=10,
+            )
+            product.categories.set([category])
+            self.products.append(product)
+        self.orders = []
+        for user in (self.customer, other):
+            order = Order.objects.create(user=user, total_amount=Decimal('3.00'))
+            OrderItem.objects.create(
+                order=order, product=self.products[0], quantity=1, price=Decimal('3.00'), subtotal=Decimal('3.00')
+            )
+            self.orders.append(order)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.customer).access_token}')
+
+    def fetch_all(self):
+        # Prime the auth cache so both runs issue the same queries.
+        self.client.get('/api/orders/')
+        responses = {}
+        paths = [
+            '/api/products/', '/api/products/?page=2', '/api/products/?cursor=', '/api/products/?count=approx',
+            f'/api/products/{self.products[3].id}/', '/api/products/999999/', '/api/products/?page=9',
+            '/api/products/categories/', '/api/orders/', f'/api/orders/{self.orders[0].id}/',
+            f'/api/orders/{self.orders[1].id}/',
+        ]
+        for path in paths:
+            catalog_cache.cache.clear()
+            response = self.client.get(path)
+            responses[path] = (response.status_code, response.json(), response['X-DB-Query-Count'])
+        return responses
+
+    def test_async_views_return_the_same_responses_and_queries(self):
+        expected = self.fetch_all()
+        with async_read_views():
+            actual = self.fetch_all()
+
+        for path, response in expected.items():
+            self.assertEqual(actual[path], response, path)
+        self.assertEqual(expected[f'/api/orders/{self.orders[1].id}/'][0], 404)
+
+    def test_keyset_cursor_links_work_on_async_views(self):
+        with async_read_views():
+            first = self.client.get('/api/products/?cursor=').json()
+            second = self.client.get(first['next']).json()
+
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, [product.id for product in reversed(self.products)])
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Routing against a real second SQLite database standing in for a replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        handle, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        # Added after setup, since the test runner would otherwise try to
+        # create it as a test database; it is flushed after each test like
+        # the primary.
+        connections.settings['replica'] = {
+            **connections['default'].settings_dict, 'ENGINE': 'django.db.backends.sqlite3', 'NAME': cls.replica_path,
+        }
+        cls.databases = {*cls.databases, 'replica'}
+        call_command('migrate', database='replica', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        caches['default'].clear()
+        replicas.reset()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        self.customer = User.objects.create_user(email='customer@example.com', password='password123', name='Customer')
+        self.product = Product.objects.create(
+            name='On primary', sku='PRIMARY', description='', price=Decimal('3.00'), stock=10
+        )
+        Product.objects.using('replica').create(
+            id=self.product.id, name='On replica', sku='REPLICA', description='', price=Decimal('3.00'), stock=10
+        )
+        Category.objects.using('replica').create(name='Replica category')
+
+    def client_for(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+    def product_name(self, client):
+        # Sparse detail responses are never cached, so they show where reads go.
+        return client.get(f'/api/products/{self.product.id}/?fields=name').data['name']
+
+    def test_catalog_and_list_reads_go_to_the_replica(self):
+        client = self.client_for()
+
+        self.assertEqual(self.product_name(client), 'On replica')
+        self.assertEqual(self.client_for(self.customer).get('/api/orders/').data['results'], [])
+
+    def test_async_views_read_from_the_replica_too(self):
+        with async_read_views():
+            self.assertEqual(self.product_name(self.client_for()), 'On replica')
+
+    def test_catalog_cache_is_filled_from_the_primary(self):
+        client = self.client_for()
+        self.client_for(self.admin).patch(f'/api/products/{self.product.id}/', {'name': 'Renamed'}, format='json')
+
+        for views in (nullcontext, async_read_views):
+            catalog_cache.invalidate()
+            with views():
+                self.assertEqual([row['name'] for row in client.get('/api/products/').data['results']], ['Renamed'])
+                self.assertEqual(client.get(f'/api/products/{self.product.id}/').data['name'], 'Renamed')
+                self.assertEqual(
+                    [row['name'] for row in client.get('/api/products/categories/').data['results']], [],
+                )
+        # Reads that are not stored stay on the replica.
+        catalog_cache.invalidate()
+        self.assertEqual(self.product_name(client), 'On replica')
+
+    def test_writes_and_unrouted_reads_use_the_primary(self):
+        category = Category.objects.create(name='Primary category')
+
+        response = self.client_for(self.admin).post('/api/products/', {
+            'name': 'New', 'sku': 'NEW', 'description': 'New product', 'price': '5.00', 'stock': 1,
+            'categories': [category.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Product.objects.using('default').filter(sku='NEW').exists())
+        self.assertFalse(Product.objects.using('replica').filter(sku='NEW').exists())
+
+        order = Order.objects.create(user=self.customer, total_amount=Decimal('3.00'))
+        self.assertEqual(self.client_for(self.customer).get(f'/api/orders/{order.id}/').status_code, 200)
+
+    def test_users_read_their_own_writes(self):
+        customer = self.client_for(self.customer)
+
+        response = customer.post(
+            '/api/orders/', {'items': [{'product_id': self.product.id, 'quantity': 1}]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['id'] for row in customer.get('/api/orders/').data['results']], [response.data['id']])
+        self.assertEqual(self.product_name(customer), 'On primary')
+        # Other users are not pinned.
+        self.assertEqual(self.product_name(self.client_for()), 'On replica')
+
+        caches['default'].delete(sticky_key(self.customer.pk))
+        self.assertEqual(customer.get('/api/orders/').data['results'], [])
+
+    def test_process_local_pin_cache_is_warned_about_at_startup(self):
+        with self.assertLogs('ecommerceproject.db_routing', level='WARNING') as logs:
+            ReplicaStickinessMiddleware(lambda request: None)
+        self.assertIn('REPLICA_CACHE_ALIAS', logs.output[0])
+
+        with override_settings(DATABASE_REPLICAS=[]), self.assertNoLogs('ecommerceproject.db_routing'):
+            ReplicaStickinessMiddleware(lambda request: None)
+
+    def test_unhealthy_replica_falls_back_to_the_primary(self):
+        replicas.mark_down('replica')
+        self.assertEqual(self.product_name(self.client_for()), 'On primary')
+
+        replicas.reset()
+        with mock.patch.object(ReplicaSet, 'probe', return_value=False) as probe:
+            self.assertEqual(self.product_name(self.client_for()), 'On primary')
+            self.assertEqual(self.product_name(self.client_for()), 'On primary')
+        probe.assert_called_once_with('replica')
+
+    def test_failed_replica_query_marks_the_replica_down(self):
+        with mock.patch(
+            'products.views.ProductListCreateAPIView.list', side_effect=OperationalError('replica gone')
+        ):
+            with self.assertRaises(OperationalError):
+                self.client_for().get('/api/products/')
+
+        self.assertEqual(replicas.stats(), {'replica': False})
+        self.assertEqual(self.product_name(self.client_for()), 'On primary')
+
+
+class RequestMetricsMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        Category.objects.create(name='Books')
+
+    def test_metrics_are_exposed_as_headers(self):
+        response = self.client.get('/api/products/categories/')
+
+        self.assertEqual(response['X-DB-Query-Count'], '2')
+        for header in ('X-DB-Time-Ms', 'X-Serializer-Time-Ms', 'X-Total-Time-Ms', 'Server-Timing'):
+            self.assertIn(header, response)
+
+    def test_metrics_are_logged_per_endpoint(self):
+        with self.assertLogs('ecommerceproject.instrumentation', level='INFO') as logs:
+            self.client.get('/api/products/categories/')
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['endpoint'], 'category-list-create')
+        self.assertEqual(record['queries'], 2)
+        self.assertEqual(set(record), {
+            'endpoint', 'method', 'path', 'status', 'queries', 'db_ms', 'serializer_ms', 'total_ms',
+        })
+
+    def test_serializer_time_covers_the_response_serializer(self):
+        to_representation = ModelSerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.02)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(ModelSerializer, 'to_representation', slow_to_representation):
+            response = self.client.get('/api/products/categories/')
+
+        self.assertGreaterEqual(float(response['X-Serializer-Time-Ms']), 20)
+
+    @override_settings(ENDPOINT_QUERY_BUDGETS={'category-list-create': {'GET': 1}})
+    def test_budget_overrun_is_logged_as_warning(self):
+        with self.assertLogs('ecommerceproject.instrumentation', level='WARNING') as logs:
+            self.client.get('/api/products/categories/')
+
+        self.assertEqual(json.loads(logs.records[-1].getMessage())['query_budget'], 1)
+
+    @override_settings(REQUEST_METRICS_HEADERS=False)
+    def test_headers_can_be_disabled(self):
+        response = self.client.get('/api/products/categories/')
+
+        self.assertNotIn('X-DB-Query-Count', response)
+
+
+class SlidingWindowCounterTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.counter = SlidingWindowCounter(clock=lambda: self.now)
+        self.counter.cache.clear()
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        results = [self.counter.hit('k', 3, 60) for _ in range(4)]
+        self.assertEqual([allowed for allowed, _ in results], [True, True, True, False])
+        self.assertEqual(results[-1][1], 60)
+
+        # Halfway into the next window, 3 * 0.5 + 1 requests are counted;
+        # the rejected fourth one is not.
+        self.now = 90
+        self.assertEqual(self.counter.hit('k', 3, 60), (True, 0.0))
+        self.assertEqual(self.counter.hit('k', 3, 60), (False, 10.0))
+        self.assertTrue(self.counter.hit('other', 3, 60)[0])
+
+    def test_rates_parse_with_multipliers(self):
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/15min'), (5, 900))
+        self.assertEqual(parse_rate('100/day'), (100, 86400))
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        self.user = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+        self.product = Product.objects.create(
+            name='Widget', sku='W', description='', price=Decimal('1.00'), stock=100
+        )
+
+    @override_settings(THROTTLE_RATES={'login.ip': '100/m', 'login.account': '2/m'})
+    def test_login_is_throttled_per_account_before_hashing(self):
+        client = APIClient()
+        for _ in range(2):
+            client.post('/api/accounts/login/', {'email': 'buyer@example.com', 'password': 'x'}, format='json')
+
+        with mock.patch('accounts.views.LoginSerializer') as serializer:
+            response = client.post(
+                '/api/accounts/login/', {'email': ' Buyer@Example.com', 'password': 'x'}, format='json'
+            )
+        other = client.post('/api/accounts/login/', {'email': 'other@example.com', 'password': 'x'}, format='json')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        serializer.assert_not_called()
+        self.assertEqual(other.status_code, 400)
+
+    @override_settings(THROTTLE_RATES={'login.ip': '2/m', 'login.account': '3/m'})
+    def test_login_refused_per_ip_does_not_count_against_the_account(self):
+        client = APIClient()
+        data = {'email': 'buyer@example.com', 'password': 'x'}
+        statuses = [client.post('/api/accounts/login/', data, format='json').status_code for _ in range(5)]
+
+        elsewhere = client.post('/api/accounts/login/', data, format='json', REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(statuses, [400, 400, 429, 429, 429])
+        self.assertEqual(elsewhere.status_code, 400)
+
+    @override_settings(THROTTLE_RATES={'order-create.user': '1/m', 'order-create.endpoint': '100/m'})
+    def test_order_creation_is_throttled_per_user(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        data = {'items': [{'product_id': self.product.id, 'quantity': 1}]}
+
+        first = client.post('/api/orders/', data, format='json')
+        second = client.post('/api/orders/', data, format='json')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(client.get('/api/orders/').status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+
+    @override_settings(THROTTLE_RATES={'order-create.user': '2/m', 'order-create.endpoint': '3/m'})
+    def test_one_user_flooding_orders_leaves_the_endpoint_budget_to_others(self):
+        other = User.objects.create_user(email='other@example.com', password='password123', name='Other')
+        data = {'items': [{'product_id': self.product.id, 'quantity': 1}]}
+        flooder, client = APIClient(), APIClient()
+        flooder.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(other).access_token}')
+
+        statuses = [flooder.post('/api/orders/', data, format='json').status_code for _ in range(10)]
+        response = client.post('/api/orders/', data, format='json')
+
+        self.assertEqual(statuses, [201, 201] + [429] * 8)
+        self.assertEqual(response.status_code, 201)
+
+
+class FastJSONTests(TestCase):
+    PAYLOAD = {
+        'price': Decimal('12.50'),
+        'created_at': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+        'updated_at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+        'naive': datetime(2026, 1, 2, 3, 4, 5),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Invalid credentials.'),
+        'text': 'line\u2028break\u2029 ünïcode',
+        'nested': [{1: 'int key', 'none': None, 'flag': True}],
+    }
+
+    def render(self, data, **kwargs):
+        return fastjson.FastJSONRenderer().render(data, **kwargs)
+
+    def test_orjson_and_fallback_render_identical_bytes(self):
+        fast = self.render(self.PAYLOAD)
+        with mock.patch.object(fastjson, 'orjson', None):
+            fallback = self.render(self.PAYLOAD)
+
+        self.assertEqual(fast, fallback)
+        self.assertEqual(json.loads(fast)['price'], '12.50')
+        self.assertEqual(json.loads(fast)['created_at'], '2026-01-02T03:04:05.678901Z')
+        self.assertIn(b'line\\u2028break\\u2029', fast)
+
+    def test_serializer_output_matches_the_stock_renderer(self):
+        category = Category.objects.create(name='Category')
+        product = Product.objects.create(
+            name='Prodüct', sku='SKU-1', description='Line\u2028two', price=Decimal('3.00'), stock=5
+        )
+        product.categories.set([category])
+        data = ProductSerializer(product).data
+
+        self.assertEqual(self.render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            self.render(data, accepted_media_type='application/json; indent=4'),
+            JSONRenderer().render(data, accepted_media_type='application/json; indent=4'),
+        )
+
+    def test_parser_matches_the_stock_parser(self):
+        body = json.dumps({'items': [{'product_id': 1, 'quantity': 2}], 'note': 'ünïcode'}).encode()
+        parse = fastjson.FastJSONParser().parse
+
+        self.assertEqual(parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        self.assertEqual(
+            parse(BytesIO('{"note": "caf\xe9"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'}),
+            {'note': 'caf\xe9'},
+        )
+        for invalid in (b'{"items": [', b'{"price": NaN}'):
+            with self.assertRaises(ParseError):
+                parse(BytesIO(invalid))
+
+    def test_api_uses_the_fast_renderer_and_parser(self):
+        user = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+        client = APIClient()
+
+        response = client.post(
+            '/api/accounts/login/', b'{"email": "buyer@example.com", "password": "password123"}',
+            content_type='application/json',
+        )
+        malformed = client.post('/api/accounts/login/', b'{"email": ', content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, fastjson.FastJSONRenderer)
+        self.assertEqual(response.json()['user']['id'], user.pk)
+        self.assertEqual(malformed.status_code, 400)
+        self.assertIn('JSON parse error', malformed.json()['detail'])
+
+
+class ProjectionSerializerTests(TestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        customer = User.objects.create_user(email='customer@example.com', password='password123', name='Cüstomer')
+        product = Product.objects.create(
+            name='Product', sku='SKU-1', description='Product', price=Decimal('3.10'), stock=10
+        )
+        Product.objects.create(name='Free', sku='SKU-2', description='Free', price=Decimal('0'), stock=0)
+        for total in (Decimal('6.20'), Decimal('0.00')):
+            order = Order.objects.create(user=customer, total_amount=total)
+            if total:
+                OrderItem.objects.create(
+                    order=order, product=product, quantity=2, price=Decimal('3.10'), subtotal=total
+                )
+                Payment.objects.create(order=order, provider='stripe', transaction_id='pi_1', status='success')
+
+    def render_both(self, queryset, serializer_class, projection_class):
+        render = fastjson.FastJSONRenderer().render
+        return (
+            render(serializer_class(list(queryset), many=True).data),
+            render(projection_class(list(projection_class.project(queryset)), many=True).data),
+        )
+
+    def test_projections_render_the_same_json_as_their_serializers(self):
+        cases = [
+            (Product.objects.order_by('id'), ProductListSerializer, ProductListProjection),
+            (
+                Order.objects.select_related('user').annotate(item_count=Count('items')).order_by('id'),
+                OrderListSerializer, OrderListProjection,
+            ),
+            (Payment.objects.order_by('id'), PaymentSerializer, PaymentProjection),
+        ]
+        for tz in ('UTC', 'Asia/Dhaka'):
+            with timezone.override(tz):
+                for queryset, serializer_class, projection_class in cases:
+                    expected, actual = self.render_both(queryset, serializer_class, projection_class)
+                    self.assertEqual(actual, expected, f'{projection_class.__name__} in {tz}')
+
+    def test_list_endpoints_serve_projections(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+
+        for path, projection_class in (
+            ('/api/products/', ProductListProjection),
+            ('/api/orders/?cursor=', OrderListProjection),
+            ('/api/payments/', PaymentProjection),
+        ):
+            response = client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertIsInstance(response.data['results'].serializer.child, projection_class)
+
+        raw = client.get('/api/payments/?expand=raw')
+        self.assertIsInstance(raw.data['results'].serializer.child, PaymentSerializer)
+        self.assertIn('raw_response', raw.json()['results'][0])
+
+    def test_keyset_cursors_are_built_from_rows(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+
+        with mock.patch.object(KeysetPagination, 'page_size', 1):
+            first = client.get('/api/orders/?cursor=').json()
+            second = client.get(first['next']).json()
+
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_fields_without_a_column_cannot_be_projected(self):
+        for serializer_class in (ProductSerializer, OrderSerializer):
+            projection_class = type('Projection', (ProjectionSerializer,), {
+                'Meta': type('Meta', (), {'serializer': serializer_class}),
+            })
+            with self.assertRaises(ImproperlyConfigured):
+                projection_class.compiled()
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        admin = User.objects.create_user(email='admin@example.com', password='password123', name='Admin', is_admin=True)
+        category = Category.objects.create(name='Category')
+        self.product = Product.objects.create(
+            name='Product', sku='SKU-1', description='Product', price=Decimal('3.10'), stock=10
+        )
+        self.product.categories.set([category])
+        self.order = Order.objects.create(user=admin, total_amount=Decimal('6.20'))
+        OrderItem.objects.create(
+            order=self.order, product=self.product, quantity=2, price=Decimal('3.10'), subtotal=Decimal('6.20')
+        )
+        payment = Payment.objects.create(order=self.order, provider='stripe', transaction_id='pi_1', status='success')
+        save_payloads([(payment.pk, {'id': 'pi_1'})])
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        # Prime the auth cache so only the view's own queries are captured.
+        self.client.get('/api/orders/')
+
+    def get(self, path):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), ' '.join(query['sql'] for query in queries.captured_queries)
+
+    def test_detail_fields_drop_relations_and_columns(self):
+        data, sql = self.get(f'/api/orders/{self.order.id}/?fields=id,status,total_amount')
+
+        self.assertEqual(data, {'id': self.order.id, 'status': 'pending', 'total_amount': '6.20'})
+        for unused in ('orders_orderitem', 'payments_payment', 'accounts_user', 'updated_at'):
+            self.assertNotIn(unused, sql)
+
+        data, sql = self.get(f'/api/orders/{self.order.id}/?fields=id,items,payment&expand=raw')
+        self.assertEqual(set(data), {'id', 'items', 'payment'})
+        self.assertEqual(set(data['items'][0]), {'id', 'product_id', 'product_name', 'quantity', 'price', 'subtotal'})
+        self.assertEqual(data['payment']['raw_response'], {'id': 'pi_1'})
+        self.assertNotIn('accounts_user', sql)
+
+    def test_list_fields_narrow_the_projection(self):
+        data, sql = self.get('/api/orders/?fields=id,status,total_amount')
+
+        self.assertEqual(data['results'], [{'id': self.order.id, 'total_amount': '6.20', 'status': 'pending'}])
+        self.assertNotIn('orders_orderitem', sql)
+        self.assertNotIn('accounts_user', sql)
+
+        data, _ = self.get('/api/products/?fields=id,name,price')
+        self.assertEqual(data['results'], [{'id': self.product.id, 'name': 'Product', 'price': '3.10'}])
+
+    def test_product_detail_is_trimmed_from_the_full_cache_entry(self):
+        data, sql = self.get(f'/api/products/{self.product.id}/?fields=id,name,available_stock')
+
+        self.assertEqual(data, {'id': self.product.id, 'name': 'Product', 'available_stock': 10})
+        self.assertNotIn('products_category', sql)
+        self.assertNotIn('description', sql)
+        self.assertIsNone(catalog_cache.get('products', product_detail_key(self.product.id)))
+
+        full, _ = self.get(f'/api/products/{self.product.id}/')
+        data, sql = self.get(f'/api/products/{self.product.id}/?fields=id,categories')
+        self.assertEqual(data, {'id': self.product.id, 'categories': full['categories']})
+        self.assertNotIn('products_product', sql)
+
+    def test_expand_and_unknown_fields(self):
+        data, _ = self.get('/api/payments/?fields=id,raw_response&expand=raw')
+        self.assertEqual(data['results'][0]['raw_response'], {'id': 'pi_1'})
+
+        for path in ('/api/payments/?fields=id,raw_response', '/api/products/?fields=id,cost'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 400, path)
+            self.assertIn('fields', response.json())
+
+    def test_async_views_apply_fields_too(self):
+        paths = [
+            f'/api/orders/{self.order.id}/?fields=id,items', '/api/orders/?fields=id,item_count',
+            f'/api/products/{self.product.id}/?fields=id,name', '/api/products/?fields=id',
+        ]
+        expected = [self.get(path) for path in paths]
+        catalog_cache.cache.clear()
+        self.client.get('/api/orders/')
+        with async_read_views():
+            actual = [self.get(path) for path in paths]
+
+        self.assertEqual(actual, expected)
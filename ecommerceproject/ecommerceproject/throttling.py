@@ -0,0 +1,188 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse 'N/period' into (N, seconds). The period is s, m, h or d, optionally
+    with a multiplier and any suffix: '5/15m' allows 5 requests per 15 minutes.
+    """
+    count, period = rate.split('/')
+    multiplier = ''.join(char for char in period if char.isdigit()) or '1'
+    unit = period.lstrip('0123456789')[0]
+    return int(count), int(multiplier) * PERIODS[unit]
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding-window rate limiter on shared cache counters.
+
+    Each window is a fixed slot with its own counter, bumped with the
+    cache's atomic incr. The count over the last `window` seconds is the
+    current slot plus the previous slot weighted by how much of it still
+    overlaps, which smooths the burst a plain fixed window allows at slot
+    boundaries while costing three cache round trips per check. Rejected
+    requests are taken back off the counter, so a client hammering a full
+    limit does not keep it full for everyone sharing it.
+
+    Args:
+        cache_alias: cache holding the counters; use a shared backend so
+            every process sees the same counts
+        clock: wall clock, injectable for tests
+    """
+
+    def __init__(self, cache_alias=None, clock=time.time):
+        self.cache_alias = cache_alias
+        self.clock = clock
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or settings.THROTTLE_CACHE_ALIAS]
+
+    def _slot_key(self, key, slot):
+        return f'throttle:{key}:{int(slot)}'
+
+    def hit(self, key, limit, window, now=None):
+        """
+        Count one request against key, unless it is rejected.
+
+        Args:
+            now: time of the request, default the clock; pass the same
+                value to release() to take the hit back later
+
+        Returns:
+            tuple: (allowed, seconds until a request would be allowed again)
+        """
+        if now is None:
+            now = self.clock()
+        slot, elapsed = divmod(now, window)
+        current_key = self._slot_key(key, slot)
+        previous_key = self._slot_key(key, slot - 1)
+
+        # add() is a no-op when the counter exists, so concurrent first hits
+        # cannot reset each other; incr() is atomic on every shared backend.
+        self.cache.add(current_key, 0, timeout=2 * window)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr().
+            self.cache.set(current_key, 1, timeout=2 * window)
+            current = 1
+        previous = self.cache.get(previous_key, 0)
+
+        weight = 1 - elapsed / window
+        estimate = previous * weight + current
+        if estimate <= limit:
+            return True, 0.0
+
+        self.release(key, window, now)
+        if current > limit or not previous:
+            return False, window - elapsed
+        # Time until the previous slot's weighted share drops enough.
+        return False, min(window - elapsed, (estimate - limit) / previous * window)
+
+    def release(self, key, window, now):
+        """Take back a request hit() counted against key at now."""
+        try:
+            self.cache.decr(self._slot_key(key, now // window))
+        except ValueError:
+            # The counter has expired already.
+            pass
+
+
+counter = SlidingWindowCounter()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class for the scoped throttles below.
+
+    Views name a `throttle_scope`; each throttle class adds its own kind,
+    and the rate comes from settings.THROTTLE_RATES['<scope>.<kind>'],
+    e.g. 'login.ip'. A scope with no configured rate is not throttled.
+
+    A request counts against a view's limits only if all of its throttles
+    let it through. DRF asks every throttle even after one has refused, so
+    a refusal takes back the hits the view's earlier throttles made, and
+    the throttles after it let the request pass uncounted.
+    """
+
+    kind = None
+
+    def get_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = settings.THROTTLE_RATES.get(f'{scope}.{self.kind}')
+        if not scope or not rate:
+            return True
+
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        hits = getattr(request, '_sliding_window_hits', [])
+        if hits is None:
+            # Already refused by another throttle.
+            return True
+
+        limit, window = parse_rate(rate)
+        key, now = f'{scope}:{self.kind}:{key}', counter.clock()
+        allowed, self._wait = counter.hit(key, limit, window, now=now)
+        if allowed:
+            hits.append((key, window, now))
+            request._sliding_window_hits = hits
+        else:
+            for hit in hits:
+                counter.release(*hit)
+            request._sliding_window_hits = None
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """Per client address (X-Forwarded-For aware through NUM_PROXIES)."""
+
+    kind = 'ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """Per authenticated user; anonymous requests fall back to the client address."""
+
+    kind = 'user'
+
+    def get_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return f'anon-{self.get_ident(request)}'
+
+
+class AccountRateThrottle(SlidingWindowThrottle):
+    """Per account named in the request body, to slow credential stuffing."""
+
+    kind = 'account'
+
+    def get_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email:
+            return None
+        return hashlib.md5(email.strip().lower().encode()).hexdigest()
+
+
+class EndpointRateThrottle(SlidingWindowThrottle):
+    """One budget shared by every caller of the endpoint."""
+
+    kind = 'endpoint'
+
+    def get_key(self, request, view):
+        return 'all'
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from orders.reservations import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Release stock held by unpaid orders whose reservation TTL has expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Reservations released per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and sweep every N seconds (default: run once)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            released = release_expired_reservations(batch_size=batch_size)
+            self.stdout.write(f'Released {released} expired reservations')
+
+            if not interval:
+                break
+            time.sleep(interval)
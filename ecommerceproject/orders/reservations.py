@@ -0,0 +1,178 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from products.inventory import (
+    StockAdjustmentResult,
+    commit_reserved_stock,
+    decrement_stock,
+    release_reserved_stock,
+    reserve_stock,
+)
+from .models import OrderItem, StockReservation
+
+logger = logging.getLogger(__name__)
+
+
+def hold_stock_for_order(order, order_items, ttl=None):
+    """
+    Reserve stock for a freshly created order.
+
+    Must run inside the transaction that created the order so a failed
+    hold rolls the order back as well.
+
+    Args:
+        order: Order instance
+        order_items: iterable of OrderItem instances for the order
+        ttl: optional timedelta, defaults to settings.STOCK_RESERVATION_TTL
+
+    Raises:
+        InsufficientStock: if any line cannot be held
+    """
+    ttl = ttl or settings.STOCK_RESERVATION_TTL
+    lines = [(item.product_id, item.quantity) for item in order_items]
+    result = reserve_stock(lines)
+
+    expires_at = timezone.now() + ttl
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            order=order,
+            product_id=product_id,
+            quantity=quantity,
+            expires_at=expires_at,
+        )
+        for product_id, quantity in result.fulfilled
+    ])
+    return result
+
+
+def commit_order_reservations(order):
+    """
+    Convert an order's held stock into a sale.
+
+    Lines whose hold has already been released (for example because the
+    payment arrived after the TTL) fall back to a direct stock decrement.
+    Lines already committed are left alone, so committing twice is a no-op.
+
+    Args:
+        order: Order instance
+
+    Returns:
+        StockAdjustmentResult
+    """
+    return commit_reservations([order.id])[order.id]
+
+
+def _split_by_order(results, lines, adjustment):
+    """Attribute a merged stock adjustment back to the order lines it came from."""
+    short = {product_id for product_id, _ in adjustment.unfulfilled}
+    for order_id, product_id, quantity in lines:
+        result = results[order_id]
+        (result.unfulfilled if product_id in short else result.fulfilled).append((product_id, quantity))
+
+
+def commit_reservations(order_ids):
+    """
+    Convert the held stock of several paid orders into sales.
+
+    Reservations are locked with one query, stock for every held line is
+    committed with one UPDATE, and lines with no reservation or a released
+    one are decremented with one more, so the query count does not depend on how many orders or
+    items are involved.
+
+    Args:
+        order_ids: iterable of Order ids
+
+    Returns:
+        dict: order id -> StockAdjustmentResult
+    """
+    order_ids = sorted(set(order_ids))
+    results = {order_id: StockAdjustmentResult() for order_id in order_ids}
+    if not order_ids:
+        return results
+
+    with transaction.atomic():
+        reservations = list(
+            StockReservation.objects.select_for_update()
+            .filter(order_id__in=order_ids, status__in=('held', 'committed'))
+            .order_by('id')
+            .values_list('id', 'order_id', 'product_id', 'quantity', 'status')
+        )
+        held = [reservation[:4] for reservation in reservations if reservation[4] == 'held']
+        held_lines = [(order_id, product_id, quantity) for _, order_id, product_id, quantity in held]
+
+        if held:
+            committed = commit_reserved_stock(
+                (product_id, quantity) for _, product_id, quantity in held_lines
+            )
+            StockReservation.objects.filter(
+                id__in=[reservation_id for reservation_id, _, _, _ in held]
+            ).update(status='committed')
+            _split_by_order(results, held_lines, committed)
+
+        # Committed lines were sold already; only lines with no reservation
+        # or a released one still need their stock taken.
+        reserved_products = {(order_id, product_id) for _, order_id, product_id, _, _ in reservations}
+        unreserved = [
+            (order_id, product_id, quantity)
+            for order_id, product_id, quantity in OrderItem.objects.filter(
+                order_id__in=order_ids
+            ).values_list('order_id', 'product_id', 'quantity')
+            if (order_id, product_id) not in reserved_products
+        ]
+        if unreserved:
+            direct = decrement_stock((product_id, quantity) for _, product_id, quantity in unreserved)
+            _split_by_order(results, unreserved, direct)
+
+    for order_id, result in results.items():
+        for product_id, quantity in result.unfulfilled:
+            logger.warning(
+                f"Insufficient stock for product {product_id} on order {order_id}. "
+                f"Required: {quantity}"
+            )
+
+    return results
+
+
+def release_expired_reservations(batch_size=500, now=None):
+    """
+    Release held reservations whose TTL has passed, one batch per transaction.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    sweepers can run side by side without blocking each other.
+
+    Args:
+        batch_size: number of reservations released per transaction
+        now: optional cut-off, defaults to the current time
+
+    Returns:
+        int: number of reservations released
+    """
+    now = now or timezone.now()
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status='held', expires_at__lte=now)
+                .order_by('id')
+                .values_list('id', 'product_id', 'quantity')[:batch_size]
+            )
+            if not batch:
+                break
+
+            release_reserved_stock(
+                (product_id, quantity) for _, product_id, quantity in batch
+            )
+            StockReservation.objects.filter(
+                id__in=[reservation_id for reservation_id, _, _ in batch]
+            ).update(status='released')
+
+        released += len(batch)
+        logger.info(f"Released {len(batch)} expired stock reservations")
+
+        if len(batch) < batch_size:
+            break
+
+    return released
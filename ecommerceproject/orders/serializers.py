@@ -1,6 +1,14 @@
+from decimal import Decimal
+from django.db import transaction
 from rest_framework import serializers
+from ecommerceproject.fieldsets import SparseFieldsetMixin
+from ecommerceproject.instrumentation import TimedSerializerMixin
+from ecommerceproject.projections import ProjectionSerializer
 from .models import Order, OrderItem
+from payments.payloads import wants_raw
+from products.inventory import InsufficientStock
 from products.models import Product
+from .reservations import hold_stock_for_order
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -42,10 +50,14 @@ class OrderCreateSerializer(serializers.Serializer):
                 )
             if item['quantity'] <= 0:
                 raise serializers.ValidationError("Quantity must be greater than 0.")
-            
-            try:
-                Product.objects.get(id=item['product_id'])
-            except Product.DoesNotExist:
+
+        # Load every referenced product in a single query and keep the
+        # snapshot around so create() prices the order from the same rows.
+        product_ids = {item['product_id'] for item in value}
+        self._products = Product.objects.in_bulk(product_ids)
+
+        for item in value:
+            if item['product_id'] not in self._products:
                 raise serializers.ValidationError(
                     f"Product with id {item['product_id']} does not exist."
                 )
@@ -55,41 +67,56 @@ class OrderCreateSerializer(serializers.Serializer):
     def create(self, validated_data):
         user = self.context['request'].user
         items_data = validated_data['items']
+        products = self._get_products(items_data)
 
-        total_amount = self._calculate_total(items_data)
-        
-        order = Order.objects.create(
-            user=user,
-            total_amount=total_amount,
-            status='pending'
-        )
-        
+        order_items = []
         for item_data in items_data:
-            product = Product.objects.get(id=item_data['product_id'])
+            product = products[item_data['product_id']]
             quantity = item_data['quantity']
-            
-            subtotal = product.price * quantity
-            
-            OrderItem.objects.create(
-                order=order,
+
+            order_items.append(OrderItem(
                 product=product,
                 quantity=quantity,
                 price=product.price,
-                subtotal=subtotal
-            )
+                subtotal=product.price * quantity
+            ))
+
+        total_amount = self._calculate_total(order_items)
+
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(
+                    user=user,
+                    total_amount=total_amount,
+                    status='pending'
+                )
+                for order_item in order_items:
+                    order_item.order = order
+                OrderItem.objects.bulk_create(order_items)
+                hold_stock_for_order(order, order_items)
+        except InsufficientStock as e:
+            raise serializers.ValidationError({
+                'items': [
+                    f"Insufficient stock for product {product_id}. Requested: {quantity}"
+                    for product_id, quantity in e.result.unfulfilled
+                ]
+            })
         
         return order
 
-    def _calculate_total(self, items_data):
-        total = 0
-        for item in items_data:
-            product = Product.objects.get(id=item['product_id'])
-            subtotal = product.price * item['quantity']
-            total += subtotal
-        return total
+    def _get_products(self, items_data):
+        products = getattr(self, '_products', None)
+        if products is None:
+            products = Product.objects.in_bulk(
+                {item['product_id'] for item in items_data}
+            )
+        return products
+
+    def _calculate_total(self, order_items):
+        return sum((order_item.subtotal for order_item in order_items), Decimal('0'))
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     user_id = serializers.CharField(source='user.id', read_only=True)
     user_name = serializers.CharField(source='user.name', read_only=True)
     items = OrderItemSerializer(many=True, read_only=True)
@@ -99,33 +126,41 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['id', 'user_id', 'user_name', 'total_amount', 'status', 'items', 'payment', 'created_at', 'updated_at']
         read_only_fields = ['id', 'total_amount', 'status', 'created_at', 'updated_at']
+        field_sources = {'payment': ('payment',)}
     
     def get_payment(self, obj):
         """Get payment details if payment exists for this order"""
         try:
             payment = obj.payment
-            return {
+            data = {
                 'id': payment.id,
                 'provider': payment.provider,
                 'transaction_id': payment.transaction_id,
                 'status': payment.status,
                 'created_at': payment.created_at,
             }
+            if wants_raw(self.context.get('request')):
+                data['raw_response'] = payment.raw_response
+            return data
         except:
             return None
 
 
-class OrderListSerializer(serializers.ModelSerializer):
+class OrderListSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.name', read_only=True)
-    item_count = serializers.SerializerMethodField()
+    item_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Order
         fields = ['id', 'user_name', 'total_amount', 'status', 'item_count', 'created_at']
         read_only_fields = ['id', 'status', 'created_at']
 
-    def get_item_count(self, obj):
-        return obj.items.count()
+
+class OrderListProjection(ProjectionSerializer):
+    """OrderListSerializer over values(); the queryset must annotate item_count."""
+
+    class Meta:
+        serializer = OrderListSerializer
 
 
 class OrderUpdateSerializer(serializers.ModelSerializer):
@@ -1,3 +1,251 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from accounts.models import User
+from products.models import Product
+from .models import Order, OrderItem, StockReservation
+from .reservations import commit_order_reservations, release_expired_reservations
 
-# Create your tests here.
+
+class OrderCreateQueryCountTests(APITestCase):
+    # Fixed upper bound for POST /api/orders/ regardless of basket size:
+    # product snapshot, order insert, item bulk insert, stock hold,
+    # reservation insert, transaction savepoints and the two reads used to
+    # render the response.
+    MAX_CREATE_QUERIES = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='buyer@example.com', password='password123', name='Buyer'
+        )
+        cls.products = Product.objects.bulk_create([
+            Product(
+                name=f'Product {i}',
+                sku=f'SKU-{i}',
+                description='',
+                price=Decimal('10.50'),
+                stock=100,
+            )
+            for i in range(50)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _create_order(self, size):
+        items = [
+            {'product_id': product.id, 'quantity': 2}
+            for product in self.products[:size]
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/orders/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_basket_size(self):
+        _, single = self._create_order(1)
+        _, large = self._create_order(50)
+
+        self.assertEqual(single, large)
+        self.assertLessEqual(large, self.MAX_CREATE_QUERIES)
+
+    def test_totals_are_computed_from_product_snapshot(self):
+        response, _ = self._create_order(3)
+
+        order = Order.objects.get(pk=response.data['id'])
+        self.assertEqual(order.total_amount, Decimal('63.00'))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertEqual(len(response.data['items']), 3)
+
+    def test_unknown_product_is_rejected(self):
+        response = self.client.post(
+            '/api/orders/',
+            {'items': [{'product_id': 999999, 'quantity': 1}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class StockReservationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='buyer@example.com', password='password123', name='Buyer'
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(
+            name='Limited', sku='LIMITED', description='', price=Decimal('5.00'), stock=3
+        )
+
+    def _order(self, quantity):
+        return self.client.post(
+            '/api/orders/',
+            {'items': [{'product_id': self.product.id, 'quantity': quantity}]},
+            format='json'
+        )
+
+    def test_order_creation_holds_stock(self):
+        response = self._order(2)
+
+        self.assertEqual(response.status_code, 201)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+        self.assertEqual(self.product.reserved_stock, 2)
+        self.assertEqual(self.product.available_stock, 1)
+        self.assertEqual(
+            StockReservation.objects.get(order_id=response.data['id']).status, 'held'
+        )
+
+    def test_order_is_rejected_when_stock_is_held_elsewhere(self):
+        self.assertEqual(self._order(2).status_code, 201)
+
+        response = self._order(2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 2)
+
+    def test_commit_turns_hold_into_sale(self):
+        order = Order.objects.get(pk=self._order(2).data['id'])
+
+        result = commit_order_reservations(order)
+
+        self.assertTrue(result.ok)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertEqual(self.product.reserved_stock, 0)
+        self.assertEqual(order.reservations.get().status, 'committed')
+
+    def test_committing_twice_leaves_stock_unchanged(self):
+        order = Order.objects.get(pk=self._order(2).data['id'])
+        commit_order_reservations(order)
+
+        result = commit_order_reservations(order)
+
+        self.assertEqual(result.fulfilled, [])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertEqual(self.product.reserved_stock, 0)
+
+    def test_sweeper_releases_expired_holds(self):
+        order = Order.objects.get(pk=self._order(3).data['id'])
+        order.reservations.update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        released = release_expired_reservations(batch_size=1)
+
+        self.assertEqual(released, 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_stock, 0)
+        self.assertEqual(order.reservations.get().status, 'released')
+
+    def test_commit_after_expiry_falls_back_to_direct_decrement(self):
+        order = Order.objects.get(pk=self._order(2).data['id'])
+        order.reservations.update(expires_at=timezone.now() - timedelta(minutes=1))
+        call_command('release_expired_reservations', stdout=StringIO())
+
+        result = commit_order_reservations(order)
+
+        self.assertTrue(result.ok)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertEqual(self.product.reserved_stock, 0)
+
+
+class OrderKeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        Order.objects.bulk_create(
+            Order(user=cls.admin, total_amount=Decimal('1.00')) for _ in range(45)
+        )
+        cls.expected_ids = list(
+            Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def _walk(self, url, key):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data[key]
+        return ids, response
+
+    def test_cursor_walk_matches_offset_ordering(self):
+        ids, last_page = self._walk('/api/orders/?cursor=', 'next')
+
+        self.assertEqual(ids, self.expected_ids)
+        self.assertNotIn('count', last_page.data)
+
+        backwards, _ = self._walk(last_page.data['previous'], 'previous')
+        self.assertEqual(backwards[:20], self.expected_ids[20:40])
+
+    def test_cursor_mode_skips_count_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/orders/?cursor=')
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertFalse(ctx.captured_queries[0]['sql'].startswith('SELECT COUNT('))
+
+    def test_approximate_count(self):
+        response = self.client.get('/api/orders/?cursor=&count=approx')
+        self.assertEqual(response.data['count'], 45)
+
+        response = self.client.get('/api/orders/?page=2&count=approx')
+        self.assertEqual(response.data['count'], 45)
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get('/api/orders/?page=3')
+
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected_ids[40:])
+
+    def test_invalid_cursor_returns_404(self):
+        self.assertEqual(self.client.get('/api/orders/?cursor=not-a-cursor').status_code, 404)
+
+
+class OrderListQueryCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        product = Product.objects.create(
+            name='Widget', sku='WIDGET', description='', price=Decimal('2.00'), stock=10
+        )
+        for size in range(1, 26):
+            order = Order.objects.create(user=cls.admin, total_amount=Decimal('2.00') * size)
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, product=product, quantity=1,
+                          price=Decimal('2.00'), subtotal=Decimal('2.00'))
+                for _ in range(size)
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def test_list_page_costs_constant_queries(self):
+        # COUNT(*) for the paginator plus one query for the page itself.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/orders/')
+
+        self.assertEqual(len(response.data['results']), 20)
+        first = response.data['results'][0]
+        self.assertEqual(first['item_count'], Order.objects.get(pk=first['id']).items.count())
+        self.assertEqual(first['user_name'], 'Admin')
@@ -1,7 +1,21 @@
 from django.urls import path
-from .views import OrderListCreateAPIView, OrderRetrieveUpdateAPIView
+from ecommerceproject.async_views import select_view
+from .views import (
+    AsyncOrderListCreateAPIView,
+    AsyncOrderRetrieveUpdateAPIView,
+    OrderListCreateAPIView,
+    OrderRetrieveUpdateAPIView,
+)
 
 urlpatterns = [
-    path('', OrderListCreateAPIView.as_view(), name='order-list-create'),
-    path('<int:pk>/', OrderRetrieveUpdateAPIView.as_view(), name='order-detail'),
+    path(
+        '',
+        select_view('order-list-create', OrderListCreateAPIView, AsyncOrderListCreateAPIView),
+        name='order-list-create',
+    ),
+    path(
+        '<int:pk>/',
+        select_view('order-detail', OrderRetrieveUpdateAPIView, AsyncOrderRetrieveUpdateAPIView),
+        name='order-detail',
+    ),
 ]
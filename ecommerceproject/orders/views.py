@@ -1,31 +1,52 @@
+from django.db.models import Count, Prefetch
 from rest_framework import mixins, generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from accounts.permissions import IsAdmin
-from .models import Order
+from ecommerceproject.async_views import AsyncAPIView, AsyncListModelMixin, AsyncRetrieveModelMixin
+from ecommerceproject.db_routing import ReplicaReadMixin
+from ecommerceproject.fieldsets import SparseQuerysetMixin
+from ecommerceproject.pagination import KeysetPagination
+from ecommerceproject.projections import ProjectionMixin
+from ecommerceproject.throttling import EndpointRateThrottle, UserRateThrottle
+from payments.payloads import wants_raw
+from .models import Order, OrderItem
 from .serializers import (
     OrderCreateSerializer,
     OrderSerializer,
-    OrderListSerializer,
+    OrderListProjection,
     OrderUpdateSerializer
 )
 
 
 class OrderListCreateAPIView(
+    ReplicaReadMixin,
+    SparseQuerysetMixin,
+    ProjectionMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     generics.GenericAPIView
 ):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    throttle_scope = 'order-create'
+
+    def get_throttles(self):
+        if self.request.method == 'POST':
+            return [UserRateThrottle(), EndpointRateThrottle()]
+        return []
 
     def get_queryset(self):
+        queryset = Order.objects.select_related('user')
+        if self.wants_field('item_count'):
+            queryset = queryset.annotate(item_count=Count('items'))
         if self.request.user.is_admin:
-            return Order.objects.all().prefetch_related('items')
-        return Order.objects.filter(user=self.request.user).prefetch_related('items')
+            return queryset
+        return queryset.filter(user=self.request.user)
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
-            return OrderListSerializer
+            return OrderListProjection
         return OrderCreateSerializer
 
     def get(self, request, *args, **kwargs):
@@ -38,12 +59,16 @@ class OrderListCreateAPIView(
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
-        
+
+        order = Order.objects.select_related('user', 'payment').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        ).get(pk=order.pk)
         output_serializer = OrderSerializer(order)
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
 
 
 class OrderRetrieveUpdateAPIView(
+    SparseQuerysetMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     generics.GenericAPIView
@@ -52,9 +77,14 @@ class OrderRetrieveUpdateAPIView(
     lookup_field = 'pk'
 
     def get_queryset(self):
+        queryset = Order.objects.select_related('user', 'payment').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        )
+        if wants_raw(self.request):
+            queryset = queryset.select_related('payment__payload')
         if self.request.user.is_admin:
-            return Order.objects.all().prefetch_related('items')
-        return Order.objects.filter(user=self.request.user).prefetch_related('items')
+            return queryset
+        return queryset.filter(user=self.request.user)
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -74,3 +104,17 @@ class OrderRetrieveUpdateAPIView(
 
     def patch(self, request, *args, **kwargs):
         return self.partial_update(request, *args, **kwargs)
+
+
+class AsyncOrderListCreateAPIView(AsyncListModelMixin, OrderListCreateAPIView, AsyncAPIView):
+    """OrderListCreateAPIView with an async GET; order creation is unchanged."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+
+class AsyncOrderRetrieveUpdateAPIView(AsyncRetrieveModelMixin, OrderRetrieveUpdateAPIView, AsyncAPIView):
+    """OrderRetrieveUpdateAPIView with an async GET; updates are unchanged."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
@@ -3,7 +3,3 @@ from django.apps import AppConfig
 
 class PaymentsConfig(AppConfig):
     name = 'payments'
-    
-    def ready(self):
-        """Import signals when app is ready"""
-        import payments.signals
@@ -0,0 +1,354 @@
+"""
+Local stand-in for the parts of the Stripe API this project uses.
+
+Serves PaymentIntent create/retrieve/list/confirm/cancel over HTTP so the
+real StripeGateway can be pointed at it (STRIPE_API_BASE), and emits
+correctly signed webhook events when intents are confirmed or canceled.
+Latency and failures can be injected for load and resilience testing.
+
+    server = FakeStripeServer(webhook_secret='whsec_local', latency=0.05).start()
+    # settings.STRIPE_API_BASE = server.url
+    ...
+    server.stop()
+
+or from the command line with ``manage.py fake_stripe``.
+"""
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import requests
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """Build the Stripe-Signature header value for a webhook payload."""
+    timestamp = timestamp or int(time.time())
+    signed = f'{timestamp}.{payload}'.encode()
+    digest = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def build_event(event_type, obj):
+    """Wrap an API object in a Stripe event envelope."""
+    return {
+        'id': f'evt_{uuid.uuid4().hex[:24]}',
+        'object': 'event',
+        'type': event_type,
+        'created': int(time.time()),
+        'data': {'object': obj},
+    }
+
+
+def decode_form(body):
+    """
+    Decode Stripe's form encoding (``metadata[order_id]=1``) into nested
+    dicts. Lists are not needed by the endpoints implemented here.
+    """
+    result = {}
+    for key, values in parse_qs(body, keep_blank_values=True).items():
+        parts = key.replace(']', '').split('[')
+        target = result
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = values[-1]
+    return result
+
+
+class FakeStripeError(Exception):
+    def __init__(self, status, error_type, message):
+        self.status = status
+        self.error_type = error_type
+        super().__init__(message)
+
+    def as_dict(self):
+        return {'error': {'type': self.error_type, 'message': str(self)}}
+
+
+class FakeStripe:
+    """
+    In-memory PaymentIntent store with fault injection.
+
+    Args:
+        webhook_secret: secret used to sign emitted webhook events
+        webhook_url: where to POST events; ignored if webhook_sink is given
+        webhook_sink: callable(payload, signature_header) receiving events
+        latency: seconds added to every API request
+        failure_rate: probability that a request fails with a 500 api_error
+        seed: random seed for reproducible failure injection
+    """
+
+    def __init__(self, webhook_secret='', webhook_url=None, webhook_sink=None,
+                 latency=0.0, failure_rate=0.0, seed=None):
+        self.webhook_secret = webhook_secret
+        self.webhook_url = webhook_url
+        self.webhook_sink = webhook_sink
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.intents = {}
+        self.order = []
+        self.positions = {}
+        self.idempotent_responses = {}
+        self.requests = []
+        self.script = []
+        self.webhook_failures = 0
+        self._lock = threading.Lock()
+
+    def fail_next(self, *faults):
+        """
+        Queue faults for the next requests, one per request. A fault is
+        'error' (500), 'rate_limit' (429) or 'timeout' (sleeps 5 seconds).
+        """
+        with self._lock:
+            self.script.extend(faults)
+
+    def reset(self):
+        with self._lock:
+            self.intents.clear()
+            self.order.clear()
+            self.positions.clear()
+            self.idempotent_responses.clear()
+            self.requests.clear()
+            self.script.clear()
+            self.webhook_failures = 0
+
+    # API
+
+    def handle(self, method, path, params, headers, client_port=None):
+        """Dispatch one API request and return (status, body dict)."""
+        with self._lock:
+            self.requests.append({
+                'method': method,
+                'path': path,
+                'params': params,
+                'idempotency_key': headers.get('Idempotency-Key'),
+                'client_port': client_port,
+            })
+            fault = self.script.pop(0) if self.script else None
+        if fault is None and self.failure_rate and self.rng.random() < self.failure_rate:
+            fault = 'error'
+
+        if self.latency:
+            time.sleep(self.latency)
+        if fault == 'timeout':
+            time.sleep(5)
+        elif fault == 'error':
+            return 500, FakeStripeError(500, 'api_error', 'Injected failure').as_dict()
+        elif fault == 'rate_limit':
+            return 429, FakeStripeError(429, 'rate_limit_error', 'Injected rate limit').as_dict()
+
+        key = headers.get('Idempotency-Key')
+        if method == 'POST' and key:
+            with self._lock:
+                if key in self.idempotent_responses:
+                    return self.idempotent_responses[key]
+
+        try:
+            response = 200, self.route(method, path, params)
+        except FakeStripeError as e:
+            response = e.status, e.as_dict()
+
+        if method == 'POST' and key and response[0] == 200:
+            with self._lock:
+                self.idempotent_responses[key] = response
+        return response
+
+    def route(self, method, path, params):
+        parts = [part for part in path.split('/') if part]
+        if parts[:2] != ['v1', 'payment_intents']:
+            raise FakeStripeError(404, 'invalid_request_error', f'Unrecognized request URL ({path})')
+
+        if len(parts) == 2:
+            if method == 'POST':
+                return self.create_intent(params)
+            return self.list_intents(params)
+        if len(parts) == 3 and method == 'GET':
+            return self.get_intent(parts[2])
+        if len(parts) == 4 and method == 'POST' and parts[3] == 'confirm':
+            return self.confirm_intent(parts[2], params)
+        if len(parts) == 4 and method == 'POST' and parts[3] == 'cancel':
+            return self.cancel_intent(parts[2])
+        raise FakeStripeError(404, 'invalid_request_error', f'Unrecognized request URL ({path})')
+
+    def create_intent(self, params):
+        try:
+            amount = int(params['amount'])
+        except (KeyError, ValueError):
+            raise FakeStripeError(400, 'invalid_request_error', 'Invalid integer: amount')
+        if 'currency' not in params:
+            raise FakeStripeError(400, 'invalid_request_error', 'Missing required param: currency.')
+
+        intent_id = f'pi_{uuid.uuid4().hex[:24]}'
+        intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': amount,
+            'currency': params['currency'],
+            'client_secret': f'{intent_id}_secret_{uuid.uuid4().hex[:12]}',
+            'created': int(time.time()),
+            'description': params.get('description'),
+            'metadata': params.get('metadata', {}),
+            'status': 'requires_payment_method',
+            'last_payment_error': None,
+            'charges': {'object': 'list', 'data': []},
+        }
+        with self._lock:
+            self.intents[intent_id] = intent
+            self.positions[intent_id] = len(self.order)
+            self.order.append(intent_id)
+        return intent
+
+    def get_intent(self, intent_id):
+        with self._lock:
+            intent = self.intents.get(intent_id)
+        if intent is None:
+            raise FakeStripeError(404, 'invalid_request_error', f"No such payment_intent: '{intent_id}'")
+        return intent
+
+    def list_intents(self, params):
+        # Intents are created in time order, so walking the creation order
+        # backwards lists newest first without sorting on every page.
+        limit = min(int(params.get('limit', 10)), 100)
+        created_gte = int((params.get('created') or {}).get('gte') or 0)
+        starting_after = params.get('starting_after')
+
+        with self._lock:
+            if starting_after:
+                if starting_after not in self.positions:
+                    raise FakeStripeError(
+                        400, 'invalid_request_error', f"No such payment_intent: '{starting_after}'"
+                    )
+                index = self.positions[starting_after] - 1
+            else:
+                index = len(self.order) - 1
+
+            data = []
+            while index >= 0 and len(data) <= limit:
+                intent = self.intents[self.order[index]]
+                if intent['created'] < created_gte:
+                    break
+                data.append(intent)
+                index -= 1
+
+        return {
+            'object': 'list',
+            'url': '/v1/payment_intents',
+            'has_more': len(data) > limit,
+            'data': data[:limit],
+        }
+
+    def confirm_intent(self, intent_id, params):
+        """
+        Settle an intent. Pass ``payment_method=pm_card_chargeDeclined`` to
+        simulate a decline (emits payment_intent.payment_failed).
+        """
+        intent = self.get_intent(intent_id)
+        if params.get('payment_method') == 'pm_card_chargeDeclined':
+            intent['status'] = 'requires_payment_method'
+            intent['last_payment_error'] = {'code': 'card_declined', 'message': 'Your card was declined.'}
+            event_type = 'payment_intent.payment_failed'
+        else:
+            intent['status'] = 'succeeded'
+            intent['charges']['data'] = [{'id': f'ch_{uuid.uuid4().hex[:24]}', 'object': 'charge'}]
+            event_type = 'payment_intent.succeeded'
+        self.emit(build_event(event_type, dict(intent)))
+        return intent
+
+    def cancel_intent(self, intent_id):
+        intent = self.get_intent(intent_id)
+        intent['status'] = 'canceled'
+        self.emit(build_event('payment_intent.canceled', dict(intent)))
+        return intent
+
+    # Webhooks
+
+    def emit(self, event):
+        """Sign and deliver event to the webhook sink or URL, if configured."""
+        payload = json.dumps(event)
+        signature = sign_payload(payload, self.webhook_secret)
+        try:
+            if self.webhook_sink is not None:
+                self.webhook_sink(payload, signature)
+            elif self.webhook_url:
+                requests.post(
+                    self.webhook_url,
+                    data=payload,
+                    headers={'Content-Type': 'application/json', 'Stripe-Signature': signature},
+                    timeout=5,
+                )
+        except Exception:
+            # Like Stripe, a failed delivery does not fail the API call.
+            with self._lock:
+                self.webhook_failures += 1
+        return event
+
+
+class FakeStripeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY every
+    # keep-alive response stalls on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        params = decode_form(body if method == 'POST' else url.query)
+        status, data = self.server.fake.handle(
+            method, url.path, params, self.headers, client_port=self.client_address[1]
+        )
+
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Request-Id', f'req_{uuid.uuid4().hex[:14]}')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeStripeServer:
+    """Runs a FakeStripe behind a threaded HTTP server on a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, fake=None, **options):
+        self.fake = fake or FakeStripe(**options)
+        self.httpd = ThreadingHTTPServer((host, port), FakeStripeRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self.fake
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,181 @@
+import logging
+import random
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import WebhookEvent
+from .providers import get_provider
+from .status import apply_status_updates
+
+logger = logging.getLogger(__name__)
+
+
+class RecentEvents:
+    """
+    Bounded, thread-safe LRU set of recently accepted webhook event keys.
+
+    Sits in front of the inbox's unique constraint so that redeliveries
+    hitting the same process are dropped without touching the database.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key):
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+recent_events = RecentEvents(settings.WEBHOOK_DEDUP_CACHE_SIZE)
+
+
+def enqueue_event(provider, event_id, event_type, payload):
+    """
+    Persist a verified webhook event to the inbox for the worker to process.
+
+    Providers deliver events at least once. Redeliveries seen recently by
+    this process are dropped in memory; the rest are dropped by the unique
+    (provider, event_id) constraint, so each event is stored exactly once.
+
+    Args:
+        provider: payment provider name, e.g. 'stripe'
+        event_id: provider-unique event id
+        event_type: provider event type
+        payload: event as a plain dict
+
+    Returns:
+        bool: False if the event was recognised as a duplicate in memory
+    """
+    key = (provider, event_id)
+    if key in recent_events:
+        logger.info(f"Duplicate webhook event {event_id} dropped")
+        return False
+
+    WebhookEvent.objects.bulk_create([
+        WebhookEvent(
+            provider=provider,
+            event_id=event_id,
+            event_type=event_type,
+            payload=payload,
+        )
+    ], ignore_conflicts=True)
+    recent_events.add(key)
+    return True
+
+
+def retry_delay(attempts):
+    """Exponential backoff with full jitter for the given attempt number."""
+    ceiling = min(
+        settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.WEBHOOK_RETRY_MAX_SECONDS,
+    )
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def status_updates(event):
+    return get_provider(event.provider).status_updates(event.payload)
+
+
+def process_event(event):
+    """
+    Apply one inbox event inside its own savepoint and record the outcome
+    on the event row.
+    """
+    event.attempts += 1
+
+    try:
+        with transaction.atomic():
+            apply_status_updates(status_updates(event))
+    except Exception as e:
+        event.last_error = f"{type(e).__name__}: {e}"
+        if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            event.status = 'failed'
+            logger.error(
+                f"Webhook event {event.event_id} failed permanently after "
+                f"{event.attempts} attempts: {event.last_error}"
+            )
+        else:
+            event.next_attempt_at = timezone.now() + retry_delay(event.attempts)
+            logger.warning(
+                f"Webhook event {event.event_id} failed (attempt {event.attempts}), "
+                f"retrying at {event.next_attempt_at.isoformat()}: {event.last_error}"
+            )
+    else:
+        event.status = 'processed'
+        event.processed_at = timezone.now()
+        event.last_error = ''
+
+    event.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error', 'processed_at'])
+
+
+def process_pending_events(batch_size=100):
+    """
+    Claim and process one batch of due inbox events.
+
+    Rows are locked with ``SELECT ... FOR UPDATE SKIP LOCKED`` for the
+    duration of the batch, so parallel workers never process the same
+    event and a crashed worker simply releases its rows.
+
+    The whole batch is first applied with a single apply_status_updates
+    call. If that fails, the events are retried one by one so only the
+    failing ones are rescheduled.
+
+    Returns:
+        int: number of events processed in this batch
+    """
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=timezone.now())
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        try:
+            with transaction.atomic():
+                apply_status_updates(
+                    update for event in events for update in status_updates(event)
+                )
+        except Exception as e:
+            logger.warning(
+                f"Batch of {len(events)} webhook events failed ({type(e).__name__}: {e}), "
+                f"processing individually"
+            )
+            for event in events:
+                process_event(event)
+        else:
+            WebhookEvent.objects.filter(id__in=[event.id for event in events]).update(
+                status='processed',
+                processed_at=timezone.now(),
+                last_error='',
+                attempts=F('attempts') + 1,
+            )
+
+    return len(events)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from payments.fake_stripe import FakeStripeServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local Stripe stand-in serving PaymentIntent endpoints and emitting '
+        'signed webhooks. Point STRIPE_API_BASE at it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument(
+            '--webhook-url', default='http://127.0.0.1:8000/api/payments/webhook/stripe/',
+            help='Where confirm/cancel events are delivered (empty to disable)',
+        )
+        parser.add_argument(
+            '--webhook-secret', default=None,
+            help='Signing secret (defaults to STRIPE_WEBHOOK_SECRET)',
+        )
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Added to every request')
+        parser.add_argument(
+            '--failure-rate', type=float, default=0.0,
+            help='Probability (0-1) that a request fails with a 500',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        server = FakeStripeServer(
+            host=options['host'],
+            port=options['port'],
+            webhook_secret=options['webhook_secret'] or settings.STRIPE_WEBHOOK_SECRET,
+            webhook_url=options['webhook_url'] or None,
+            latency=options['latency_ms'] / 1000,
+            failure_rate=options['failure_rate'],
+            seed=options['seed'],
+        )
+        self.stdout.write(f'Fake Stripe listening on {server.url} (set STRIPE_API_BASE={server.url})')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
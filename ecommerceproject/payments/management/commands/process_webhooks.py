@@ -0,0 +1,75 @@
+import logging
+import multiprocessing
+import signal
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from payments.inbox import process_pending_events
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(batch_size, poll_interval, once):
+    """Drain the webhook inbox until stopped (or until empty with once=True)."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    processed = 0
+    while not stopping:
+        close_old_connections()
+        count = process_pending_events(batch_size=batch_size)
+        processed += count
+
+        if count < batch_size:
+            if once:
+                break
+            time.sleep(poll_interval)
+
+    connections.close_all()
+    return processed
+
+
+class Command(BaseCommand):
+    help = 'Process queued webhook events from the inbox with retries and backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=1, help='Parallel worker processes')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to sleep when the inbox is empty',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once the inbox is drained')
+
+    def handle(self, *args, **options):
+        worker_args = (options['batch_size'], options['poll_interval'], options['once'])
+
+        if options['workers'] <= 1:
+            processed = run_worker(*worker_args)
+            self.stdout.write(f'Processed {processed} webhook events')
+            return
+
+        # Children must not inherit the parent's open database connections.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=run_worker, args=worker_args, name=f'webhook-worker-{i}')
+            for i in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Started {len(processes)} webhook workers')
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
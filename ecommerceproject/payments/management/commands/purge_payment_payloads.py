@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from payments.payloads import purge_payloads
+
+
+class Command(BaseCommand):
+    help = 'Delete raw provider payloads of settled payments past the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Retention in days (default: PAYMENT_PAYLOAD_RETENTION_DAYS)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Payloads deleted per transaction')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.PAYMENT_PAYLOAD_RETENTION_DAYS
+        deleted = purge_payloads(days, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} payment payloads older than {days} days'))
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from payments.providers import UnknownProvider
+from payments.reconciliation import Reconciler
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare local payments with the provider's payment list and correct "
+        "statuses left stale by lost webhooks. Resumes from the last checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--provider', default='stripe')
+        parser.add_argument(
+            '--since-days', type=int, default=None,
+            help='Only reconcile payments created in the last N days',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Payments matched per transaction')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Corrections per bulk update')
+        parser.add_argument('--page-size', type=int, default=100, help='Provider list page size')
+        parser.add_argument('--max-pages', type=int, default=None, help='Stop after N provider pages')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+        parser.add_argument('--dry-run', action='store_true', help='Report corrections without applying them')
+
+    def handle(self, *args, **options):
+        try:
+            reconciler = Reconciler(
+                options['provider'],
+                batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'],
+                page_size=options['page_size'],
+                dry_run=options['dry_run'],
+            )
+        except UnknownProvider:
+            raise CommandError(f"Unknown payment provider {options['provider']}")
+
+        created_gte = None
+        if options['since_days'] is not None:
+            created_gte = (timezone.now() - timedelta(days=options['since_days'])).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+
+        def progress(checkpoint):
+            self.stdout.write(
+                f'  scanned {checkpoint.scanned}, matched {checkpoint.matched}, '
+                f'corrected {checkpoint.corrected}'
+            )
+
+        try:
+            checkpoint = reconciler.run(
+                restart=options['restart'],
+                created_gte=created_gte,
+                max_pages=options['max_pages'],
+                progress=progress,
+            )
+        except NotImplementedError as e:
+            raise CommandError(str(e))
+
+        state = 'complete' if checkpoint.completed_at else f'paused at {checkpoint.cursor}'
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciliation {state}: {checkpoint.corrected} of {checkpoint.matched} '
+            f'matched payments corrected ({checkpoint.scanned} scanned)'
+            + (' [dry run]' if options['dry_run'] else '')
+        ))
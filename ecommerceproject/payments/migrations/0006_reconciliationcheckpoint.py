@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 02:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_webhookevent_unique_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('stripe', 'Stripe'), ('bkash', 'BKash')], max_length=50, unique=True)),
+                ('cursor', models.CharField(blank=True, default='', max_length=255)),
+                ('created_gte', models.DateTimeField(blank=True, null=True)),
+                ('scanned', models.IntegerField(default=0)),
+                ('matched', models.IntegerField(default=0)),
+                ('corrected', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
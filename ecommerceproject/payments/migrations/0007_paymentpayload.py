@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-18 02:35
+
+import json
+import zlib
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Payloads are always compressed from the PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES
+# default at the time of this migration, not from settings that can change
+# after it. Each row records whether it is compressed, so reads are unaffected.
+COMPRESS_MIN_BYTES = 512
+
+
+def copy_raw_responses(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    PaymentPayload = apps.get_model('payments', 'PaymentPayload')
+    db_alias = schema_editor.connection.alias
+    rows = Payment.objects.using(db_alias).filter(raw_response__isnull=False).values_list('id', 'raw_response').order_by('id')
+    last_id = 0
+    while True:
+        batch = list(rows.filter(id__gt=last_id)[:1000])
+        if not batch:
+            return
+        payloads = []
+        for payment_id, value in batch:
+            raw = json.dumps(value, separators=(',', ':')).encode()
+            compressed = len(raw) >= COMPRESS_MIN_BYTES
+            payloads.append(PaymentPayload(
+                payment_id=payment_id,
+                data=zlib.compress(raw) if compressed else raw,
+                compressed=compressed,
+                size=len(raw),
+            ))
+        PaymentPayload.objects.using(db_alias).bulk_create(payloads)
+        last_id = batch[-1][0]
+
+
+def restore_raw_responses(apps, schema_editor):
+    Payment = apps.get_model('payments', 'Payment')
+    PaymentPayload = apps.get_model('payments', 'PaymentPayload')
+    db_alias = schema_editor.connection.alias
+    rows = PaymentPayload.objects.using(db_alias).only('payment_id', 'data', 'compressed').order_by('payment_id')
+    last_id = 0
+    while True:
+        batch = list(rows.filter(payment_id__gt=last_id)[:1000])
+        if not batch:
+            return
+        payments = []
+        for payload in batch:
+            data = bytes(payload.data)
+            payments.append(Payment(
+                id=payload.payment_id,
+                raw_response=json.loads(zlib.decompress(data) if payload.compressed else data),
+            ))
+        Payment.objects.using(db_alias).bulk_update(payments, ['raw_response'])
+        last_id = batch[-1].payment_id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_reconciliationcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentPayload',
+            fields=[
+                ('payment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='payments.payment')),
+                ('data', models.BinaryField()),
+                ('compressed', models.BooleanField(default=False)),
+                ('size', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(copy_raw_responses, restore_raw_responses),
+        migrations.RemoveField(
+            model_name='payment',
+            name='raw_response',
+        ),
+    ]
@@ -1,4 +1,8 @@
+import json
+import zlib
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from orders.models import Order
 
 class Payment(models.Model):
@@ -17,12 +21,103 @@ class Payment(models.Model):
     provider = models.CharField(max_length=50, choices=PROVIDER_CHOICES)
     transaction_id = models.CharField(max_length=255, unique=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
-    raw_response = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Payment {self.id} - {self.status}"
 
+    @property
+    def raw_response(self):
+        """Provider payload from the side table (one query unless select_related)."""
+        try:
+            return self.payload.value
+        except PaymentPayload.DoesNotExist:
+            return None
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
+
+
+
+class PaymentPayload(models.Model):
+    """
+    Raw provider response for a payment, kept out of the payments table so
+    list and join queries never read it. Stored as JSON, zlib-compressed
+    when larger than PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES.
+    """
+
+    payment = models.OneToOneField(Payment, on_delete=models.CASCADE, primary_key=True, related_name='payload')
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Payload for payment {self.payment_id} ({self.size} bytes)"
+
+    @classmethod
+    def encode(cls, value):
+        """Return (data, compressed, size) for a JSON-serialisable value."""
+        raw = json.dumps(value, separators=(',', ':'), default=str).encode()
+        if settings.PAYMENT_PAYLOAD_COMPRESSION and len(raw) >= settings.PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES:
+            return zlib.compress(raw), True, len(raw)
+        return raw, False, len(raw)
+
+    @property
+    def value(self):
+        data = bytes(self.data)
+        if self.compressed:
+            data = zlib.decompress(data)
+        return json.loads(data)
+
+
+class WebhookEvent(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
+    provider = models.CharField(max_length=50, choices=Payment.PROVIDER_CHOICES)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"WebhookEvent {self.event_id} - {self.event_type} ({self.status})"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['provider', 'event_id'], name='unique_webhook_event'),
+        ]
+
+
+class ReconciliationCheckpoint(models.Model):
+    provider = models.CharField(max_length=50, choices=Payment.PROVIDER_CHOICES, unique=True)
+    cursor = models.CharField(max_length=255, blank=True, default='')
+    created_gte = models.DateTimeField(null=True, blank=True)
+    scanned = models.IntegerField(default=0)
+    matched = models.IntegerField(default=0)
+    corrected = models.IntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        state = 'completed' if self.completed_at else f'at {self.cursor or "start"}'
+        return f"Reconciliation {self.provider} ({state})"
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from ecommerceproject.fieldsets import requested_expansions
+from .models import PaymentPayload
+
+
+def save_payloads(payloads):
+    """
+    Insert or replace raw provider payloads with one bulk upsert.
+
+    Args:
+        payloads: iterable of (payment_id, JSON-serialisable value); None
+            values are skipped
+    """
+    rows = []
+    for payment_id, value in payloads:
+        if value is None:
+            continue
+        data, compressed, size = PaymentPayload.encode(value)
+        rows.append(PaymentPayload(payment_id=payment_id, data=data, compressed=compressed, size=size))
+    if not rows:
+        return
+
+    # MySQL upserts on any unique key and rejects an explicit target.
+    unique_fields = ['payment'] if connection.features.supports_update_conflicts_with_target else None
+    PaymentPayload.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=['data', 'compressed', 'size', 'updated_at'],
+    )
+
+
+def wants_raw(request):
+    """Whether the request asked for raw provider payloads with ?expand=raw."""
+    return 'raw' in requested_expansions(request)
+
+
+def purge_payloads(older_than_days, batch_size=1000, now=None):
+    """
+    Delete payloads of settled payments not touched for older_than_days.
+    Pending payments keep theirs, since reconciliation may still need them.
+
+    Returns:
+        int: number of payloads deleted
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                PaymentPayload.objects.filter(updated_at__lt=cutoff)
+                .exclude(payment__status='pending')
+                .values_list('payment_id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            PaymentPayload.objects.filter(payment_id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,63 @@
+"""
+Payment provider registry.
+
+Providers are configured in ``settings.PAYMENT_PROVIDERS`` as a mapping of
+name to adapter class path. An adapter's module (and therefore its SDK) is
+only imported the first time that provider is used in a process.
+"""
+import threading
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from .base import (
+    CreatedPayment,
+    PaymentProvider,
+    PaymentProviderError,
+    StatusUpdate,
+    WebhookVerificationError,
+)
+
+_providers = {}
+_lock = threading.Lock()
+
+
+class UnknownProvider(KeyError):
+    pass
+
+
+def provider_names():
+    return list(settings.PAYMENT_PROVIDERS)
+
+
+def get_provider(name):
+    """
+    Return the process-wide adapter instance for provider name.
+
+    Raises:
+        UnknownProvider: if name is not configured
+    """
+    provider = _providers.get(name)
+    if provider is not None:
+        return provider
+
+    with _lock:
+        if name not in _providers:
+            try:
+                path = settings.PAYMENT_PROVIDERS[name]
+            except KeyError:
+                raise UnknownProvider(name)
+            _providers[name] = import_string(path)()
+        return _providers[name]
+
+
+def reset_providers():
+    with _lock:
+        _providers.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(sender, setting, **kwargs):
+    if setting == 'PAYMENT_PROVIDERS' or setting.startswith('BKASH_'):
+        reset_providers()
+
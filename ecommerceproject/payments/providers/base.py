@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+
+class PaymentProviderError(Exception):
+    """The provider rejected or failed a request."""
+
+
+class WebhookVerificationError(Exception):
+    """A webhook request could not be authenticated or parsed."""
+
+
+# A payment status change reported by a provider, in provider-neutral terms.
+# status is one of Payment.STATUS_CHOICES; raw_response is stored on the payment.
+StatusUpdate = namedtuple('StatusUpdate', ['transaction_id', 'status', 'raw_response'])
+
+
+class CreatedPayment:
+    """
+    Result of starting a payment with a provider.
+
+    Args:
+        transaction_id: provider reference stored on Payment.transaction_id
+        raw_response: provider data stored on Payment.raw_response
+        client_data: fields returned to the API client to complete the payment
+    """
+
+    def __init__(self, transaction_id, raw_response, client_data):
+        self.transaction_id = transaction_id
+        self.raw_response = raw_response
+        self.client_data = client_data
+
+
+class PaymentProvider(ABC):
+    """
+    Interface every payment provider adapter implements.
+
+    Adapters are instantiated once per process by the registry, so they can
+    hold pooled HTTP sessions and other per-process state.
+    """
+
+    name = None
+
+    @abstractmethod
+    def create_payment(self, order):
+        """
+        Start a payment for order.
+
+        Returns:
+            CreatedPayment
+
+        Raises:
+            PaymentProviderError: if the provider refused the payment
+        """
+
+    @abstractmethod
+    def verify_webhook(self, request):
+        """
+        Authenticate a webhook request and return the decoded event dict.
+
+        Raises:
+            WebhookVerificationError: if the request is not authentic
+        """
+
+    @abstractmethod
+    def event_id(self, event):
+        """Provider-unique id of event, used to deduplicate deliveries."""
+
+    @abstractmethod
+    def event_type(self, event):
+        """Event type name, stored on the inbox row."""
+
+    @abstractmethod
+    def status_updates(self, event):
+        """
+        Translate an event into StatusUpdate tuples.
+
+        Returns an empty list for event types the adapter does not act on.
+        """
+
+    def handles(self, event):
+        """Whether event is worth queueing at all."""
+        return True
+
+    def handle_callback(self, request):
+        """
+        Handle the customer's redirect back from the provider, for providers
+        whose flow finishes on the merchant's side.
+
+        Returns:
+            list of StatusUpdate; empty while the provider has not settled
+            the payment
+
+        Raises:
+            WebhookVerificationError: if the request names no payment
+        """
+        raise NotImplementedError(f"{self.name} does not use payment callbacks")
+
+    def list_payments(self, cursor=None, created_gte=None, limit=100):
+        """
+        One page of the provider's payments, newest first, for reconciliation.
+
+        Args:
+            cursor: opaque cursor returned by the previous page, or None
+            created_gte: only payments created at or after this datetime
+            limit: page size
+
+        Returns:
+            (list of StatusUpdate, next cursor or None when exhausted);
+            payments still in flight have status 'pending'
+        """
+        raise NotImplementedError(f"{self.name} does not support listing payments")
+
+    def stats(self):
+        """Health and latency metrics for the provider-health endpoint."""
+        return {}
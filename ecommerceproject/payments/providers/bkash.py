@@ -0,0 +1,211 @@
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from payments.resilience import CircuitBreaker, LatencyRecorder, call_with_resilience
+from .base import (
+    CreatedPayment,
+    PaymentProvider,
+    PaymentProviderError,
+    StatusUpdate,
+    WebhookVerificationError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BkashTransientError(Exception):
+    """bKash answered with a 5xx; safe to retry where the call is idempotent."""
+
+
+class BkashProvider(PaymentProvider):
+    """
+    bKash Tokenized Checkout.
+
+    Flow: create a payment and send the customer to ``bkash_url``; bKash
+    redirects them to BKASH_CALLBACK_URL, where the payment is executed.
+    The redirect is unauthenticated, so a callback that does not end in a
+    completed execution only settles the payment as bKash's status query
+    reports it.
+    Asynchronous notifications arrive on the generic webhook endpoint,
+    authenticated with an HMAC-SHA256 of the body in ``X-Bkash-Signature``.
+    """
+
+    name = 'bkash'
+    CURRENCY = 'BDT'
+    SUCCESS_CODE = '0000'
+
+    EVENT_STATUSES = {
+        'Completed': 'success',
+        'Failed': 'failed',
+        'Cancelled': 'failed',
+    }
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.BKASH_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.breaker = CircuitBreaker('bkash')
+        self.latency = LatencyRecorder()
+        self._token = None
+        self._token_expires = 0
+        self._token_lock = threading.Lock()
+
+    # HTTP
+
+    def _post(self, path, payload, headers, retries=0):
+        def send():
+            response = self.session.post(
+                f"{settings.BKASH_BASE_URL.rstrip('/')}{path}",
+                json=payload,
+                headers={'Accept': 'application/json', **headers},
+                timeout=(settings.BKASH_CONNECT_TIMEOUT, settings.BKASH_READ_TIMEOUT),
+            )
+            if response.status_code >= 500:
+                raise BkashTransientError(f"bKash returned {response.status_code} for {path}")
+            return response.json()
+
+        return call_with_resilience(
+            send,
+            self.breaker,
+            self.latency,
+            retries=retries,
+            retry_on=(requests.ConnectionError, requests.Timeout, BkashTransientError),
+        )
+
+    def _authorized_post(self, path, payload, retries=0):
+        headers = {'Authorization': self.id_token(), 'X-APP-Key': settings.BKASH_APP_KEY}
+        return self._post(path, payload, headers, retries=retries)
+
+    def id_token(self):
+        """Grant token, cached until shortly before it expires."""
+        with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires:
+                return self._token
+
+            data = self._post(
+                '/tokenized/checkout/token/grant',
+                {'app_key': settings.BKASH_APP_KEY, 'app_secret': settings.BKASH_APP_SECRET},
+                {'username': settings.BKASH_USERNAME, 'password': settings.BKASH_PASSWORD},
+                retries=2,
+            )
+            if data.get('statusCode') != self.SUCCESS_CODE or 'id_token' not in data:
+                raise PaymentProviderError(f"bKash token grant failed: {data.get('statusMessage')}")
+
+            self._token = data['id_token']
+            self._token_expires = time.monotonic() + int(data.get('expires_in', 3600)) - 60
+            return self._token
+
+    # PaymentProvider
+
+    def create_payment(self, order):
+        amount = f'{order.total_amount:.2f}'
+        data = self._authorized_post('/tokenized/checkout/create', {
+            'mode': '0011',
+            'payerReference': str(order.user_id),
+            'callbackURL': settings.BKASH_CALLBACK_URL,
+            'amount': amount,
+            'currency': self.CURRENCY,
+            'intent': 'sale',
+            'merchantInvoiceNumber': f'order-{order.id}',
+        })
+        if data.get('statusCode') != self.SUCCESS_CODE:
+            logger.error(f"bKash create payment failed for Order #{order.id}: {data}")
+            raise PaymentProviderError(f"Payment creation failed: {data.get('statusMessage')}")
+
+        logger.info(f"bKash payment created: {data['paymentID']} for Order #{order.id}")
+        return CreatedPayment(
+            transaction_id=data['paymentID'],
+            raw_response={
+                'bkash_status': data.get('transactionStatus'),
+                'amount': float(order.total_amount),
+                'currency': self.CURRENCY,
+            },
+            client_data={
+                'bkash_payment_id': data['paymentID'],
+                'bkash_url': data['bkashURL'],
+                'amount': float(order.total_amount),
+                'currency': self.CURRENCY,
+            },
+        )
+
+    def execute_payment(self, payment_id):
+        return self._authorized_post('/tokenized/checkout/execute', {'paymentID': payment_id})
+
+    def query_payment(self, payment_id):
+        return self._authorized_post(
+            '/tokenized/checkout/payment/status', {'paymentID': payment_id}, retries=2
+        )
+
+    def handle_callback(self, request):
+        payment_id = request.GET.get('paymentID')
+        if not payment_id:
+            raise WebhookVerificationError('Missing payment reference')
+
+        if request.GET.get('status') == 'success':
+            data = self.execute_payment(payment_id)
+            if data.get('statusCode') == self.SUCCESS_CODE and data.get('transactionStatus') == 'Completed':
+                return [StatusUpdate(payment_id, 'success', self._raw_response(data))]
+
+        # Anyone can send the customer's redirect; only bKash's own record
+        # of the payment may fail it. Payments still in progress are left
+        # to the webhook and reconciliation.
+        data = self.query_payment(payment_id)
+        if data.get('statusCode') != self.SUCCESS_CODE:
+            logger.warning(f"bKash status query failed for {payment_id}: {data.get('statusMessage')}")
+            return []
+        return self.status_updates({**data, 'paymentID': payment_id})
+
+    def verify_webhook(self, request):
+        signature = request.META.get('HTTP_X_BKASH_SIGNATURE')
+        if not signature:
+            raise WebhookVerificationError('Missing bKash signature')
+        expected = hmac.new(
+            settings.BKASH_WEBHOOK_SECRET.encode(), request.body, hashlib.sha256
+        ).hexdigest()
+        if not settings.BKASH_WEBHOOK_SECRET or not hmac.compare_digest(expected, signature):
+            raise WebhookVerificationError('Invalid signature')
+        try:
+            return json.loads(request.body)
+        except ValueError:
+            raise WebhookVerificationError('Malformed payload')
+
+    def event_id(self, event):
+        # trxID only exists for completed payments
+        return event.get('trxID') or f"{event['paymentID']}:{event['transactionStatus']}"
+
+    def event_type(self, event):
+        return event['transactionStatus']
+
+    def handles(self, event):
+        return event.get('transactionStatus') in self.EVENT_STATUSES
+
+    def status_updates(self, event):
+        status = self.EVENT_STATUSES.get(event.get('transactionStatus'))
+        if status is None:
+            return []
+        if status == 'success':
+            raw_response = self._raw_response(event)
+        else:
+            raw_response = {
+                'bkash_status': event['transactionStatus'],
+                'error': event.get('statusMessage', f"Payment {event['transactionStatus'].lower()}"),
+            }
+        return [StatusUpdate(event['paymentID'], status, raw_response)]
+
+    def _raw_response(self, data):
+        return {
+            'bkash_status': data.get('transactionStatus'),
+            'trx_id': data.get('trxID'),
+            'amount': float(data['amount']) if data.get('amount') else None,
+            'currency': data.get('currency', self.CURRENCY),
+        }
+
+    def stats(self):
+        return {'breaker': self.breaker.stats(), 'latency': self.latency.stats()}
@@ -0,0 +1,124 @@
+import json
+from payments.resilience import CircuitOpenError
+from payments.stripe_service import StripePaymentService, get_stripe_gateway
+from .base import (
+    CreatedPayment,
+    PaymentProvider,
+    PaymentProviderError,
+    StatusUpdate,
+    WebhookVerificationError,
+)
+
+
+class StripeProvider(PaymentProvider):
+    """Stripe PaymentIntents, backed by StripePaymentService."""
+
+    name = 'stripe'
+
+    EVENT_STATUSES = {
+        'payment_intent.succeeded': 'success',
+        'payment_intent.payment_failed': 'failed',
+        'payment_intent.canceled': 'failed',
+    }
+
+    def create_payment(self, order):
+        try:
+            data = StripePaymentService.create_payment_intent(order)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise PaymentProviderError(str(e)) from e
+
+        return CreatedPayment(
+            transaction_id=data['payment_intent_id'],
+            raw_response=data,
+            client_data={
+                'client_secret': data['client_secret'],
+                'payment_intent_id': data['payment_intent_id'],
+                'amount': data['amount'],
+                'currency': data['currency'],
+            },
+        )
+
+    def verify_webhook(self, request):
+        sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
+        if not sig_header:
+            raise WebhookVerificationError('Missing Stripe signature')
+        try:
+            StripePaymentService.verify_webhook_signature(request.body, sig_header)
+        except Exception:
+            raise WebhookVerificationError('Invalid signature')
+        return json.loads(request.body)
+
+    def event_id(self, event):
+        return event['id']
+
+    def event_type(self, event):
+        return event['type']
+
+    def handles(self, event):
+        return event['type'] in self.EVENT_STATUSES
+
+    def status_updates(self, event):
+        status = self.EVENT_STATUSES.get(event['type'])
+        if status is None:
+            return []
+        return [self.intent_update(event['data']['object'], event['type'])]
+
+    def intent_update(self, payment_intent, event_type=None):
+        """
+        StatusUpdate for a PaymentIntent dict. Without an event type the
+        outcome is derived from the intent's own status, and intents still
+        in flight map to 'pending'.
+        """
+        if event_type is None:
+            if payment_intent['status'] == 'succeeded':
+                event_type = 'payment_intent.succeeded'
+            elif payment_intent['status'] == 'canceled':
+                event_type = 'payment_intent.canceled'
+            elif payment_intent.get('last_payment_error'):
+                event_type = 'payment_intent.payment_failed'
+            else:
+                return StatusUpdate(payment_intent['id'], 'pending', None)
+
+        if event_type == 'payment_intent.succeeded':
+            raw_response = {
+                'stripe_status': payment_intent['status'],
+                'amount': payment_intent['amount'] / 100,
+                'currency': payment_intent['currency'],
+                'client_secret': payment_intent['client_secret'],
+                'charges': [
+                    charge['id'] for charge in (payment_intent.get('charges') or {}).get('data', [])
+                ],
+            }
+        elif event_type == 'payment_intent.payment_failed':
+            last_error = payment_intent.get('last_payment_error') or {}
+            raw_response = {
+                'stripe_status': payment_intent['status'],
+                'error': last_error.get('message', 'Unknown error'),
+                'error_code': last_error.get('code'),
+            }
+        else:
+            raw_response = {
+                'stripe_status': payment_intent['status'],
+                'error': 'Payment was canceled',
+            }
+
+        return StatusUpdate(payment_intent['id'], self.EVENT_STATUSES[event_type], raw_response)
+
+    def list_payments(self, cursor=None, created_gte=None, limit=100):
+        params = {'limit': limit}
+        if cursor:
+            params['starting_after'] = cursor
+        if created_gte:
+            params['created'] = {'gte': int(created_gte.timestamp())}
+
+        page = get_stripe_gateway().call(
+            lambda client: client.v1.payment_intents.list(params=params)
+        )
+        intents = [intent.to_dict() for intent in page.data]
+        next_cursor = intents[-1]['id'] if page.has_more and intents else None
+        return [self.intent_update(intent) for intent in intents], next_cursor
+
+    def stats(self):
+        return get_stripe_gateway().stats()
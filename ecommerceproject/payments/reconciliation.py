@@ -0,0 +1,120 @@
+import logging
+from django.db import transaction
+from django.utils import timezone
+from .models import Payment, ReconciliationCheckpoint
+from .providers import get_provider
+from .status import ALLOWED_TRANSITIONS, apply_status_updates
+
+logger = logging.getLogger(__name__)
+
+
+class Reconciler:
+    """
+    Walks a provider's payment list and corrects local payments whose
+    status disagrees with the provider, e.g. because a webhook was lost.
+
+    Provider pages are buffered up to batch_size payments, matched against
+    the local table with one in_bulk query, and corrected through the shared
+    status-update path in chunks. Each flushed batch commits together with
+    the checkpoint, so an interrupted run resumes after the last committed
+    page and memory stays bounded by batch_size.
+
+    Args:
+        provider_name: configured payment provider, e.g. 'stripe'
+        batch_size: provider payments matched per transaction
+        chunk_size: corrections per apply_status_updates call
+        page_size: provider page size
+        dry_run: report corrections without applying them or moving the checkpoint
+    """
+
+    def __init__(self, provider_name, batch_size=1000, chunk_size=200, page_size=100, dry_run=False):
+        self.provider_name = provider_name
+        self.provider = get_provider(provider_name)
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.dry_run = dry_run
+
+    def checkpoint(self, restart=False, created_gte=None):
+        """Load the provider's checkpoint, starting a fresh run if needed."""
+        checkpoint, _ = ReconciliationCheckpoint.objects.get_or_create(provider=self.provider_name)
+        if restart or checkpoint.completed_at or created_gte != checkpoint.created_gte:
+            checkpoint.cursor = ''
+            checkpoint.created_gte = created_gte
+            checkpoint.scanned = checkpoint.matched = checkpoint.corrected = 0
+            checkpoint.started_at = timezone.now()
+            checkpoint.completed_at = None
+            if not self.dry_run:
+                checkpoint.save()
+        return checkpoint
+
+    def run(self, restart=False, created_gte=None, max_pages=None, progress=None):
+        """
+        Reconcile until the provider list is exhausted or max_pages pages
+        have been read.
+
+        Returns:
+            ReconciliationCheckpoint
+        """
+        checkpoint = self.checkpoint(restart=restart, created_gte=created_gte)
+        cursor = checkpoint.cursor or None
+        buffer = []
+        pages = 0
+
+        while True:
+            updates, next_cursor = self.provider.list_payments(
+                cursor=cursor, created_gte=checkpoint.created_gte, limit=self.page_size
+            )
+            buffer.extend(updates)
+            pages += 1
+            done = next_cursor is None
+            stop = done or (max_pages is not None and pages >= max_pages)
+
+            if len(buffer) >= self.batch_size or stop:
+                self.flush(checkpoint, buffer, next_cursor, done)
+                buffer = []
+                if progress:
+                    progress(checkpoint)
+            if stop:
+                return checkpoint
+            cursor = next_cursor
+
+    def corrections(self, updates):
+        """Provider updates that would change a local payment."""
+        local = (
+            Payment.objects.only('id', 'transaction_id', 'status')
+            .in_bulk([update.transaction_id for update in updates], field_name='transaction_id')
+        )
+        corrections = [
+            update for update in updates
+            if update.transaction_id in local
+            and update.status != 'pending'
+            and local[update.transaction_id].status != update.status
+            and local[update.transaction_id].status in ALLOWED_TRANSITIONS[update.status]
+        ]
+        return corrections, len(local)
+
+    def flush(self, checkpoint, updates, next_cursor, done):
+        with transaction.atomic():
+            corrections, matched = self.corrections(updates)
+            corrected = 0
+            if not self.dry_run:
+                for start in range(0, len(corrections), self.chunk_size):
+                    corrected += len(apply_status_updates(corrections[start:start + self.chunk_size]))
+            else:
+                corrected = len(corrections)
+
+            checkpoint.scanned += len(updates)
+            checkpoint.matched += matched
+            checkpoint.corrected += corrected
+            checkpoint.cursor = next_cursor or ''
+            if done:
+                checkpoint.completed_at = timezone.now()
+            if not self.dry_run:
+                checkpoint.save()
+
+        for update in corrections:
+            logger.info(
+                f"Reconciled {self.provider_name} payment {update.transaction_id} to {update.status}"
+                + (' (dry run)' if self.dry_run else '')
+            )
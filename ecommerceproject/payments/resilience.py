@@ -0,0 +1,204 @@
+"""
+Fault-tolerance primitives for calls to external payment providers.
+"""
+import math
+import random
+import threading
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider while its circuit breaker is open."""
+
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit is open, retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding window of recent calls.
+
+    closed: calls go through and outcomes are recorded.
+    open: calls fail fast with CircuitOpenError until reset_timeout passes.
+    half_open: a single trial call is let through; success closes the
+    circuit, failure opens it again.
+
+    State is per process, so each application worker trips independently.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_rate=0.5, window=20, min_calls=10,
+                 reset_timeout=30, clock=time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not be attempted."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+            if state == self.OPEN:
+                retry_after = self.reset_timeout - (self.clock() - self._opened_at)
+            else:
+                retry_after = self.reset_timeout
+            raise CircuitOpenError(self.name, max(retry_after, 0))
+
+    def record_success(self):
+        with self._lock:
+            if self._current_state() == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            state = self._current_state()
+            self._outcomes.append(False)
+            if state == self.HALF_OPEN or self._tripped():
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+    def _tripped(self):
+        if len(self._outcomes) < self.min_calls:
+            return False
+        failures = self._outcomes.count(False)
+        return failures / len(self._outcomes) >= self.failure_rate
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = self._outcomes.count(False)
+            return {
+                'state': self._current_state(),
+                'window_calls': calls,
+                'window_failures': failures,
+                'failure_rate': failures / calls if calls else 0.0,
+                'rejected': self.rejected,
+            }
+
+
+class LatencyRecorder:
+    """Thread-safe ring buffer of recent call durations and outcome counters."""
+
+    def __init__(self, size=1000):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self._samples.append(seconds)
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            calls, errors, retries = self.calls, self.errors, self.retries
+
+        def percentile(pct):
+            if not samples:
+                return 0.0
+            return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+        return {
+            'calls': calls,
+            'errors': errors,
+            'retries': retries,
+            'p50_ms': percentile(50) * 1000,
+            'p95_ms': percentile(95) * 1000,
+            'p99_ms': percentile(99) * 1000,
+        }
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff for retry number attempt (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def call_with_resilience(func, breaker, recorder, retries=2, retry_on=(Exception,),
+                         base_delay=0.1, max_delay=2.0, sleep=time.sleep):
+    """
+    Call func through breaker, retrying errors in retry_on with jittered
+    backoff.
+
+    Only exceptions in retry_on count as provider failures for the breaker;
+    anything else (e.g. a declined card) is the provider working correctly
+    and is re-raised immediately.
+
+    Args:
+        func: zero-argument callable performing the request
+        breaker: CircuitBreaker guarding the provider
+        recorder: LatencyRecorder for the provider
+        retries: maximum number of retries after the first attempt
+        retry_on: exception types that are transient
+        base_delay: first backoff ceiling in seconds
+        max_delay: maximum backoff ceiling in seconds
+        sleep: sleep function, injectable for tests
+
+    Returns:
+        Whatever func returns
+
+    Raises:
+        CircuitOpenError: if the breaker is open
+    """
+    attempt = 0
+    while True:
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = func()
+        except retry_on:
+            recorder.record(time.perf_counter() - started, ok=False)
+            breaker.record_failure()
+            attempt += 1
+            if attempt > retries:
+                raise
+            recorder.record_retry()
+            sleep(backoff_delay(attempt, base_delay, max_delay))
+        except Exception:
+            recorder.record(time.perf_counter() - started, ok=False)
+            breaker.record_success()
+            raise
+        else:
+            recorder.record(time.perf_counter() - started)
+            breaker.record_success()
+            return result
@@ -1,14 +1,31 @@
+from django.conf import settings
 from rest_framework import serializers
+from ecommerceproject.fieldsets import SparseFieldsetMixin
+from ecommerceproject.instrumentation import TimedSerializerMixin
+from ecommerceproject.projections import ProjectionSerializer
 from .models import Payment
 from orders.models import Order
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    raw_response = serializers.JSONField(read_only=True)
+
     class Meta:
         model = Payment
         fields = ['id', 'order', 'provider', 'transaction_id', 'status', 'raw_response',
                   'created_at', 'updated_at']
         read_only_fields = fields
+        # The raw provider payload lives in a side table; only read it when
+        # the client asks for it with ?expand=raw.
+        expandable_fields = {'raw': 'raw_response'}
+        field_sources = {'raw_response': ('payload',)}
+
+
+class PaymentProjection(ProjectionSerializer):
+    """PaymentSerializer over values(), without raw_response."""
+
+    class Meta:
+        serializer = PaymentSerializer
 
 
 class CreatePaymentIntentSerializer(serializers.Serializer):
@@ -17,7 +34,7 @@ class CreatePaymentIntentSerializer(serializers.Serializer):
         help_text="Order ID"
     )
     provider = serializers.ChoiceField(
-        choices=['stripe', 'bkash'],
+        choices=list(settings.PAYMENT_PROVIDERS),
         help_text="Payment provider"
     )
     
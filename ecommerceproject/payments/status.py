@@ -0,0 +1,93 @@
+import logging
+from django.db import transaction
+from django.utils import timezone
+from orders.models import Order
+from orders.reservations import commit_reservations
+from .models import Payment
+from .payloads import save_payloads
+
+logger = logging.getLogger(__name__)
+
+# Statuses a payment may move to, and the statuses it may move from.
+# A settled payment is never regressed by a late or repeated event, and a
+# repeated success never re-runs the stock commit.
+ALLOWED_TRANSITIONS = {
+    'success': {'pending', 'failed'},
+    'failed': {'pending'},
+}
+
+
+def apply_status_updates(updates):
+    """
+    Apply provider status updates to payments in one batch.
+
+    Everything runs in one transaction, so a payment is never left paid
+    with its order pending. Payments are loaded and locked in a single
+    query and written back with one bulk UPDATE, and their provider
+    payloads with one upsert; orders of newly successful payments are
+    marked paid with one more UPDATE and their reserved stock is committed
+    with set-based UPDATEs, so the query count does not grow with the
+    number of orders or order items. Updates are
+    applied in order, so several events for the same payment in a batch
+    resolve the same way as if they had been processed one by one.
+
+    Args:
+        updates: iterable of StatusUpdate
+
+    Returns:
+        list: Payment instances whose status changed
+    """
+    updates = list(updates)
+    if not updates:
+        return []
+
+    with transaction.atomic():
+        payments = (
+            Payment.objects.select_for_update()
+            .order_by('pk')
+            .in_bulk({update.transaction_id for update in updates}, field_name='transaction_id')
+        )
+
+        changed = {}
+        payloads = {}
+        newly_paid = {}
+        for update in updates:
+            payment = payments.get(update.transaction_id)
+            if payment is None:
+                logger.error(f"Payment record not found for transaction {update.transaction_id}")
+                continue
+            if payment.status not in ALLOWED_TRANSITIONS[update.status]:
+                logger.info(f"Payment {payment.id} already {payment.status}, skipping {update.status}")
+                continue
+
+            payment.status = update.status
+            changed[payment.pk] = payment
+            payloads[payment.pk] = update.raw_response
+            if update.status == 'success':
+                newly_paid[payment.pk] = payment
+
+        if not changed:
+            return []
+
+        now = timezone.now()
+        for payment in changed.values():
+            payment.updated_at = now
+        Payment.objects.bulk_update(changed.values(), ['status', 'updated_at'])
+        save_payloads(payloads.items())
+
+        if newly_paid:
+            Order.objects.filter(
+                id__in=[payment.order_id for payment in newly_paid.values()]
+            ).update(status='paid', updated_at=now)
+
+            results = commit_reservations(payment.order_id for payment in newly_paid.values())
+            for order_id, result in results.items():
+                if result.unfulfilled:
+                    logger.warning(
+                        f"Order {order_id} could not be fully fulfilled. "
+                        f"Unfulfilled lines: {result.unfulfilled}"
+                    )
+
+    for payment in changed.values():
+        logger.info(f"Payment {payment.id} ({payment.provider}) updated to {payment.status}")
+    return list(changed.values())
@@ -1,13 +1,112 @@
 import stripe
 import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from decimal import Decimal
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyRecorder, call_with_resilience
 
 logger = logging.getLogger(__name__)
 
 # Initialize Stripe with API key
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Errors worth retrying: network failures, throttling and 5xx responses.
+# Everything else (declines, invalid requests) is a definitive answer.
+TRANSIENT_STRIPE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.RateLimitError,
+    stripe.error.APIError,
+)
+
+
+class StripeGateway:
+    """
+    Process-wide Stripe API client.
+
+    Requests share one pooled ``requests`` session with explicit connect and
+    read timeouts, and go through a circuit breaker with bounded, jittered
+    retries so a slow or failing Stripe cannot tie up every worker.
+    """
+
+    def __init__(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.STRIPE_POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        self.client = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            base_addresses={'api': settings.STRIPE_API_BASE},
+            # Retries are handled by call() so the breaker sees every attempt.
+            max_network_retries=0,
+            http_client=stripe.RequestsClient(
+                session=session,
+                timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+            ),
+        )
+        self.session = session
+        self.breaker = CircuitBreaker(
+            'stripe',
+            failure_rate=settings.STRIPE_BREAKER_FAILURE_RATE,
+            window=settings.STRIPE_BREAKER_WINDOW,
+            min_calls=settings.STRIPE_BREAKER_MIN_CALLS,
+            reset_timeout=settings.STRIPE_BREAKER_RESET_SECONDS,
+        )
+        self.latency = LatencyRecorder()
+
+    def call(self, func):
+        """Run func(client) with retries, timeouts and the circuit breaker."""
+        return call_with_resilience(
+            lambda: func(self.client),
+            self.breaker,
+            self.latency,
+            retries=settings.STRIPE_MAX_RETRIES,
+            retry_on=TRANSIENT_STRIPE_ERRORS,
+            base_delay=settings.STRIPE_RETRY_BASE_SECONDS,
+            max_delay=settings.STRIPE_RETRY_MAX_SECONDS,
+        )
+
+    def stats(self):
+        return {
+            'breaker': self.breaker.stats(),
+            'latency': self.latency.stats(),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_stripe_gateway():
+    """Return the process-wide StripeGateway, creating it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = StripeGateway()
+    return _gateway
+
+
+def reset_stripe_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+        _gateway = None
+
+
+@receiver(setting_changed)
+def _reset_gateway_on_setting_change(sender, setting, **kwargs):
+    if setting.startswith('STRIPE_'):
+        reset_stripe_gateway()
+
 
 class StripePaymentService:
     """Service to handle Stripe payment operations"""
@@ -26,18 +125,24 @@ class StripePaymentService:
             dict: Payment intent details with client_secret
         """
         try:
-
-            amount = float(order.total_amount)
+            # Stripe amounts are integers in the currency's smallest unit
+            amount = int((order.total_amount * 100).to_integral_value())
             
-            intent = stripe.PaymentIntent.create(
-                amount=amount,
-                currency=StripePaymentService.CURRENCY,
-                metadata={
-                    'order_id': order.id,
-                    'user_email': order.user.email,
-                    'user_id': order.user.id,
-                },
-                description=f'Payment for Order #{order.id}',
+            intent = get_stripe_gateway().call(
+                lambda client: client.v1.payment_intents.create(
+                    params={
+                        'amount': amount,
+                        'currency': StripePaymentService.CURRENCY,
+                        'metadata': {
+                            'order_id': order.id,
+                            'user_email': order.user.email,
+                            'user_id': order.user.id,
+                        },
+                        'description': f'Payment for Order #{order.id}',
+                    },
+                    # Makes retries safe: Stripe replays the first result
+                    options={'idempotency_key': f'order-{order.id}-payment-intent'},
+                )
             )
             
             logger.info(f"Payment intent created: {intent.id} for Order #{order.id}")
@@ -49,6 +154,9 @@ class StripePaymentService:
                 'currency': StripePaymentService.CURRENCY,
                 'status': intent.status,
             }
+        except CircuitOpenError:
+            logger.warning(f"Stripe circuit open, not creating payment intent for Order #{order.id}")
+            raise
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error while creating payment intent: {str(e)}")
             raise Exception(f"Payment intent creation failed: {str(e)}")
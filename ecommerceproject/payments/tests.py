@@ -1,3 +1,792 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.db.models import Count
+from django.utils import timezone
+from accounts.models import User
+from benchmarks.loadtest import payment_succeeded_event
+from orders.models import Order, OrderItem
+from orders.reservations import hold_stock_for_order
+from products.models import Product
+from .fake_stripe import FakeStripeServer, sign_payload
+from .inbox import process_pending_events, recent_events
+from .providers import StatusUpdate, UnknownProvider, get_provider, reset_providers
+from .providers.bkash import BkashProvider
+from .models import Payment, PaymentPayload, ReconciliationCheckpoint, WebhookEvent
+from .payloads import save_payloads
+from .reconciliation import Reconciler
+from .resilience import CircuitBreaker, CircuitOpenError
+from .status import apply_status_updates
+from .stripe_service import StripePaymentService, get_stripe_gateway
 
-# Create your tests here.
+WEBHOOK_SECRET = 'whsec_test'
+
+
+def post_webhook(client, event, secret=WEBHOOK_SECRET):
+    payload = json.dumps(event)
+    return client.post(
+        '/api/payments/webhook/stripe/',
+        payload,
+        content_type='application/json',
+        HTTP_STRIPE_SIGNATURE=sign_payload(payload, secret),
+    )
+
+
+def create_paid_order_fixture(transaction_id='pi_test', quantity=2):
+    user = User.objects.create_user(
+        email=f'{transaction_id}@example.com', password='password123', name='Buyer'
+    )
+    product = Product.objects.create(
+        name='Widget', sku=f'SKU-{transaction_id}', description='',
+        price=Decimal('10.00'), stock=5,
+    )
+    order = Order.objects.create(user=user, total_amount=Decimal('10.00') * quantity)
+    items = OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=quantity,
+                  price=product.price, subtotal=product.price * quantity)
+    ])
+    hold_stock_for_order(order, items)
+    payment = Payment.objects.create(order=order, provider='stripe', transaction_id=transaction_id)
+    return payment, product
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class StripeWebhookInboxTests(TestCase):
+    def test_verified_event_is_queued_without_processing(self):
+        payment, _ = create_paid_order_fixture()
+
+        with self.assertNumQueries(1):
+            response = post_webhook(self.client, payment_succeeded_event('pi_test'))
+
+        self.assertEqual(response.status_code, 200)
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.event_type, 'payment_intent.succeeded')
+        self.assertEqual(event.status, 'pending')
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+
+    def test_invalid_signature_is_rejected(self):
+        response = post_webhook(self.client, payment_succeeded_event('pi_test'), secret='wrong')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_unhandled_event_types_are_not_stored(self):
+        event = payment_succeeded_event('pi_test')
+        event['type'] = 'customer.created'
+
+        self.assertEqual(post_webhook(self.client, event).status_code, 200)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class WebhookWorkerTests(TestCase):
+    def test_worker_applies_payment_success(self):
+        payment, product = create_paid_order_fixture()
+        post_webhook(self.client, payment_succeeded_event('pi_test'))
+
+        self.assertEqual(process_pending_events(), 1)
+
+        payment.refresh_from_db()
+        product.refresh_from_db()
+        self.assertEqual(payment.status, 'success')
+        self.assertEqual(payment.order.status, 'paid')
+        self.assertEqual(product.stock, 3)
+        self.assertEqual(product.reserved_stock, 0)
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, 'processed')
+        self.assertEqual(event.attempts, 1)
+        self.assertIsNotNone(event.processed_at)
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2, WEBHOOK_RETRY_BASE_SECONDS=60)
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        create_paid_order_fixture()
+        post_webhook(self.client, payment_succeeded_event('pi_test'))
+        event = WebhookEvent.objects.get()
+
+        with mock.patch('payments.inbox.apply_status_updates', side_effect=RuntimeError('db down')):
+            self.assertEqual(process_pending_events(), 1)
+
+            event.refresh_from_db()
+            self.assertEqual(event.status, 'pending')
+            self.assertEqual(event.attempts, 1)
+            self.assertIn('db down', event.last_error)
+            self.assertGreater(event.next_attempt_at, timezone.now() + timedelta(seconds=29))
+
+            # Not due yet, so nothing is claimed.
+            self.assertEqual(process_pending_events(), 0)
+
+            WebhookEvent.objects.update(next_attempt_at=timezone.now())
+            process_pending_events()
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, 'failed')
+        self.assertEqual(event.attempts, 2)
+
+    def test_bad_event_does_not_block_the_rest_of_the_batch(self):
+        create_paid_order_fixture('pi_good')
+        post_webhook(self.client, payment_succeeded_event('pi_good'))
+        broken = payment_succeeded_event('pi_broken')
+        del broken['data']
+        post_webhook(self.client, broken)
+
+        self.assertEqual(process_pending_events(), 2)
+
+        self.assertEqual(Payment.objects.get(transaction_id='pi_good').status, 'success')
+        statuses = dict(WebhookEvent.objects.values_list('event_id', 'status'))
+        self.assertEqual(statuses[broken['id']], 'pending')
+        self.assertEqual(list(statuses.values()).count('processed'), 1)
+
+    def test_batches_are_bounded(self):
+        for i in range(5):
+            create_paid_order_fixture(f'pi_{i}')
+            post_webhook(self.client, payment_succeeded_event(f'pi_{i}'))
+
+        self.assertEqual(process_pending_events(batch_size=3), 3)
+        self.assertEqual(process_pending_events(batch_size=3), 2)
+        self.assertEqual(Payment.objects.filter(status='success').count(), 5)
+
+
+class PaymentSuccessTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='success@example.com', password='password123', name='Buyer')
+
+    def create_order(self, reference, items, held=True):
+        products = [
+            Product.objects.create(
+                name=f'Widget {i}', sku=f'SKU-{reference}-{i}', description='',
+                price=Decimal('10.00'), stock=5,
+            )
+            for i in range(items)
+        ]
+        order = Order.objects.create(user=self.user, total_amount=Decimal('20.00') * items)
+        lines = OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=2, price=product.price, subtotal=product.price * 2)
+            for product in products
+        ])
+        if held:
+            hold_stock_for_order(order, lines)
+        Payment.objects.create(order=order, provider='stripe', transaction_id=reference)
+        return order
+
+    def count_queries(self, updates):
+        with CaptureQueriesContext(connection) as queries:
+            changed = apply_status_updates(updates)
+        self.assertEqual(len(changed), len(updates))
+        return len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_items_or_orders(self):
+        self.create_order('pi_small', items=1)
+        for i in range(3):
+            self.create_order(f'pi_large_{i}', items=6)
+
+        small = self.count_queries([StatusUpdate('pi_small', 'success', {})])
+        large = self.count_queries([StatusUpdate(f'pi_large_{i}', 'success', {}) for i in range(3)])
+
+        self.assertEqual(small, large)
+        self.assertEqual(Order.objects.filter(status='paid').count(), 4)
+        self.assertEqual(set(Product.objects.values_list('stock', 'reserved_stock')), {(3, 0)})
+
+    def test_orders_with_and_without_holds_commit_together(self):
+        held = self.create_order('pi_held', items=2)
+        expired = self.create_order('pi_expired', items=2, held=False)
+        Product.objects.filter(sku='SKU-pi_expired-0').update(stock=1)
+
+        apply_status_updates([StatusUpdate('pi_held', 'success', {}), StatusUpdate('pi_expired', 'success', {})])
+
+        stock = dict(Product.objects.values_list('sku', 'stock'))
+        self.assertEqual(stock, {
+            'SKU-pi_held-0': 3, 'SKU-pi_held-1': 3,
+            'SKU-pi_expired-0': 1, 'SKU-pi_expired-1': 3,
+        })
+        self.assertEqual(Product.objects.filter(reserved_stock__gt=0).count(), 0)
+        self.assertEqual(set(held.reservations.values_list('status', flat=True)), {'committed'})
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, 'paid')
+
+    def test_failure_leaves_payment_and_order_untouched(self):
+        order = self.create_order('pi_atomic', items=2)
+
+        with mock.patch('payments.status.commit_reservations', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                apply_status_updates([StatusUpdate('pi_atomic', 'success', {'status': 'succeeded'})])
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'pending')
+        self.assertEqual(order.payment.status, 'pending')
+        self.assertFalse(PaymentPayload.objects.exists())
+        self.assertEqual(set(Product.objects.values_list('stock', 'reserved_stock')), {(5, 2)})
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class WebhookDeduplicationTests(TestCase):
+    def setUp(self):
+        recent_events.clear()
+
+    def test_redelivery_is_dropped_in_memory(self):
+        create_paid_order_fixture()
+        event = payment_succeeded_event('pi_test')
+        post_webhook(self.client, event)
+
+        with self.assertNumQueries(0):
+            response = post_webhook(self.client, event)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(recent_events.hits, 1)
+
+    def test_unique_constraint_catches_redelivery_to_another_process(self):
+        create_paid_order_fixture()
+        event = payment_succeeded_event('pi_test')
+        post_webhook(self.client, event)
+        recent_events.clear()
+
+        self.assertEqual(post_webhook(self.client, event).status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+
+    def test_repeated_success_events_commit_stock_once(self):
+        payment, product = create_paid_order_fixture()
+        post_webhook(self.client, payment_succeeded_event('pi_test'))
+        post_webhook(self.client, payment_succeeded_event('pi_test'))
+
+        self.assertEqual(process_pending_events(), 2)
+
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 3)
+        self.assertEqual(product.reserved_stock, 0)
+
+    def test_late_failure_does_not_regress_success(self):
+        payment, _ = create_paid_order_fixture()
+        post_webhook(self.client, payment_succeeded_event('pi_test'))
+        failed = payment_succeeded_event('pi_test')
+        failed['type'] = 'payment_intent.payment_failed'
+        failed['data']['object']['status'] = 'requires_payment_method'
+        post_webhook(self.client, failed)
+
+        process_pending_events()
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'success')
+
+
+class FakeStripeServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeStripeServer(webhook_secret=WEBHOOK_SECRET).start()
+        cls.fake = cls.server.fake
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.server.stop()
+
+    def setUp(self):
+        self.fake.reset()
+        self.fake.webhook_sink = None
+        self.settings_override = override_settings(
+            STRIPE_API_BASE=self.server.url,
+            STRIPE_SECRET_KEY='sk_test_fake',
+            STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+            STRIPE_READ_TIMEOUT=0.2,
+            STRIPE_RETRY_BASE_SECONDS=0.001,
+            STRIPE_BREAKER_MIN_CALLS=3,
+            STRIPE_BREAKER_WINDOW=3,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def create_order(self):
+        user = User.objects.create_user(
+            email=f'gw{Order.objects.count()}@example.com', password='password123', name='Buyer'
+        )
+        return Order.objects.create(user=user, total_amount=Decimal('20.00'))
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        return client
+
+
+class StripeGatewayTests(FakeStripeServerMixin, TestCase):
+    def test_payment_intent_uses_pooled_connection_and_idempotency_key(self):
+        first = StripePaymentService.create_payment_intent(self.create_order())
+        StripePaymentService.create_payment_intent(self.create_order())
+
+        self.assertIn(first['payment_intent_id'], self.fake.intents)
+        requests = self.fake.requests
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]['params']['amount'], '2000')
+        self.assertTrue(requests[0]['idempotency_key'].startswith('order-'))
+        # Keep-alive: the second call reuses the first call's connection.
+        self.assertEqual(requests[0]['client_port'], requests[1]['client_port'])
+
+    def test_transient_errors_are_retried_with_the_same_idempotency_key(self):
+        self.fake.fail_next('error', 'rate_limit')
+
+        result = StripePaymentService.create_payment_intent(self.create_order())
+
+        self.assertEqual(len(self.fake.intents), 1)
+        self.assertIn(result['payment_intent_id'], self.fake.intents)
+        keys = {request['idempotency_key'] for request in self.fake.requests}
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(get_stripe_gateway().latency.stats()['retries'], 2)
+
+    @override_settings(STRIPE_MAX_RETRIES=0)
+    def test_slow_responses_time_out(self):
+        self.fake.fail_next('timeout')
+        order = self.create_order()
+        started = time.perf_counter()
+
+        with self.assertRaises(Exception):
+            StripePaymentService.create_payment_intent(order)
+
+        self.assertLess(time.perf_counter() - started, 1)
+
+    @override_settings(STRIPE_MAX_RETRIES=2)
+    def test_breaker_opens_and_payment_endpoint_fails_fast(self):
+        self.fake.fail_next('error', 'error', 'error')
+        # The call that trips the breaker still reports the provider error.
+        with self.assertRaisesMessage(Exception, 'Injected failure'):
+            StripePaymentService.create_payment_intent(self.create_order())
+        self.assertEqual(len(self.fake.requests), 3)
+        with self.assertRaises(CircuitOpenError):
+            StripePaymentService.create_payment_intent(self.create_order())
+
+        order = self.create_order()
+        response = self.client_for(order.user).post(
+            '/api/payments/', {'order_id': order.id, 'provider': 'stripe'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertEqual(get_stripe_gateway().breaker.stats()['state'], 'open')
+
+    def test_provider_health_reports_breaker_and_latency(self):
+        StripePaymentService.create_payment_intent(self.create_order())
+        admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+
+        response = self.client_for(admin).get('/api/payments/provider-health/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stripe']['breaker']['state'], 'closed')
+        self.assertEqual(response.data['stripe']['latency']['calls'], 1)
+
+
+class FakeStripeTests(FakeStripeServerMixin, TestCase):
+    def test_sdk_can_retrieve_and_list_intents(self):
+        created = [StripePaymentService.create_payment_intent(self.create_order()) for _ in range(3)]
+        client = get_stripe_gateway().client
+
+        intent = client.v1.payment_intents.retrieve(created[0]['payment_intent_id'])
+        page = client.v1.payment_intents.list(params={'limit': 2})
+
+        self.assertEqual(intent.amount, 2000)
+        self.assertEqual(intent.metadata['order_id'], str(Order.objects.order_by('id').first().id))
+        self.assertEqual(len(page.data), 2)
+        self.assertTrue(page.has_more)
+
+    def test_payment_flow_end_to_end(self):
+        recent_events.clear()
+        self.fake.webhook_sink = lambda payload, signature: self.client.post(
+            '/api/payments/webhook/stripe/', payload,
+            content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+        )
+        order = self.create_order()
+
+        response = self.client_for(order.user).post(
+            '/api/payments/', {'order_id': order.id, 'provider': 'stripe'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        self.fake.confirm_intent(response.data['payment_intent_id'], {})
+        self.assertEqual(WebhookEvent.objects.get().event_type, 'payment_intent.succeeded')
+        process_pending_events()
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'paid')
+        self.assertEqual(order.payment.status, 'success')
+        self.assertEqual(self.fake.webhook_failures, 0)
+
+    def test_declined_confirmation_emits_payment_failed(self):
+        recent_events.clear()
+        delivered = []
+        self.fake.webhook_sink = lambda payload, signature: delivered.append((payload, signature))
+        intent = self.fake.create_intent({'amount': '500', 'currency': 'bdt'})
+
+        self.fake.confirm_intent(intent['id'], {'payment_method': 'pm_card_chargeDeclined'})
+
+        payload, signature = delivered[0]
+        self.assertEqual(json.loads(payload)['type'], 'payment_intent.payment_failed')
+        self.assertEqual(signature, sign_payload(payload, WEBHOOK_SECRET, signature[2:12]))
+
+
+class ReconcilePaymentsTests(FakeStripeServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        reset_providers()
+        user = User.objects.create_user(email='rec@example.com', password='password123', name='Buyer')
+        orders = Order.objects.bulk_create(
+            Order(user=user, total_amount=Decimal('20.00')) for _ in range(30)
+        )
+        payments = []
+        for i, order in enumerate(orders):
+            intent = self.fake.create_intent({'amount': '2000', 'currency': 'bdt'})
+            # Settle at the provider without delivering the webhook.
+            if i % 3 == 0:
+                intent['status'] = 'succeeded'
+            elif i % 3 == 1:
+                intent['status'] = 'canceled'
+            payments.append(Payment(order=order, provider='stripe', transaction_id=intent['id']))
+        Payment.objects.bulk_create(payments)
+
+    def test_stale_payments_are_corrected_in_batches(self):
+        checkpoint = Reconciler('stripe', batch_size=8, page_size=5).run()
+
+        self.assertIsNotNone(checkpoint.completed_at)
+        self.assertEqual((checkpoint.scanned, checkpoint.matched, checkpoint.corrected), (30, 30, 20))
+        counts = dict(Payment.objects.values_list('status').annotate(n=Count('id')))
+        self.assertEqual(counts, {'success': 10, 'failed': 10, 'pending': 10})
+        self.assertEqual(Order.objects.filter(status='paid').count(), 10)
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        StripeProvider = type(get_provider('stripe'))
+        original = StripeProvider.list_payments
+        calls = []
+
+        def flaky(provider, cursor=None, **kwargs):
+            calls.append(cursor)
+            if len(calls) == 4:
+                raise RuntimeError('network down')
+            return original(provider, cursor=cursor, **kwargs)
+
+        with mock.patch.object(StripeProvider, 'list_payments', flaky):
+            with self.assertRaises(RuntimeError):
+                Reconciler('stripe', batch_size=10, page_size=5).run()
+
+        checkpoint = ReconciliationCheckpoint.objects.get(provider='stripe')
+        self.assertEqual(checkpoint.scanned, 10)
+        self.assertIsNone(checkpoint.completed_at)
+        resumed_from = checkpoint.cursor
+
+        with mock.patch.object(StripeProvider, 'list_payments', flaky):
+            call_command('reconcile_payments', page_size=5, batch_size=10, stdout=StringIO())
+
+        checkpoint.refresh_from_db()
+        self.assertEqual(calls[4], resumed_from)
+        self.assertEqual((checkpoint.scanned, checkpoint.corrected), (30, 20))
+        self.assertIsNotNone(checkpoint.completed_at)
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command('reconcile_payments', dry_run=True, stdout=out)
+
+        self.assertIn('20 of 30 matched payments corrected', out.getvalue())
+        self.assertEqual(Payment.objects.filter(status='pending').count(), 30)
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(
+            'test', failure_rate=0.5, window=4, min_calls=4, reset_timeout=10,
+            clock=lambda: self.now,
+        )
+
+    def test_trips_on_failure_rate_and_recovers_through_half_open(self):
+        for ok in (True, False, True, False):
+            self.breaker.before_call()
+            self.breaker.record_success() if ok else self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.now = 10
+        self.breaker.before_call()  # the single trial call
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_failed_trial_reopens(self):
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.now = 10
+        self.breaker.before_call()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.breaker.stats()['rejected'], 0)
+
+
+BKASH_SETTINGS = {
+    'BKASH_BASE_URL': 'https://bkash.test/v1.2.0-beta',
+    'BKASH_APP_KEY': 'app-key',
+    'BKASH_WEBHOOK_SECRET': 'bkash-secret',
+}
+
+
+class FakeBkashAPI:
+    """Canned responses for BkashProvider._post, keyed by path."""
+
+    def __init__(self):
+        self.calls = []
+        self.execute_status = 'Completed'
+        self.query_status = 'Initiated'
+
+    def __call__(self, path, payload, headers, retries=0):
+        self.calls.append(path)
+        if path.endswith('/token/grant'):
+            return {'statusCode': '0000', 'id_token': 'token-1', 'expires_in': 3600}
+        if path.endswith('/create'):
+            return {
+                'statusCode': '0000',
+                'paymentID': f"TR{payload['merchantInvoiceNumber']}",
+                'bkashURL': 'https://sandbox.payment.bkash.com/?paymentId=1',
+                'transactionStatus': 'Initiated',
+            }
+        if path.endswith('/execute'):
+            return {
+                'statusCode': '0000',
+                'paymentID': payload['paymentID'],
+                'trxID': 'TRX123',
+                'transactionStatus': self.execute_status,
+                'amount': '40.00',
+                'currency': 'BDT',
+            }
+        if path.endswith('/payment/status'):
+            return {
+                'statusCode': '0000',
+                'paymentID': payload['paymentID'],
+                'transactionStatus': self.query_status,
+                'amount': '40.00',
+                'currency': 'BDT',
+            }
+        raise AssertionError(f'Unexpected bKash call {path}')
+
+
+@override_settings(**BKASH_SETTINGS)
+class PaymentProviderRegistryTests(TestCase):
+    def setUp(self):
+        reset_providers()
+        recent_events.clear()
+        self.fake_api = FakeBkashAPI()
+        patcher = mock.patch.object(BkashProvider, '_post', side_effect=self.fake_api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def bkash_payment(self, reference='bkash'):
+        payment, product = create_paid_order_fixture(reference)
+        order = payment.order
+        payment.delete()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(order.user).access_token}')
+        response = client.post('/api/payments/', {'order_id': order.id, 'provider': 'bkash'}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response, product
+
+    def test_providers_are_loaded_lazily_once(self):
+        from . import providers
+
+        self.assertEqual(providers._providers, {})
+        self.assertIs(get_provider('stripe'), get_provider('stripe'))
+        self.assertEqual(list(providers._providers), ['stripe'])
+        with self.assertRaises(UnknownProvider):
+            get_provider('paypal')
+
+    def test_unknown_provider_webhook_is_404(self):
+        response = self.client.post('/api/payments/webhook/paypal/', '{}', content_type='application/json')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_bkash_payment_is_created_and_token_reused(self):
+        response, _ = self.bkash_payment()
+        self.bkash_payment('bkash-2')
+
+        self.assertEqual(response.data['bkash_url'], 'https://sandbox.payment.bkash.com/?paymentId=1')
+        payment = Payment.objects.get(id=response.data['payment_id'])
+        self.assertEqual(payment.provider, 'bkash')
+        self.assertEqual(payment.transaction_id, response.data['bkash_payment_id'])
+        self.assertEqual(self.fake_api.calls.count('/tokenized/checkout/token/grant'), 1)
+
+    def test_bkash_callback_executes_and_settles_payment(self):
+        response, product = self.bkash_payment()
+        payment = Payment.objects.get(id=response.data['payment_id'])
+
+        callback = self.client.get(
+            '/api/payments/callback/bkash/', {'paymentID': payment.transaction_id, 'status': 'success'}
+        )
+
+        self.assertEqual(callback.status_code, 200)
+        self.assertEqual(callback.json()['status'], 'success')
+        payment.refresh_from_db()
+        product.refresh_from_db()
+        self.assertEqual(payment.status, 'success')
+        self.assertEqual(payment.raw_response['trx_id'], 'TRX123')
+        self.assertEqual(payment.order.status, 'paid')
+        self.assertEqual(product.reserved_stock, 0)
+
+    def test_bkash_callback_fails_payment_bkash_reports_cancelled(self):
+        response, _ = self.bkash_payment()
+        payment = Payment.objects.get(id=response.data['payment_id'])
+        self.fake_api.query_status = 'Cancelled'
+
+        self.client.get('/api/payments/callback/bkash/', {'paymentID': payment.transaction_id, 'status': 'cancel'})
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'failed')
+        self.assertNotIn('/tokenized/checkout/execute', self.fake_api.calls)
+
+    def test_forged_bkash_callback_does_not_fail_a_payment_in_progress(self):
+        response, _ = self.bkash_payment()
+        payment = Payment.objects.get(id=response.data['payment_id'])
+        self.fake_api.execute_status = 'Initiated'
+
+        for status in ('failure', 'success'):
+            callback = self.client.get(
+                '/api/payments/callback/bkash/', {'paymentID': payment.transaction_id, 'status': status}
+            )
+            self.assertEqual(callback.json(), {'success': False, 'status': 'pending'})
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'pending')
+        self.assertEqual(self.fake_api.calls.count('/tokenized/checkout/payment/status'), 2)
+
+    def test_bkash_callback_without_payment_reference_is_400(self):
+        callback = self.client.get('/api/payments/callback/bkash/', {'status': 'success'})
+
+        self.assertEqual(callback.status_code, 400)
+
+    def test_signed_bkash_webhook_goes_through_the_inbox(self):
+        response, _ = self.bkash_payment()
+        payment = Payment.objects.get(id=response.data['payment_id'])
+        body = json.dumps({
+            'paymentID': payment.transaction_id, 'trxID': 'TRX999',
+            'transactionStatus': 'Completed', 'amount': '40.00', 'currency': 'BDT',
+        })
+        signature = hmac.new(b'bkash-secret', body.encode(), hashlib.sha256).hexdigest()
+
+        rejected = self.client.post(
+            '/api/payments/webhook/bkash/', body, content_type='application/json',
+            HTTP_X_BKASH_SIGNATURE='0' * 64,
+        )
+        accepted = self.client.post(
+            '/api/payments/webhook/bkash/', body, content_type='application/json',
+            HTTP_X_BKASH_SIGNATURE=signature,
+        )
+
+        self.assertEqual(rejected.status_code, 400)
+        self.assertEqual(accepted.status_code, 200)
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.provider, event.event_id), ('bkash', 'TRX999'))
+        process_pending_events()
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'success')
+
+
+class PaymentPayloadTests(TestCase):
+    def setUp(self):
+        self.payment, _ = create_paid_order_fixture('pi_payload')
+        self.admin = User.objects.create_user(
+            email='payload-admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+
+    def test_large_payloads_are_compressed(self):
+        value = {'charges': ['ch_' + 'x' * 40] * 50}
+
+        with override_settings(PAYMENT_PAYLOAD_COMPRESS_MIN_BYTES=512):
+            save_payloads([(self.payment.pk, value), (self.payment.pk, None)])
+
+        payload = PaymentPayload.objects.get()
+        self.assertTrue(payload.compressed)
+        self.assertLess(len(bytes(payload.data)), payload.size)
+        self.assertEqual(Payment.objects.get().raw_response, value)
+
+        save_payloads([(self.payment.pk, {'status': 'succeeded'})])
+        self.assertFalse(PaymentPayload.objects.get().compressed)
+        self.assertEqual(Payment.objects.get().raw_response, {'status': 'succeeded'})
+
+    def test_lists_only_read_payloads_on_expand_raw(self):
+        save_payloads([(self.payment.pk, {'status': 'succeeded'})])
+        order_url = f'/api/orders/{self.payment.order_id}/'
+        self.client.get('/api/payments/')  # warm the authenticated user cache
+
+        with CaptureQueriesContext(connection) as plain:
+            payments = self.client.get('/api/payments/')
+            order = self.client.get(order_url)
+        with CaptureQueriesContext(connection) as expanded:
+            expanded_payments = self.client.get('/api/payments/?expand=raw')
+            expanded_order = self.client.get(f'{order_url}?expand=raw')
+
+        self.assertNotIn('raw_response', payments.data['results'][0])
+        self.assertNotIn('raw_response', order.data['payment'])
+        self.assertFalse(any('payments_paymentpayload' in q['sql'] for q in plain.captured_queries))
+        self.assertEqual(expanded_payments.data['results'][0]['raw_response'], {'status': 'succeeded'})
+        self.assertEqual(expanded_order.data['payment']['raw_response'], {'status': 'succeeded'})
+        self.assertEqual(len(expanded.captured_queries), len(plain.captured_queries))
+
+    def test_purge_keeps_pending_and_recent_payloads(self):
+        settled, _ = create_paid_order_fixture('pi_settled')
+        Payment.objects.filter(pk=settled.pk).update(status='success')
+        save_payloads([(self.payment.pk, {'n': 1}), (settled.pk, {'n': 2})])
+        PaymentPayload.objects.update(updated_at=timezone.now() - timedelta(days=200))
+
+        out = StringIO()
+        call_command('purge_payment_payloads', '--days', '180', stdout=out)
+        call_command('purge_payment_payloads', '--days', '400', stdout=out)
+
+        self.assertEqual(list(PaymentPayload.objects.values_list('payment_id', flat=True)), [self.payment.pk])
+        self.assertIn('Purged 1 payment payloads', out.getvalue())
+
+
+class PaymentPayloadMigrationTests(TransactionTestCase):
+    before, after = [('payments', '0006_reconciliationcheckpoint')], [('payments', '0007_paymentpayload')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        other_apps = [node for node in executor.loader.graph.leaf_nodes() if node[0] != 'payments']
+        return executor.loader.project_state(other_apps + targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_payloads_survive_a_rollback(self):
+        large = {'charges': ['ch_' + 'x' * 40] * 50}
+        apps = self.migrate(self.before)
+        user = apps.get_model('accounts', 'User').objects.create(email='m@example.com', name='Buyer')
+        Order, HistoricalPayment = apps.get_model('orders', 'Order'), apps.get_model('payments', 'Payment')
+        small, big = (
+            HistoricalPayment.objects.create(
+                order=Order.objects.create(user=user, total_amount=Decimal('10.00')),
+                transaction_id=f'pi_{n}', raw_response=value,
+            )
+            for n, value in enumerate([{'n': 1}, large])
+        )
+
+        with override_settings(PAYMENT_PAYLOAD_COMPRESSION=False):
+            payloads = self.migrate(self.after).get_model('payments', 'PaymentPayload').objects
+            self.assertEqual(dict(payloads.values_list('payment_id', 'compressed')), {small.pk: False, big.pk: True})
+        apps = self.migrate(self.before)
+
+        restored = apps.get_model('payments', 'Payment').objects.in_bulk()
+        self.assertEqual(restored[small.pk].raw_response, {'n': 1})
+        self.assertEqual(restored[big.pk].raw_response, large)
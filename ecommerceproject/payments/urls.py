@@ -1,6 +1,6 @@
 from django.urls import path
-from .views import PaymentViewSet
-from .webhook import stripe_webhook
+from .views import PaymentViewSet, ProviderHealthAPIView
+from .webhook import provider_callback, provider_webhook
 
 app_name = 'payments'
 
@@ -8,7 +8,10 @@ urlpatterns = [
     # Payment endpoints
     path('', PaymentViewSet.as_view(), name='payment-list'),
     path('<int:pk>/', PaymentViewSet.as_view(), name='payment-detail'),
+    path('provider-health/', ProviderHealthAPIView.as_view(), name='provider-health'),
     
-    # Webhook endpoint for Stripe
-    path('webhook/stripe/', stripe_webhook, name='stripe_webhook'),
+    # Provider webhooks and return URLs
+    path('webhook/stripe/', provider_webhook, {'provider': 'stripe'}, name='stripe_webhook'),
+    path('webhook/<str:provider>/', provider_webhook, name='provider-webhook'),
+    path('callback/<str:provider>/', provider_callback, name='provider-callback'),
 ]
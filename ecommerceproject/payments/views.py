@@ -4,42 +4,62 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import mixins, generics
+from rest_framework.views import APIView
 
 from accounts.permissions import IsAdmin
+from ecommerceproject.db_routing import ReplicaReadMixin
+from ecommerceproject.fieldsets import SparseQuerysetMixin
+from ecommerceproject.pagination import KeysetPagination
+from ecommerceproject.projections import ProjectionMixin
 from .models import Payment
+from .payloads import save_payloads, wants_raw
 from orders.models import Order
 from .serializers import (
+    PaymentProjection,
     PaymentSerializer,
     CreatePaymentIntentSerializer,
 )
-from .stripe_service import StripePaymentService
-import stripe
+from .providers import get_provider, provider_names
+from .resilience import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 
-class PaymentViewSet(mixins.CreateModelMixin,
+class PaymentViewSet(ReplicaReadMixin,
+                    SparseQuerysetMixin,
+                    ProjectionMixin,
+                    mixins.CreateModelMixin,
                     mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     generics.GenericAPIView):
     
     queryset = Payment.objects.all()
+    pagination_class = KeysetPagination
     
+    def reads_from_replica(self, request):
+        # Single payments are polled for status right after webhooks.
+        return request.method == 'GET' and not self.kwargs.get('pk')
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.request.method == 'GET':
             return [IsAdmin()]
         return [IsAuthenticated()]
     
     def get_serializer_class(self):
-        if self.action == 'create_intent':
+        if self.request.method == 'POST':
             return CreatePaymentIntentSerializer
-        return PaymentSerializer
+        if wants_raw(self.request):
+            return PaymentSerializer
+        return PaymentProjection
     
     def get_queryset(self):
         user = self.request.user
+        queryset = Payment.objects.all()
+        if wants_raw(self.request):
+            queryset = queryset.select_related('payload')
         if user.is_admin:
-            return Payment.objects.all()
-        return Payment.objects.filter(order__user=user)
+            return queryset
+        return queryset.filter(order__user=user)
     
     def get(self, request, *args, **kwargs):
         if self.kwargs.get('pk'):
@@ -53,41 +73,40 @@ class PaymentViewSet(mixins.CreateModelMixin,
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        order_id = serializer.validated_data['order_id']
+        order_id = serializer.validated_data['order_id'].pk
         provider = serializer.validated_data['provider']
         
         try:
             order = Order.objects.get(id=order_id, user=request.user, status='pending')
             
-            if provider == 'stripe':
-
-                payment_intent_data = StripePaymentService.create_payment_intent(order)
-
-                payment = Payment.objects.create(
-                    order=order,
-                    provider='stripe',
-                    transaction_id=payment_intent_data['payment_intent_id'],
-                    status='pending',
-                    raw_response=payment_intent_data,
-                )
-                
-                logger.info(f"Payment intent created for order {order_id}")
+            created = get_provider(provider).create_payment(order)
+            
+            payment = Payment.objects.create(
+                order=order,
+                provider=provider,
+                transaction_id=created.transaction_id,
+                status='pending',
+            )
+            save_payloads([(payment.pk, created.raw_response)])
+            
+            logger.info(f"{provider} payment created for order {order_id}")
+            
+            return Response({
+                'success': True,
+                'message': 'Payment created successfully',
+                **created.client_data,
+                'payment_id': payment.id,
+            }, status=status.HTTP_201_CREATED)
                 
-                return Response({
-                    'success': True,
-                    'message': 'Payment intent created successfully',
-                    'client_secret': payment_intent_data['client_secret'],
-                    'payment_intent_id': payment_intent_data['payment_intent_id'],
-                    'amount': payment_intent_data['amount'],
-                    'currency': payment_intent_data['currency'],
-                    'payment_id': payment.id,
-                }, status=status.HTTP_201_CREATED)
-            else:
-                return Response({
+        except CircuitOpenError as e:
+            return Response(
+                {
                     'success': False,
-                    'message': f'Payment provider {provider} not yet implemented'
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
+                    'message': 'Payment provider is temporarily unavailable, please retry shortly'
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(max(1, round(e.retry_after)))},
+            )
         except Order.DoesNotExist:
             return Response({
                 'success': False,
@@ -99,3 +118,10 @@ class PaymentViewSet(mixins.CreateModelMixin,
                 'success': False,
                 'message': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProviderHealthAPIView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        return Response({name: get_provider(name).stats() for name in provider_names()})
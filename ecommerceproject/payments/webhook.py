@@ -1,69 +1,60 @@
 import logging
-import json
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .models import Payment
-from .stripe_service import StripePaymentService
-import stripe
+from .inbox import enqueue_event
+from .providers import UnknownProvider, WebhookVerificationError, get_provider
+from .status import apply_status_updates
 
 logger = logging.getLogger(__name__)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def stripe_webhook(request):
+def provider_webhook(request, provider):
     """
-    Stripe webhook handler for payment events.
+    Webhook endpoint shared by all payment providers.
     
-    Handles the following Stripe events:
-    - payment_intent.succeeded: Payment completed successfully
-    - payment_intent.payment_failed: Payment failed
-    - payment_intent.canceled: Payment was canceled
+    Lets the provider adapter authenticate the request, stores the event in
+    the webhook inbox and returns immediately. The ``process_webhooks``
+    worker applies the event later, so a slow database never makes the
+    provider time out and retry.
+    
+    Event types the adapter does not act on are acknowledged and dropped.
     
     Args:
-        request: HTTP request containing Stripe webhook event
+        request: HTTP request containing the provider's webhook event
+        provider: provider name from the URL, e.g. 'stripe'
         
     Returns:
         JsonResponse with status and message
     """
-    
-    payload = request.body
-    sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
-    
-    if not sig_header:
-        logger.warning("Webhook received without Stripe signature")
+    try:
+        payment_provider = get_provider(provider)
+    except UnknownProvider:
         return JsonResponse({
             'success': False,
-            'error': 'Missing Stripe signature'
-        }, status=400)
+            'error': f'Unknown payment provider {provider}'
+        }, status=404)
     
     try:
-        # Verify webhook signature
-        event = StripePaymentService.verify_webhook_signature(payload, sig_header)
-        
-        logger.info(f"Webhook event received: {event['type']}")
+        event = payment_provider.verify_webhook(request)
+        event_type = payment_provider.event_type(event)
         
-        # Handle different event types
-        if event['type'] == 'payment_intent.succeeded':
-            handle_payment_succeeded(event['data']['object'])
-        
-        elif event['type'] == 'payment_intent.payment_failed':
-            handle_payment_failed(event['data']['object'])
-        
-        elif event['type'] == 'payment_intent.canceled':
-            handle_payment_canceled(event['data']['object'])
+        logger.info(f"Webhook event received from {provider}: {event_type}")
         
+        if payment_provider.handles(event):
+            enqueue_event(provider, payment_provider.event_id(event), event_type, event)
         else:
-            logger.info(f"Unhandled webhook event type: {event['type']}")
+            logger.info(f"Unhandled {provider} webhook event type: {event_type}")
         
         return JsonResponse({'success': True}, status=200)
     
-    except stripe.error.SignatureVerificationError as e:
-        logger.error(f"Invalid Stripe signature: {str(e)}")
+    except WebhookVerificationError as e:
+        logger.error(f"Rejected {provider} webhook: {str(e)}")
         return JsonResponse({
             'success': False,
-            'error': 'Invalid signature'
+            'error': str(e)
         }, status=400)
     
     except Exception as e:
@@ -74,108 +65,43 @@ def stripe_webhook(request):
         }, status=400)
 
 
-def handle_payment_succeeded(payment_intent):
-    """
-    Handle successful payment event.
-    
-    Args:
-        payment_intent: Stripe PaymentIntent object from webhook
+@require_http_methods(["GET"])
+def provider_callback(request, provider):
     """
-    try:
-        payment_intent_id = payment_intent['id']
-        
-        # Find payment record
-        try:
-            payment = Payment.objects.get(transaction_id=payment_intent_id)
-        except Payment.DoesNotExist:
-            logger.error(f"Payment record not found for intent {payment_intent_id}")
-            return
-        
-        # Update payment status
-        payment.status = 'success'
-        payment.raw_response = {
-            'stripe_status': payment_intent['status'],
-            'amount': payment_intent['amount'] / 100,
-            'currency': payment_intent['currency'],
-            'client_secret': payment_intent['client_secret'],
-            'charges': [charge['id'] for charge in payment_intent.get('charges', {}).get('data', [])],
-        }
-        payment.save()
-        
-        # Update order status
-        order = payment.order
-        order.status = 'paid'
-        order.save()
-        
-        logger.info(f"Payment {payment.id} updated to success status. Order {order.id} marked as paid.")
+    Return URL for providers whose checkout finishes on our side (bKash).
     
-    except Exception as e:
-        logger.error(f"Error handling payment success: {str(e)}")
-
-
-def handle_payment_failed(payment_intent):
-    """
-    Handle failed payment event.
+    The adapter completes the payment with the provider and the resulting
+    status is applied straight away through the shared status-update path.
+    A payment the provider has not settled yet is reported as pending and
+    left to the webhook.
     
     Args:
-        payment_intent: Stripe PaymentIntent object from webhook
+        request: HTTP request with the provider's query parameters
+        provider: provider name from the URL
+        
+    Returns:
+        JsonResponse with the resulting payment status
     """
     try:
-        payment_intent_id = payment_intent['id']
-        
-        # Find payment record
-        try:
-            payment = Payment.objects.get(transaction_id=payment_intent_id)
-        except Payment.DoesNotExist:
-            logger.error(f"Payment record not found for intent {payment_intent_id}")
-            return
-        
-        # Update payment status
-        payment.status = 'failed'
-        error_message = 'Unknown error'
-        if payment_intent.get('last_payment_error'):
-            error_message = payment_intent['last_payment_error'].get('message', 'Unknown error')
-        
-        payment.raw_response = {
-            'stripe_status': payment_intent['status'],
-            'error': error_message,
-            'error_code': payment_intent.get('last_payment_error', {}).get('code'),
-        }
-        payment.save()
-        
-        # Keep order in pending status (user can retry)
-        logger.warning(f"Payment {payment.id} failed: {error_message}")
-    
+        payment_provider = get_provider(provider)
+        updates = payment_provider.handle_callback(request)
+    except WebhookVerificationError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except (UnknownProvider, NotImplementedError):
+        return JsonResponse({
+            'success': False,
+            'error': f'Payment provider {provider} has no callback'
+        }, status=404)
     except Exception as e:
-        logger.error(f"Error handling payment failure: {str(e)}")
-
-
-def handle_payment_canceled(payment_intent):
-    """
-    Handle canceled payment event.
+        logger.error(f"{provider} callback error: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=502)
     
-    Args:
-        payment_intent: Stripe PaymentIntent object from webhook
-    """
-    try:
-        payment_intent_id = payment_intent['id']
-        
-        # Find payment record
-        try:
-            payment = Payment.objects.get(transaction_id=payment_intent_id)
-        except Payment.DoesNotExist:
-            logger.error(f"Payment record not found for intent {payment_intent_id}")
-            return
-        
-        # Update payment status
-        payment.status = 'failed'
-        payment.raw_response = {
-            'stripe_status': payment_intent['status'],
-            'error': 'Payment was canceled',
-        }
-        payment.save()
-        
-        logger.warning(f"Payment {payment.id} was canceled by user")
+    if not updates:
+        return JsonResponse({'success': False, 'status': 'pending'})
     
-    except Exception as e:
-        logger.error(f"Error handling payment cancellation: {str(e)}")
+    apply_status_updates(updates)
+    status = updates[-1].status
+    return JsonResponse({'success': status == 'success', 'status': status})
@@ -0,0 +1,197 @@
+import hashlib
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from ecommerceproject.db_routing import read_from_primary
+
+
+class CatalogCache:
+    """
+    Versioned read-through cache for catalog responses.
+
+    Every entry lives under a namespace ('products', 'categories') whose
+    version number is part of the key. Invalidating a namespace bumps its
+    version, so stale entries are simply never read again and age out of
+    the backend on their own.
+    """
+
+    NAMESPACES = ('products', 'categories')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        return caches[settings.CATALOG_CACHE_ALIAS]
+
+    def _version_key(self, namespace):
+        return f'catalog:{namespace}:version'
+
+    def version(self, namespace):
+        key = self._version_key(namespace)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, 1, timeout=None)
+            version = self.cache.get(key, 1)
+        return version
+
+    def make_key(self, namespace, suffix):
+        digest = hashlib.md5(suffix.encode()).hexdigest()
+        return f'catalog:{namespace}:v{self.version(namespace)}:{digest}'
+
+    def lookup(self, namespace, suffix):
+        """
+        Read an entry under the namespace's current version.
+
+        Returns:
+            tuple: (key, value or None). On a miss, pass key to store() so
+            the response is written under the version it was read at: if
+            the namespace is invalidated meanwhile, the entry is orphaned
+            instead of being served as current.
+        """
+        key = self.make_key(namespace, suffix)
+        value = self.cache.get(key)
+        self._count(namespace, 'hits' if value is not None else 'misses')
+        return key, value
+
+    def store(self, key, value):
+        self.cache.set(key, value, timeout=settings.CATALOG_CACHE_TIMEOUT)
+
+    def get(self, namespace, suffix):
+        return self.lookup(namespace, suffix)[1]
+
+    def set(self, namespace, suffix, value):
+        self.store(self.make_key(namespace, suffix), value)
+
+    def delete(self, namespace, suffix):
+        self.cache.delete(self.make_key(namespace, suffix))
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces or self.NAMESPACES:
+            key = self._version_key(namespace)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # Version key was evicted; start a fresh generation.
+                self.cache.set(key, 2, timeout=None)
+
+    def invalidate_product_details(self, product_ids):
+        for product_id in product_ids:
+            self.delete('products', product_detail_key(product_id))
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            self._stats[namespace][outcome] += 1
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                namespace: {'hits': 0, 'misses': 0}
+                for namespace in self.NAMESPACES
+            }
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for namespace, counters in self._stats.items():
+                lookups = counters['hits'] + counters['misses']
+                stats[namespace] = {
+                    **counters,
+                    'hit_rate': round(counters['hits'] / lookups, 4) if lookups else None,
+                }
+            return stats
+
+
+def product_detail_key(product_id):
+    return f'detail:{product_id}'
+
+
+catalog_cache = CatalogCache()
+
+
+def sparse(data, fields):
+    """A cached full response limited to the ?fields= of the current request."""
+    return data if fields is None else {name: value for name, value in data.items() if name in fields}
+
+
+class CatalogCacheMixin:
+    """
+    Serve list and retrieve responses for anonymous-safe catalog views from
+    the catalog cache. Views set ``cache_namespace``.
+
+    Lists are cached per URL, ?fields= included. Detail entries always hold
+    the full object, so the key stays invalidatable by product id: sparse
+    detail requests are trimmed from a cached entry when there is one and
+    otherwise read from the database without being stored. Views use
+    SparseQuerysetMixin.
+
+    Responses that will be stored are read from the primary, even in a
+    ReplicaReadMixin view: rows from a lagging replica would be cached
+    under the current version and outlive the write that invalidated them.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        suffix = f'list:{request.build_absolute_uri()}'
+        key, data = catalog_cache.lookup(self.cache_namespace, suffix)
+        if data is not None:
+            return Response(data)
+
+        read_from_primary()
+        response = super().list(request, *args, **kwargs)
+        catalog_cache.store(key, response.data)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        suffix = product_detail_key(self.kwargs[self.lookup_field])
+        key, data = catalog_cache.lookup(self.cache_namespace, suffix)
+        if data is not None:
+            return Response(sparse(data, fields))
+
+        if fields is None:
+            read_from_primary()
+        response = super().retrieve(request, *args, **kwargs)
+        if fields is None:
+            catalog_cache.store(key, response.data)
+        return response
+
+
+class AsyncCatalogCacheMixin:
+    """
+    CatalogCacheMixin for async views, wrapping ``alist`` and ``aretrieve``.
+
+    Each lookup (version read plus entry read) and each store is one
+    worker-thread hop: the cache backends' async methods are themselves
+    sync_to_async wrappers, so calling them one by one would only add hops.
+    Views set ``cache_namespace``, as for CatalogCacheMixin.
+    """
+
+    async def alist(self, request, *args, **kwargs):
+        suffix = f'list:{request.build_absolute_uri()}'
+        key, data = await sync_to_async(catalog_cache.lookup)(self.cache_namespace, suffix)
+        if data is not None:
+            return Response(data)
+
+        read_from_primary()
+        response = await super().alist(request, *args, **kwargs)
+        await sync_to_async(catalog_cache.store)(key, response.data)
+        return response
+
+    async def aretrieve(self, request, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        suffix = product_detail_key(self.kwargs[self.lookup_field])
+        key, data = await sync_to_async(catalog_cache.lookup)(self.cache_namespace, suffix)
+        if data is not None:
+            return Response(sparse(data, fields))
+
+        if fields is None:
+            read_from_primary()
+        response = await super().aretrieve(request, *args, **kwargs)
+        if fields is None:
+            await sync_to_async(catalog_cache.store)(key, response.data)
+        return response
@@ -0,0 +1,239 @@
+from functools import reduce
+from operator import or_
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from .cache import catalog_cache
+from .models import Product
+
+
+class StockAdjustmentResult:
+    """Outcome of a stock adjustment: which lines were applied and which were not."""
+
+    def __init__(self):
+        self.fulfilled = []
+        self.unfulfilled = []
+
+    @property
+    def ok(self):
+        return not self.unfulfilled
+
+    def __repr__(self):
+        return (
+            f"<StockAdjustmentResult fulfilled={self.fulfilled} "
+            f"unfulfilled={self.unfulfilled}>"
+        )
+
+
+class InsufficientStock(Exception):
+    """Raised when a reservation cannot be satisfied; carries the adjustment result."""
+
+    def __init__(self, result):
+        self.result = result
+        super().__init__(f"Insufficient stock for lines: {result.unfulfilled}")
+
+
+def _invalidate_cached_details(product_ids):
+    """Drop cached product detail responses once the stock change commits."""
+    product_ids = list(product_ids)
+    if product_ids:
+        transaction.on_commit(lambda: catalog_cache.invalidate_product_details(product_ids))
+
+
+def _merge_lines(lines):
+    """
+    Collapse (product_id, quantity) pairs into one quantity per product,
+    sorted by product id so every caller locks rows in the same order.
+    """
+    merged = {}
+    for product_id, quantity in lines:
+        merged[product_id] = merged.get(product_id, 0) + quantity
+    return dict(sorted(merged.items()))
+
+
+def _lines_filter(merged, guard):
+    """OR of ``pk=product_id AND guard(quantity)`` over every merged line."""
+    return reduce(or_, (Q(pk=product_id) & guard(quantity) for product_id, quantity in merged.items()))
+
+
+def _lines_amount(merged):
+    """CASE expression yielding each product's quantity, for one UPDATE across all lines."""
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in merged.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class _PartialUpdate(Exception):
+    pass
+
+
+def _take_stock(merged, guard, fields):
+    """
+    Subtract every line's quantity from ``fields`` in one guarded UPDATE.
+
+    The fast path is a single statement whatever the number of lines. If
+    any product fails its guard the UPDATE is rolled back and the lines
+    are applied one product at a time instead, so the caller learns
+    exactly which lines were short.
+
+    Args:
+        merged: {product_id: quantity} from _merge_lines
+        guard: callable(quantity) returning the Q a product must satisfy
+        fields: stock columns to decrement
+
+    Returns:
+        StockAdjustmentResult
+    """
+    result = StockAdjustmentResult()
+    now = timezone.now()
+
+    try:
+        with transaction.atomic():
+            amount = _lines_amount(merged)
+            updated = Product.objects.filter(_lines_filter(merged, guard)).update(
+                updated_at=now, **{field: F(field) - amount for field in fields}
+            )
+            if updated != len(merged):
+                raise _PartialUpdate
+            _invalidate_cached_details(merged.keys())
+    except _PartialUpdate:
+        pass
+    else:
+        result.fulfilled.extend(merged.items())
+        return result
+
+    with transaction.atomic():
+        for product_id, quantity in merged.items():
+            updated = Product.objects.filter(Q(pk=product_id) & guard(quantity)).update(
+                updated_at=now, **{field: F(field) - quantity for field in fields}
+            )
+            if updated:
+                result.fulfilled.append((product_id, quantity))
+            else:
+                result.unfulfilled.append((product_id, quantity))
+
+        _invalidate_cached_details(product_id for product_id, _ in result.fulfilled)
+
+    return result
+
+
+def decrement_stock(lines):
+    """
+    Decrement stock for a set of order lines.
+
+    Products are updated with a conditional ``UPDATE ... SET stock = stock
+    - n WHERE stock - reserved_stock >= n`` so concurrent callers can
+    never take the same unit twice or sell units held by another order.
+    All lines go out in one statement, so the query count does not grow
+    with the basket; lines are only applied one by one when some product
+    is short.
+
+    Args:
+        lines: iterable of (product_id, quantity) pairs
+
+    Returns:
+        StockAdjustmentResult: fulfilled and unfulfilled (product_id, quantity) pairs
+    """
+    merged = _merge_lines(lines)
+    if not merged:
+        return StockAdjustmentResult()
+
+    return _take_stock(
+        merged,
+        lambda quantity: Q(stock__gte=F('reserved_stock') + quantity),
+        ['stock'],
+    )
+
+
+def reserve_stock(lines):
+    """
+    Hold stock for a set of order lines without selling it.
+
+    All lines are applied in a single set-based UPDATE that raises each
+    product's ``reserved_stock`` counter only while ``stock -
+    reserved_stock`` still covers the quantity, so the cost does not grow
+    with the size of the basket. Reservations are all-or-nothing: if any
+    line cannot be held the whole transaction is rolled back.
+
+    Args:
+        lines: iterable of (product_id, quantity) pairs
+
+    Returns:
+        StockAdjustmentResult
+
+    Raises:
+        InsufficientStock: if any line cannot be held
+    """
+    result = StockAdjustmentResult()
+    merged = _merge_lines(lines)
+    if not merged:
+        return result
+
+    guard = _lines_filter(merged, lambda quantity: Q(stock__gte=F('reserved_stock') + quantity))
+    increment = _lines_amount(merged)
+
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(guard).update(
+                reserved_stock=F('reserved_stock') + increment,
+            )
+            if updated != len(merged):
+                raise InsufficientStock(result)
+            _invalidate_cached_details(merged.keys())
+    except InsufficientStock:
+        # Work out which lines were short only on the failure path.
+        available = dict(
+            Product.objects.filter(pk__in=merged.keys()).annotate(
+                available=F('stock') - F('reserved_stock')
+            ).values_list('pk', 'available')
+        )
+        for product_id, quantity in merged.items():
+            if available.get(product_id, 0) >= quantity:
+                result.fulfilled.append((product_id, quantity))
+            else:
+                result.unfulfilled.append((product_id, quantity))
+        raise InsufficientStock(result)
+
+    result.fulfilled.extend(merged.items())
+    return result
+
+
+def release_reserved_stock(lines):
+    """
+    Give held stock back to the available pool.
+
+    Args:
+        lines: iterable of (product_id, quantity) pairs
+    """
+    merged = _merge_lines(lines)
+
+    with transaction.atomic():
+        for product_id, quantity in merged.items():
+            Product.objects.filter(pk=product_id, reserved_stock__gte=quantity).update(
+                reserved_stock=F('reserved_stock') - quantity,
+            )
+        _invalidate_cached_details(merged.keys())
+
+
+def commit_reserved_stock(lines):
+    """
+    Turn held stock into a sale: both ``stock`` and ``reserved_stock``
+    drop by the held quantity, for all lines in one UPDATE.
+
+    Args:
+        lines: iterable of (product_id, quantity) pairs
+
+    Returns:
+        StockAdjustmentResult
+    """
+    merged = _merge_lines(lines)
+    if not merged:
+        return StockAdjustmentResult()
+
+    return _take_stock(
+        merged,
+        lambda quantity: Q(stock__gte=quantity, reserved_stock__gte=quantity),
+        ['stock', 'reserved_stock'],
+    )
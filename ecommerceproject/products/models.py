@@ -22,6 +22,7 @@ class Product(models.Model):
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField()
+    reserved_stock = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     categories = models.ManyToManyField(Category, related_name='products', through='ProductCategory')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -30,8 +31,15 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def available_stock(self):
+        return self.stock - self.reserved_stock
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
 
 class ProductCategory(models.Model):
@@ -1,36 +1,47 @@
 from rest_framework import serializers
+from ecommerceproject.fieldsets import SparseFieldsetMixin
+from ecommerceproject.instrumentation import TimedSerializerMixin
+from ecommerceproject.projections import ProjectionSerializer
 from .models import Category, Product, ProductCategory
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name']
         read_only_fields = ['id']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'status']
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductListProjection(ProjectionSerializer):
+    class Meta:
+        serializer = ProductListSerializer
+
+
+class ProductSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     categories = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(),
         many=True
     )
+    available_stock = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'sku', 'description', 'price', 'stock',
-            'status', 'categories', 'created_at', 'updated_at'
+            'available_stock', 'status', 'categories', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        field_sources = {'available_stock': ('stock', 'reserved_stock')}
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        categories = instance.categories.all()
-        representation['categories'] = CategorySerializer(categories, many=True).data
+        if 'categories' in representation:
+            categories = instance.categories.all()
+            representation['categories'] = CategorySerializer(categories, many=True).data
         return representation
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .cache import catalog_cache
+from .models import Category, Product, ProductCategory
+
+# Namespaces are bumped once the write commits. Bumped earlier, a concurrent
+# miss could still read the old rows and cache them under the new version
+# until the entry times out.
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_products_cache(sender, using=None, **kwargs):
+    transaction.on_commit(lambda: catalog_cache.invalidate('products'), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, using=None, **kwargs):
+    # Product detail embeds category names, so both namespaces go stale.
+    transaction.on_commit(lambda: catalog_cache.invalidate('categories', 'products'), using=using)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_products_cache_on_categories_change(sender, action, using=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: catalog_cache.invalidate('products'), using=using)
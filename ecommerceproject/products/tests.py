@@ -1,3 +1,223 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from unittest import mock
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from rest_framework import mixins
+from rest_framework.test import APITestCase
+from accounts.models import User
+from .cache import catalog_cache
+from .inventory import decrement_stock
+from .models import Category, Product
 
-# Create your tests here.
+
+def make_product(sku, stock, price='10.00'):
+    return Product.objects.create(
+        name=f'Product {sku}',
+        sku=sku,
+        description='',
+        price=Decimal(price),
+        stock=stock,
+    )
+
+
+class DecrementStockTests(TestCase):
+    def test_decrements_every_line_when_stock_is_available(self):
+        first = make_product('A', 10)
+        second = make_product('B', 5)
+
+        result = decrement_stock([(second.id, 5), (first.id, 3)])
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.fulfilled, [(first.id, 3), (second.id, 5)])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.stock, 7)
+        self.assertEqual(second.stock, 0)
+
+    def test_reports_lines_that_cannot_be_fulfilled(self):
+        product = make_product('A', 2)
+        other = make_product('B', 4)
+
+        result = decrement_stock([(product.id, 3), (other.id, 4)])
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.unfulfilled, [(product.id, 3)])
+        self.assertEqual(result.fulfilled, [(other.id, 4)])
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+
+    def test_duplicate_lines_are_merged(self):
+        product = make_product('A', 5)
+
+        result = decrement_stock([(product.id, 3), (product.id, 3)])
+
+        self.assertEqual(result.unfulfilled, [(product.id, 6)])
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 5)
+
+    def test_one_update_for_the_whole_basket(self):
+        products = [make_product(f'P{i}', 10) for i in range(5)]
+
+        # One UPDATE for every line plus the savepoint pair.
+        with self.assertNumQueries(3):
+            result = decrement_stock([(product.id, 1) for product in products])
+
+        self.assertTrue(result.ok)
+        self.assertEqual(sorted(Product.objects.values_list('stock', flat=True)), [9] * 5)
+
+
+class DecrementStockConcurrencyTests(TransactionTestCase):
+    THREADS = 16
+    ATTEMPTS_PER_THREAD = 10
+    INITIAL_STOCK = 50
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('In-memory SQLite does not support concurrent connections.')
+
+    def test_concurrent_decrements_never_oversell(self):
+        products = [make_product(f'S{i}', self.INITIAL_STOCK) for i in range(3)]
+        product_ids = [product.id for product in products]
+        fulfilled = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker(offset):
+            try:
+                barrier.wait()
+                for attempt in range(self.ATTEMPTS_PER_THREAD):
+                    # Rotate line order so callers hand the engine differently ordered baskets.
+                    lines = [
+                        (product_ids[(offset + attempt + i) % len(product_ids)], 1)
+                        for i in range(len(product_ids))
+                    ]
+                    result = decrement_stock(lines)
+                    with lock:
+                        fulfilled.extend(result.fulfilled)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for product in Product.objects.filter(pk__in=product_ids):
+            sold = sum(quantity for product_id, quantity in fulfilled if product_id == product.id)
+            self.assertGreaterEqual(product.stock, 0)
+            self.assertEqual(product.stock, self.INITIAL_STOCK - sold)
+            self.assertEqual(product.stock, 0)
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        catalog_cache.cache.clear()
+        catalog_cache.reset_stats()
+        self.product = make_product('CACHED', 10)
+
+    def test_product_list_is_served_from_cache(self):
+        first = self.client.get('/api/products/')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/products/')
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(catalog_cache.stats()['products']['hits'], 1)
+        self.assertEqual(catalog_cache.stats()['products']['misses'], 1)
+
+    def test_product_save_invalidates_list_and_detail(self):
+        self.client.get('/api/products/')
+        self.client.get(f'/api/products/{self.product.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Renamed'
+            self.product.save()
+
+        self.assertEqual(self.client.get('/api/products/').data['results'][0]['name'], 'Renamed')
+        self.assertEqual(self.client.get(f'/api/products/{self.product.id}/').data['name'], 'Renamed')
+
+    def test_invalidation_waits_for_the_write_to_commit(self):
+        self.client.get('/api/products/')
+        version = catalog_cache.version('products')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.product.name = 'Renamed'
+                self.product.save()
+                self.product.categories.add(Category.objects.create(name='Books'))
+            # Until the commit, misses would still read the old rows.
+            self.assertEqual(catalog_cache.version('products'), version)
+
+        self.assertNotEqual(catalog_cache.version('products'), version)
+        self.assertEqual(self.client.get('/api/products/').data['results'][0]['name'], 'Renamed')
+
+    def test_write_during_a_miss_does_not_cache_the_old_rows_as_current(self):
+        read_rows = mixins.ListModelMixin.list
+
+        def read_then_write(view, request, *args, **kwargs):
+            response = read_rows(view, request, *args, **kwargs)
+            # A concurrent admin write lands after this request read its rows.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.product.name = 'Renamed'
+                self.product.save()
+            return response
+
+        with mock.patch.object(mixins.ListModelMixin, 'list', read_then_write):
+            self.client.get('/api/products/')
+
+        self.assertEqual(self.client.get('/api/products/').data['results'][0]['name'], 'Renamed')
+
+    def test_category_changes_invalidate_product_detail(self):
+        category = Category.objects.create(name='Books')
+        self.client.get(f'/api/products/{self.product.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.categories.add(category)
+        self.assertEqual(
+            self.client.get(f'/api/products/{self.product.id}/').data['categories'],
+            [{'id': category.id, 'name': 'Books'}]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.name = 'Novels'
+            category.save()
+        self.assertEqual(
+            self.client.get(f'/api/products/{self.product.id}/').data['categories'][0]['name'],
+            'Novels'
+        )
+
+    def test_category_list_is_invalidated_on_create(self):
+        Category.objects.create(name='Books')
+        self.assertEqual(self.client.get('/api/products/categories/').data['count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Music')
+
+        self.assertEqual(self.client.get('/api/products/categories/').data['count'], 2)
+
+    def test_stock_change_drops_cached_detail(self):
+        self.client.get(f'/api/products/{self.product.id}/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            decrement_stock([(self.product.id, 4)])
+
+        self.assertEqual(self.client.get(f'/api/products/{self.product.id}/').data['stock'], 6)
+
+    def test_stats_endpoint_requires_admin(self):
+        admin = User.objects.create_user(
+            email='admin@example.com', password='password123', name='Admin', is_admin=True
+        )
+        self.assertEqual(self.client.get('/api/products/cache-stats/').status_code, 401)
+
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/products/cache-stats/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.data['products'])
@@ -1,9 +1,29 @@
 from django.urls import path
-from .views import CategoryListCreateDestroyAPIView, ProductListCreateAPIView
+from ecommerceproject.async_views import select_view
+from .views import (
+    AsyncCategoryListCreateDestroyAPIView,
+    AsyncProductListCreateAPIView,
+    CatalogCacheStatsAPIView,
+    CategoryListCreateDestroyAPIView,
+    ProductListCreateAPIView,
+)
 
 urlpatterns = [
-    path('categories/', CategoryListCreateDestroyAPIView.as_view(), name='category-list-create'),
+    path(
+        'categories/',
+        select_view('category-list-create', CategoryListCreateDestroyAPIView, AsyncCategoryListCreateDestroyAPIView),
+        name='category-list-create',
+    ),
     path('categories/<int:pk>/', CategoryListCreateDestroyAPIView.as_view(), name='category-detail-delete'),
-    path('', ProductListCreateAPIView.as_view(), name='product-list-create'),
-    path('<int:pk>/', ProductListCreateAPIView.as_view(), name='product-detail-update-delete'),
+    path('cache-stats/', CatalogCacheStatsAPIView.as_view(), name='catalog-cache-stats'),
+    path(
+        '',
+        select_view('product-list-create', ProductListCreateAPIView, AsyncProductListCreateAPIView),
+        name='product-list-create',
+    ),
+    path(
+        '<int:pk>/',
+        select_view('product-detail-update-delete', ProductListCreateAPIView, AsyncProductListCreateAPIView),
+        name='product-detail-update-delete',
+    ),
 ]
@@ -1,12 +1,23 @@
 from rest_framework.generics import ListCreateAPIView
 from rest_framework import mixins, generics
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from accounts.permissions import IsAdmin
+from ecommerceproject.async_views import AsyncAPIView, AsyncListModelMixin, AsyncRetrieveModelMixin
+from ecommerceproject.db_routing import ReplicaReadMixin
+from ecommerceproject.fieldsets import SparseQuerysetMixin
+from ecommerceproject.pagination import KeysetPagination
+from ecommerceproject.projections import ProjectionMixin
+from .cache import AsyncCatalogCacheMixin, CatalogCacheMixin, catalog_cache
 from .models import Category, Product
-from .serializers import CategorySerializer, ProductSerializer, ProductListSerializer
+from .serializers import CategorySerializer, ProductSerializer, ProductListProjection
 
 
 class CategoryListCreateDestroyAPIView(
+    ReplicaReadMixin,
+    CatalogCacheMixin,
+    SparseQuerysetMixin,
     mixins.ListModelMixin, 
     mixins.CreateModelMixin, 
     mixins.DestroyModelMixin, 
@@ -16,6 +27,7 @@ class CategoryListCreateDestroyAPIView(
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'pk'
+    cache_namespace = 'categories'
 
     def get_permissions(self):
         if self.request.method in ['POST', 'DELETE']:
@@ -35,6 +47,10 @@ class CategoryListCreateDestroyAPIView(
 
 
 class ProductListCreateAPIView(
+    ReplicaReadMixin,
+    CatalogCacheMixin,
+    SparseQuerysetMixin,
+    ProjectionMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -44,6 +60,8 @@ class ProductListCreateAPIView(
 ):
     queryset = Product.objects.all()
     lookup_field = 'pk'
+    cache_namespace = 'products'
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         if self.request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -52,9 +70,14 @@ class ProductListCreateAPIView(
             self.permission_classes = [AllowAny]
         return super().get_permissions()
 
+    def get_queryset(self):
+        if self.kwargs.get('pk'):
+            return Product.objects.prefetch_related('categories')
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.request.method == 'GET' and not self.kwargs.get('pk'):
-            return ProductListSerializer
+            return ProductListProjection
         return ProductSerializer
 
     def get(self, request, *args, **kwargs):
@@ -73,3 +96,37 @@ class ProductListCreateAPIView(
 
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
+
+
+class AsyncCategoryListCreateDestroyAPIView(
+    AsyncCatalogCacheMixin,
+    AsyncListModelMixin,
+    CategoryListCreateDestroyAPIView,
+    AsyncAPIView
+):
+    """CategoryListCreateDestroyAPIView with an async GET; writes are unchanged."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+
+class AsyncProductListCreateAPIView(
+    AsyncCatalogCacheMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    ProductListCreateAPIView,
+    AsyncAPIView
+):
+    """ProductListCreateAPIView with an async GET; writes are unchanged."""
+
+    async def get(self, request, *args, **kwargs):
+        if self.kwargs.get('pk'):
+            return await self.aretrieve(request, *args, **kwargs)
+        return await self.alist(request, *args, **kwargs)
+
+
+class CatalogCacheStatsAPIView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        return Response(catalog_cache.stats())